@@ -0,0 +1,78 @@
+# Copyright 2019-2022 The University of Manchester, UK
+# Copyright 2020-2022 Vlaams Instituut voor Biotechnologie (VIB), BE
+# Copyright 2020-2022 Barcelona Supercomputing Center (BSC), ES
+# Copyright 2020-2022 Center for Advanced Studies, Research and Development in Sardinia (CRS4), IT
+# Copyright 2022 École Polytechnique Fédérale de Lausanne, CH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""\
+Compare adding files one at a time with add_file and in bulk with
+add_files.
+
+For each crate size N, adds N metadata-only file records (dest_path and a
+few properties, one every ten of them a ComputationalWorkflow) to a new
+crate, and reports the throughput of each method.
+
+Usage: python benchmarks/add.py [-n N_FILES ...] [-s STORAGE]
+"""
+
+import argparse
+import time
+
+from rocrate.rocrate import ROCrate
+
+STORAGES = {
+    "memory": {},
+    "database": {"database": ""},
+}
+FORMATS = ["text/csv", "text/plain", "application/json"]
+
+
+def records(n_files):
+    for i in range(n_files):
+        properties = {"encodingFormat": FORMATS[i % len(FORMATS)], "contentSize": i}
+        if i % 10 == 0:
+            properties["@type"] = ["File", "SoftwareSourceCode", "ComputationalWorkflow"]
+        yield {"dest_path": f"data/file_{i}.txt", "properties": properties}
+
+
+def add_file_loop(crate, n_files):
+    for r in records(n_files):
+        crate.add_file(**r)
+
+
+def add_files(crate, n_files):
+    crate.add_files(records(n_files))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--n-files", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("-s", "--storage", choices=list(STORAGES), default="memory")
+    args = parser.parse_args()
+    for n in args.n_files:
+        results = []
+        for f in add_file_loop, add_files:
+            crate = ROCrate(**STORAGES[args.storage])
+            t0 = time.perf_counter()
+            f(crate, n)
+            t = time.perf_counter() - t0
+            assert len(crate.root_dataset["hasPart"]) == n
+            results.append(f"{f.__name__} {t:.2f} s ({n / t:.0f}/s)")
+            del crate
+        print(f"{n} files: " + ", ".join(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# Copyright 2019-2022 The University of Manchester, UK
+# Copyright 2020-2022 Vlaams Instituut voor Biotechnologie (VIB), BE
+# Copyright 2020-2022 Barcelona Supercomputing Center (BSC), ES
+# Copyright 2020-2022 Center for Advanced Studies, Research and Development in Sardinia (CRS4), IT
+# Copyright 2022 École Polytechnique Fédérale de Lausanne, CH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""\
+Compare the regular and the columnar (FileTable) storage of File entities.
+
+Reports the time and retained memory of loading a synthetic crate with
+metadata_only=True, with and without columnar=True, and the time of
+computing the total contentSize per encodingFormat: by iterating over the
+data entities, and with FileTable.sum (with NumPy, if available, and
+without).
+
+Usage: python benchmarks/columnar.py [-n N_FILES ...]
+"""
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+
+import rocrate.columnar
+from rocrate.rocrate import ROCrate
+from synthetic import write_metadata
+
+
+def load(crate_dir, columnar):
+    t0 = time.perf_counter()
+    ROCrate(crate_dir, metadata_only=True, columnar=columnar)
+    elapsed = time.perf_counter() - t0
+    tracemalloc.start()
+    crate = ROCrate(crate_dir, metadata_only=True, columnar=columnar)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return crate, elapsed, current
+
+
+def size_by_format(crate):
+    totals = Counter()
+    for e in crate.data_entities:
+        totals[e["encodingFormat"]] += e["contentSize"]
+    return dict(totals)
+
+
+def timeit(func, *args, **kwargs):
+    t0 = time.perf_counter()
+    rval = func(*args, **kwargs)
+    return rval, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--n-files", type=int, nargs="+", default=[100000, 1000000])
+    args = parser.parse_args()
+    numpy = rocrate.columnar._numpy
+    for n in args.n_files:
+        print(f"{n} files")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            write_metadata(tmp_dir, n)
+            crate, elapsed, current = load(tmp_dir, False)
+            print(f"  load:       {elapsed:7.3f} s  {current / 2**20:8.1f} MiB")
+            expected, t_iter = timeit(size_by_format, crate)
+            del crate
+            crate, elapsed, current = load(tmp_dir, True)
+            print(f"  columnar:   {elapsed:7.3f} s  {current / 2**20:8.1f} MiB")
+        table = crate.file_table
+        table.count(by="encodingFormat")  # import NumPy, if available
+        totals, t_iter_views = timeit(size_by_format, crate)
+        assert totals == expected
+        totals, t_numpy = timeit(table.sum, "contentSize", by="encodingFormat")
+        assert totals == expected
+        rocrate.columnar._numpy = lambda: None
+        totals, t_python = timeit(table.sum, "contentSize", by="encodingFormat")
+        rocrate.columnar._numpy = numpy
+        assert totals == expected
+        label = "FileTable.sum (NumPy)" if numpy() else "FileTable.sum (no NumPy installed)"
+        print(f"  contentSize by encodingFormat: entities {t_iter:.3f} s, views {t_iter_views:.3f} s, "
+              f"{label} {t_numpy:.4f} s, FileTable.sum (pure Python) {t_python:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
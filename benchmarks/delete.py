@@ -0,0 +1,80 @@
+# Copyright 2019-2022 The University of Manchester, UK
+# Copyright 2020-2022 Vlaams Instituut voor Biotechnologie (VIB), BE
+# Copyright 2020-2022 Barcelona Supercomputing Center (BSC), ES
+# Copyright 2020-2022 Center for Advanced Studies, Research and Development in Sardinia (CRS4), IT
+# Copyright 2022 École Polytechnique Fédérale de Lausanne, CH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""\
+Time the deletion of data entities from crates of increasing size.
+
+For each crate size N, builds a crate with N files and deletes one every
+ten of them, one by one with crate.delete and in one call with
+crate.delete_many, then writes the metadata (which compacts the root
+dataset's hasPart). Deleting takes constant time per entity, so the time
+per deleted entity should not grow with N.
+
+Usage: python benchmarks/delete.py [-n N_FILES ...] [-s STORAGE]
+"""
+
+import argparse
+import tempfile
+import time
+
+from rocrate.model.file import File
+from rocrate.rocrate import ROCrate
+
+STORAGES = {
+    "memory": {},
+    "columnar": {"columnar": True},
+    "database": {"database": ""},
+}
+
+
+def make_crate(n_files, options):
+    with tempfile.TemporaryDirectory() as d:
+        crate = ROCrate()
+        for i in range(n_files):
+            crate.add(File(crate, dest_path=f"data/file_{i}.txt", properties={"contentSize": i}))
+        crate.metadata.write(d)
+        return ROCrate(d, metadata_only=True, **options)
+
+
+def timed(f):
+    t0 = time.perf_counter()
+    f()
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--n-files", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("-s", "--storage", choices=list(STORAGES), default="memory")
+    args = parser.parse_args()
+    for n in args.n_files:
+        ids = [f"data/file_{i}.txt" for i in range(0, n, 10)]
+        crate = make_crate(n, STORAGES[args.storage])
+        t_delete = timed(lambda: [crate.delete(_) for _ in ids])
+        with tempfile.TemporaryDirectory() as d:
+            t_write = timed(lambda: crate.metadata.write(d))
+        assert len(crate.root_dataset["hasPart"]) == n - len(ids)
+        crate = make_crate(n, STORAGES[args.storage])
+        t_many = timed(lambda: crate.delete_many(ids))
+        print(f"{n} files, {len(ids)} deleted: delete {t_delete:.3f} s "
+              f"({1e6 * t_delete / len(ids):.1f} us each), delete_many {t_many:.3f} s "
+              f"({1e6 * t_many / len(ids):.1f} us each), then write {t_write:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
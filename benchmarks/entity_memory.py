@@ -0,0 +1,79 @@
+# Copyright 2019-2022 The University of Manchester, UK
+# Copyright 2020-2022 Vlaams Instituut voor Biotechnologie (VIB), BE
+# Copyright 2020-2022 Barcelona Supercomputing Center (BSC), ES
+# Copyright 2020-2022 Center for Advanced Studies, Research and Development in Sardinia (CRS4), IT
+# Copyright 2022 École Polytechnique Fédérale de Lausanne, CH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""\
+Measure the memory used by entity objects.
+
+Creates N File entities (with the properties of the synthetic benchmark
+crate) and reports the memory allocated per entity, as traced by
+tracemalloc, split between the entity objects themselves and their JSON-LD
+dicts. Run on two checkouts to compare layouts.
+
+Usage: python benchmarks/entity_memory.py [-n N ...] [--load]
+"""
+
+import argparse
+import sys
+import tempfile
+import tracemalloc
+
+from rocrate.model.file import File
+from rocrate.rocrate import ROCrate
+from synthetic import make_metadata, write_metadata
+
+
+def object_size(entity):
+    size = sys.getsizeof(entity)
+    if hasattr(entity, "__dict__"):
+        size += sys.getsizeof(entity.__dict__)
+    return size
+
+
+def make_entities(crate, graph):
+    return [File(crate, None, _["@id"], properties=_) for _ in graph]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--n-entities", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--load", action="store_true", help="also measure peak memory of ROCrate(metadata_only=True)")
+    args = parser.parse_args()
+    crate = ROCrate()
+    for n in args.n_entities:
+        graph = [_ for _ in make_metadata(n)["@graph"] if _["@type"] == "File"]
+        tracemalloc.start()
+        entities = make_entities(crate, graph)
+        total, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        per_entity = total / n
+        per_object = object_size(entities[0])
+        print(f"{n} entities: {total / 2**20:.1f} MiB, {per_entity:.0f} B/entity "
+              f"({per_object} B object, {per_entity - per_object:.0f} B id and JSON-LD)")
+        del entities, graph
+        if args.load:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                write_metadata(tmp_dir, n)
+                tracemalloc.start()
+                ROCrate(tmp_dir, metadata_only=True)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                print(f"  ROCrate load: peak {peak / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
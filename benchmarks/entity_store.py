@@ -0,0 +1,98 @@
+# Copyright 2019-2022 The University of Manchester, UK
+# Copyright 2020-2022 Vlaams Instituut voor Biotechnologie (VIB), BE
+# Copyright 2020-2022 Barcelona Supercomputing Center (BSC), ES
+# Copyright 2020-2022 Center for Advanced Studies, Research and Development in Sardinia (CRS4), IT
+# Copyright 2022 École Polytechnique Fédérale de Lausanne, CH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""\
+Compare the in-memory and the SQLite entity storage.
+
+For each storage, in a separate process: read a synthetic crate with N
+files (metadata_only) and write its metadata out; then build a crate by
+adding N File entities, each with an author, and write its metadata out.
+Reports the time and the peak resident memory of each process (SQLite's
+own allocations are not seen by tracemalloc).
+
+Usage: python benchmarks/entity_store.py [-n N_FILES ...]
+"""
+
+import argparse
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from rocrate.model.file import File
+from rocrate.model.person import Person
+from rocrate.rocrate import ROCrate
+from synthetic import write_metadata
+
+STORAGES = {"memory": None, "sqlite": ""}
+
+
+def read_write(crate_dir, out_dir, database):
+    crate = ROCrate(crate_dir, metadata_only=True, database=database)
+    crate.metadata.write(out_dir)
+
+
+def build_write(n, out_dir, database):
+    crate = ROCrate(database=database)
+    people = [crate.add(Person(crate, f"#person_{i}", {"name": f"Person {i}"})) for i in range(10)]
+    for i in range(n):
+        crate.add(File(crate, dest_path=f"data/{i // 1000}/file_{i}.txt", properties={
+            "contentSize": i % 4096, "author": {"@id": people[i % len(people)].id},
+        }))
+    crate.metadata.write(out_dir)
+
+
+def run(task, n, storage):
+    database = STORAGES[storage]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_dir = Path(tmp_dir)
+        if task == "read":
+            write_metadata(tmp_dir / "in", n)
+            t0 = time.perf_counter()
+            read_write(tmp_dir / "in", tmp_dir, database)
+        else:
+            t0 = time.perf_counter()
+            build_write(n, tmp_dir, database)
+        elapsed = time.perf_counter() - t0
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10
+    print(f"{elapsed:.3f} {rss:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--n-files", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--run", nargs=3, metavar=("TASK", "N", "STORAGE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.run:
+        task, n, storage = args.run
+        return run(task, int(n), storage)
+    for n in args.n_files:
+        print(f"{n} files")
+        for task in "read", "build":
+            for storage in STORAGES:
+                out = subprocess.run(
+                    [sys.executable, __file__, "--run", task, str(n), storage],
+                    check=True, capture_output=True, text=True
+                ).stdout.split()
+                print(f"  {task:>5} + write, {storage:>6}: {float(out[0]):8.3f} s  {float(out[1]):8.1f} MiB max RSS")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# Copyright 2019-2022 The University of Manchester, UK
+# Copyright 2020-2022 Vlaams Instituut voor Biotechnologie (VIB), BE
+# Copyright 2020-2022 Barcelona Supercomputing Center (BSC), ES
+# Copyright 2020-2022 Center for Advanced Studies, Research and Development in Sardinia (CRS4), IT
+# Copyright 2022 École Polytechnique Fédérale de Lausanne, CH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""\
+Measure the cost of importing rocrate and of loading the bundled vocabularies.
+
+Each measurement runs in a fresh interpreter, so that module caching does not
+hide cold start costs. The "eager vocabs" figure is the time spent parsing
+schema.jsonld and ro-crate.jsonld and building the schema map, i.e. the
+cost that used to be paid by every ``import rocrate``.
+
+Usage: python benchmarks/import_time.py [-n RUNS]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+# label: (setup, timed code)
+SNIPPETS = {
+    "import rocrate.rocrate": ("", "import rocrate.rocrate"),
+    "eager vocabs": (
+        "from rocrate import vocabs",
+        "vocabs.RO_CRATE; vocabs.SCHEMA; vocabs.SCHEMA_MAP"
+    ),
+    "first term_to_uri": ("from rocrate import vocabs", "vocabs.term_to_uri('File')"),
+    "first schema_doc": ("from rocrate import vocabs", "vocabs.schema_doc('http://schema.org/Person')"),
+}
+TIMER = """\
+import time
+%s
+t0 = time.perf_counter()
+%s
+print(time.perf_counter() - t0)
+"""
+
+
+def time_snippet(setup, code, runs):
+    times = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", TIMER % (setup, code)],
+            check=True, capture_output=True, text=True
+        ).stdout
+        times.append(float(out))
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--runs", type=int, default=10)
+    args = parser.parse_args()
+    for label, (setup, code) in SNIPPETS.items():
+        print(f"{label:>24}: {1000 * time_snippet(setup, code, args.runs):8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
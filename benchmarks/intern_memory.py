@@ -0,0 +1,69 @@
+# Copyright 2019-2022 The University of Manchester, UK
+# Copyright 2020-2022 Vlaams Instituut voor Biotechnologie (VIB), BE
+# Copyright 2020-2022 Barcelona Supercomputing Center (BSC), ES
+# Copyright 2020-2022 Center for Advanced Studies, Research and Development in Sardinia (CRS4), IT
+# Copyright 2022 École Polytechnique Fédérale de Lausanne, CH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""\
+Measure the effect of interning on the memory used by parsed metadata.
+
+For each backend, read a synthetic metadata file with read_metadata, with
+and without interning, and report the time, the memory retained by the
+result and the peak memory.
+
+Usage: python benchmarks/intern_memory.py [-n N_FILES ...] [-b BACKEND ...]
+"""
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+
+from rocrate.jsonio import available_backends
+from rocrate.metadata import read_metadata
+from synthetic import write_metadata
+
+
+def measure(metadata_path, backend, intern):
+    t0 = time.perf_counter()
+    read_metadata(metadata_path, backend=backend, intern=intern)
+    elapsed = time.perf_counter() - t0
+    tracemalloc.start()
+    result = read_metadata(metadata_path, backend=backend, intern=intern)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed, current, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--n-files", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("-b", "--backends", nargs="+", default=["python"] + available_backends(["orjson"]))
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n in args.n_files:
+            metadata_path = write_metadata(tmp_dir, n)
+            print(f"{n} files")
+            for b in args.backends:
+                for intern in False, True:
+                    elapsed, current, peak = measure(metadata_path, b, intern)
+                    label = f"{b}{' + intern' if intern else ''}"
+                    print(f"  {label:>16}: {elapsed:7.3f} s  {current / 2**20:8.1f} MiB retained"
+                          f"  {peak / 2**20:8.1f} MiB peak")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# Copyright 2019-2022 The University of Manchester, UK
+# Copyright 2020-2022 Vlaams Instituut voor Biotechnologie (VIB), BE
+# Copyright 2020-2022 Barcelona Supercomputing Center (BSC), ES
+# Copyright 2020-2022 Center for Advanced Studies, Research and Development in Sardinia (CRS4), IT
+# Copyright 2022 École Polytechnique Fédérale de Lausanne, CH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""\
+Compare the JSON backends on writing and reading RO-Crate metadata.
+
+For each graph size, "dumps" is the time taken to serialize the metadata in
+the default pretty/sorted format (all backends produce the same text) and
+"loads" the time taken to parse it back.
+
+Usage: python benchmarks/json_backends.py [-n N_FILES ...]
+"""
+
+import argparse
+import gc
+import json
+import time
+
+from rocrate import jsonio
+from synthetic import make_metadata
+
+
+def timeit(func, *args, **kwargs):
+    gc.collect()
+    t0 = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - t0, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--n-files", type=int, nargs="+", default=[10000, 100000, 1000000])
+    args = parser.parse_args()
+    dump_backends = jsonio.available_backends(jsonio.DUMP_BACKENDS)
+    load_backends = jsonio.available_backends(jsonio.LOAD_BACKENDS)
+    for n in args.n_files:
+        metadata = make_metadata(n)
+        ref_t, text = timeit(json.dumps, metadata, indent=4, sort_keys=True)
+        print(f"{n} files ({len(text) / 2**20:.1f} MiB)")
+        for b in dump_backends:
+            elapsed, out = timeit(jsonio.dumps, metadata, backend=b)
+            assert out == text, f"{b}: output differs from json.dumps"
+            print(f"  dumps {b:>8}: {elapsed:8.3f} s  ({ref_t / elapsed:5.1f}x)")
+        del metadata, out
+        data = text.encode("utf-8")
+        del text
+        ref_t = None
+        for b in reversed(load_backends):
+            elapsed = timeit(jsonio.loads, data, backend=b)[0]
+            ref_t = ref_t or elapsed
+            print(f"  loads {b:>8}: {elapsed:8.3f} s  ({ref_t / elapsed:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
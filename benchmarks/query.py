@@ -0,0 +1,122 @@
+# Copyright 2019-2022 The University of Manchester, UK
+# Copyright 2020-2022 Vlaams Instituut voor Biotechnologie (VIB), BE
+# Copyright 2020-2022 Barcelona Supercomputing Center (BSC), ES
+# Copyright 2020-2022 Center for Advanced Studies, Research and Development in Sardinia (CRS4), IT
+# Copyright 2022 École Polytechnique Fédérale de Lausanne, CH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""\
+Compare queries (see rocrate.query) with the equivalent Python loops.
+
+Builds a crate with a main workflow that has P inputs and P outputs
+(FormalParameter entities), plus N files, one every ten of which is an
+exampleOfWork of a parameter. Each question is answered by crate.query
+(the first run includes building the indexes it uses) and by a loop over
+the crate's entities via Entity.__getitem__.
+
+Usage: python benchmarks/query.py [-n N_FILES ...] [-p N_PARAMETERS]
+"""
+
+import argparse
+import time
+
+from rocrate.model.computationalworkflow import ComputationalWorkflow
+from rocrate.model.contextentity import ContextEntity
+from rocrate.model.entity import Entity
+from rocrate.model.file import File
+from rocrate.model.person import Person
+from rocrate.rocrate import ROCrate
+
+FORMATS = ["text/csv", "text/plain", "application/json"]
+
+
+def as_list(value):
+    return value if isinstance(value, list) else [value]
+
+
+def make_crate(n_files, n_params):
+    crate = ROCrate()
+    people = [crate.add(Person(crate, f"#person_{i}")) for i in range(10)]
+    inputs = [crate.add(ContextEntity(crate, f"#in_{i}", {"@type": "FormalParameter"})) for i in range(n_params)]
+    outputs = [crate.add(ContextEntity(crate, f"#out_{i}", {"@type": "FormalParameter"})) for i in range(n_params)]
+    wf = crate.add(ComputationalWorkflow(crate, dest_path="wf.cwl"))
+    wf["input"] = inputs
+    wf["output"] = outputs
+    crate.mainEntity = wf
+    params = inputs + outputs
+    for i in range(n_files):
+        properties = {"encodingFormat": FORMATS[i % len(FORMATS)], "author": {"@id": people[i % len(people)].id}}
+        if i % 10 == 0:
+            properties["exampleOfWork"] = {"@id": params[i // 10 % len(params)].id}
+        crate.add(File(crate, dest_path=f"data/file_{i}.txt", properties=properties))
+    return crate
+
+
+def examples_loop(crate):
+    wf = crate.mainEntity
+    params = set()
+    for prop in "input", "output":
+        for p in as_list(wf.get(prop, [])):
+            if "FormalParameter" in as_list(p.type):
+                params.add(p.id)
+    for e in crate.get_entities():
+        if "File" in as_list(e.type):
+            ex = e.get("exampleOfWork")
+            if ex and any(isinstance(_, Entity) and _.id in params for _ in as_list(ex)):
+                yield e
+
+
+def authors_loop(crate):
+    seen = set()
+    for e in crate.get_entities():
+        if "File" in as_list(e.type) and e.get("encodingFormat") == "text/csv":
+            for a in as_list(e.get("author", [])):
+                if isinstance(a, Entity) and a.id not in seen:
+                    seen.add(a.id)
+                    yield a
+
+
+QUESTIONS = [
+    ("examples of workflow parameters",
+     "./ > mainEntity > input|output [FormalParameter] < exampleOfWork [File]", examples_loop),
+    ("authors of csv files",
+     '* [File] (encodingFormat = "text/csv") > author', authors_loop),
+]
+
+
+def timed(f):
+    t0 = time.perf_counter()
+    rval = f()
+    return rval, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--n-files", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("-p", "--n-parameters", type=int, default=100)
+    args = parser.parse_args()
+    for n in args.n_files:
+        crate = make_crate(n, args.n_parameters)
+        print(f"{n} files")
+        for name, query, loop in QUESTIONS:
+            expected, t_loop = timed(lambda: [_.id for _ in loop(crate)])
+            first, t_first = timed(lambda: [_.id for _ in crate.query(query)])
+            again, t_again = timed(lambda: [_.id for _ in crate.query(query)])
+            assert sorted(first) == sorted(again) == sorted(expected)
+            print(f"  {name} ({len(expected)} results): loop {t_loop:.4f} s, "
+                  f"query {t_first:.4f} s (first run), {t_again:.4f} s")
+
+
+if __name__ == "__main__":
+    main()
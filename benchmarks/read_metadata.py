@@ -0,0 +1,80 @@
+# Copyright 2019-2022 The University of Manchester, UK
+# Copyright 2020-2022 Vlaams Instituut voor Biotechnologie (VIB), BE
+# Copyright 2020-2022 Barcelona Supercomputing Center (BSC), ES
+# Copyright 2020-2022 Center for Advanced Studies, Research and Development in Sardinia (CRS4), IT
+# Copyright 2022 École Polytechnique Fédérale de Lausanne, CH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""\
+Compare time and peak memory of the ways to read an RO-Crate metadata file.
+
+"json.load" is the old implementation (whole document, then an id -> entity
+dictionary), "python" and "ijson" are the streaming backends of
+rocrate.metadata, followed by its whole-document backends, "ROCrate" is the whole crate loading process and "lazy" is
+the same with lazy=True.
+
+Usage: python benchmarks/read_metadata.py [-n N_FILES ...]
+"""
+
+import argparse
+import json
+import tempfile
+import time
+import tracemalloc
+
+from rocrate.jsonio import available_backends
+from rocrate.metadata import STREAM_BACKENDS, _ijson_available, read_metadata
+from rocrate.rocrate import ROCrate
+from synthetic import write_metadata
+
+
+def json_load(metadata_path):
+    with open(metadata_path) as f:
+        metadata = json.load(f)
+    return metadata["@context"], {_["@id"]: _ for _ in metadata["@graph"]}
+
+
+def measure(func, *args, **kwargs):
+    t0 = time.perf_counter()
+    func(*args, **kwargs)
+    elapsed = time.perf_counter() - t0
+    # measure memory in a separate run, since tracing slows things down
+    tracemalloc.start()
+    func(*args, **kwargs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--n-files", type=int, nargs="+", default=[10000, 100000])
+    args = parser.parse_args()
+    available = {"python"} | set(available_backends()) | ({"ijson"} if _ijson_available() else set())
+    backends = [_ for _ in STREAM_BACKENDS if _ in available]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n in args.n_files:
+            metadata_path = write_metadata(tmp_dir, n)
+            print(f"{n} files")
+            results = {"json.load": measure(json_load, metadata_path)}
+            for b in backends:
+                results[b] = measure(read_metadata, metadata_path, backend=b)
+            results["ROCrate"] = measure(ROCrate, tmp_dir)
+            results["lazy"] = measure(ROCrate, tmp_dir, lazy=True)
+            for label, (elapsed, peak) in results.items():
+                print(f"  {label:>10}: {elapsed:8.3f} s  {peak / 2**20:8.1f} MiB peak")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# Copyright 2019-2022 The University of Manchester, UK
+# Copyright 2020-2022 Vlaams Instituut voor Biotechnologie (VIB), BE
+# Copyright 2020-2022 Barcelona Supercomputing Center (BSC), ES
+# Copyright 2020-2022 Center for Advanced Studies, Research and Development in Sardinia (CRS4), IT
+# Copyright 2022 École Polytechnique Fédérale de Lausanne, CH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""\
+Micro-benchmark of id resolution: urljoin vs rocrate.utils.join_id.
+
+Each function resolves (without caching) the ids of a typical crate: relative
+file paths, "#uuid" ids for contextual entities, a few dot segments and
+absolute URLs.
+
+Usage: python benchmarks/resolve_id.py [-n N_IDS]
+"""
+
+import argparse
+import timeit
+import uuid
+from urllib.parse import urljoin
+
+from rocrate.utils import is_url, join_id
+
+
+def urljoin_id(base_uri, id_):
+    # the implementation of ROCrate.resolve_id before join_id
+    if not is_url(id_):
+        id_ = urljoin(base_uri, id_)
+    return id_.rstrip("/")
+
+
+def make_ids(n):
+    ids = []
+    for i in range(n):
+        k = i % 10
+        if k < 6:
+            ids.append(f"data/{i // 1000}/file_{i}.txt")
+        elif k < 8:
+            ids.append(f"#{uuid.UUID(int=i)}")
+        elif k == 8:
+            ids.append(f"./data/../data/{i}/")
+        else:
+            ids.append(f"https://orcid.org/0000-0000-0000-{i:04d}")
+    return ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--n-ids", type=int, default=100000)
+    args = parser.parse_args()
+    base_uri = f"arcp://uuid,{uuid.uuid4()}/"
+    ids = make_ids(args.n_ids)
+    assert [urljoin_id(base_uri, _) for _ in ids] == [join_id(base_uri, _) for _ in ids]
+    results = {}
+    for func in urljoin_id, join_id:
+        results[func.__name__] = min(timeit.repeat(
+            lambda: [func(base_uri, _) for _ in ids], number=1, repeat=3
+        ))
+    ref = results["urljoin_id"]
+    for name, t in results.items():
+        print(f"{name:>10}: {t:.3f} s ({1e6 * t / len(ids):.2f} us/id, {ref / t:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# Copyright 2019-2022 The University of Manchester, UK
+# Copyright 2020-2022 Vlaams Instituut voor Biotechnologie (VIB), BE
+# Copyright 2020-2022 Barcelona Supercomputing Center (BSC), ES
+# Copyright 2020-2022 Center for Advanced Studies, Research and Development in Sardinia (CRS4), IT
+# Copyright 2022 École Polytechnique Fédérale de Lausanne, CH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""\
+Synthetic RO-Crate metadata for benchmarks.
+"""
+
+import json
+from pathlib import Path
+
+FORMATS = ["text/plain", "text/csv", "application/gzip", "application/octet-stream"]
+
+
+def make_metadata(n_files, n_people=10, extra_types=0):
+    """\
+    Return the JSON-LD of a crate with n_files File entities, each with
+    the same handful of properties, plus n_people Person entities. If
+    extra_types is positive, each File's @type is a list with that many
+    more (unregistered) types before "File".
+    """
+    file_type = [f"ex:Type{_}" for _ in range(extra_types)] + ["File"] if extra_types else "File"
+    files = [{
+        "@id": f"data/{i // 1000}/file_{i}.txt",
+        "@type": file_type,
+        "contentSize": i % 4096,
+        "encodingFormat": FORMATS[i % len(FORMATS)],
+        "sha256": f"{i:064x}",
+        "dateModified": "2022-01-01T00:00:00+00:00",
+        "author": {"@id": f"#person_{i % n_people}"},
+    } for i in range(n_files)]
+    people = [{
+        "@id": f"#person_{i}",
+        "@type": "Person",
+        "name": f"Person {i}",
+    } for i in range(n_people)]
+    graph = [
+        {
+            "@id": "ro-crate-metadata.json",
+            "@type": "CreativeWork",
+            "about": {"@id": "./"},
+            "conformsTo": {"@id": "https://w3id.org/ro/crate/1.1"},
+        },
+        {
+            "@id": "./",
+            "@type": "Dataset",
+            "datePublished": "2022-01-01T00:00:00+00:00",
+            "hasPart": [{"@id": _["@id"]} for _ in files],
+        },
+    ] + files + people
+    return {"@context": "https://w3id.org/ro/crate/1.1/context", "@graph": graph}
+
+
+def write_metadata(crate_dir, n_files, **kwargs):
+    """\
+    Write synthetic metadata to crate_dir and return the metadata file path.
+    """
+    crate_dir = Path(crate_dir)
+    crate_dir.mkdir(parents=True, exist_ok=True)
+    metadata_path = crate_dir / "ro-crate-metadata.json"
+    with open(metadata_path, "w") as f:
+        json.dump(make_metadata(n_files, **kwargs), f, indent=4, sort_keys=True)
+    return metadata_path
@@ -0,0 +1,94 @@
+# Copyright 2019-2022 The University of Manchester, UK
+# Copyright 2020-2022 Vlaams Instituut voor Biotechnologie (VIB), BE
+# Copyright 2020-2022 Barcelona Supercomputing Center (BSC), ES
+# Copyright 2020-2022 Center for Advanced Studies, Research and Development in Sardinia (CRS4), IT
+# Copyright 2022 École Polytechnique Fédérale de Lausanne, CH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""\
+Compare entity class dispatch with and without the type registry.
+
+"scan" is the old approach: build a name -> class map from the class
+hierarchy for each crate, then check every map entry against the set of
+each entity's types; "registry" uses rocrate.model.registry. Entities have
+@type lists of increasing length.
+
+Usage: python benchmarks/type_dispatch.py [-n N_FILES] [-t N_TYPES ...]
+"""
+
+import argparse
+import tempfile
+import time
+from collections import OrderedDict
+
+from rocrate.model.data_entity import DataEntity
+from rocrate.model.file_or_dir import FileOrDir
+from rocrate.model.registry import DATA_ENTITY_TYPES
+from rocrate.rocrate import ROCrate
+from rocrate.utils import subclasses
+from synthetic import make_metadata, write_metadata
+
+
+def pick_type(json_entity, type_map, fallback=None):
+    # the dispatch used before the type registry
+    try:
+        t = json_entity["@type"]
+    except KeyError:
+        raise ValueError(f'entity {json_entity["@id"]!r} has no @type')
+    types = {_.strip() for _ in set(t if isinstance(t, list) else [t])}
+    for name, c in type_map.items():
+        if name in types:
+            return c
+    return fallback
+
+
+def scan(entities):
+    type_map = OrderedDict((_.__name__, _) for _ in subclasses(FileOrDir))
+    return [pick_type(_, type_map, fallback=DataEntity) for _ in entities]
+
+
+def registry(entities):
+    return [DATA_ENTITY_TYPES.pick(_) for _ in entities]
+
+
+def timeit(func, *args, **kwargs):
+    t0 = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--n-files", type=int, default=100000)
+    parser.add_argument("-t", "--n-types", type=int, nargs="+", default=[0, 5, 20])
+    args = parser.parse_args()
+    for t in args.n_types:
+        entities = [_ for _ in make_metadata(args.n_files, extra_types=t)["@graph"] if "File" in _["@type"]]
+        assert scan(entities) == registry(entities)
+        t_scan, t_reg = timeit(scan, entities), timeit(registry, entities)
+        print(f"{args.n_files} files, {t} extra types")
+        print(f"  dispatch: scan {t_scan:.3f} s, registry {t_reg:.3f} s ({t_scan / t_reg:.1f}x)")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            write_metadata(tmp_dir, args.n_files, extra_types=t)
+            print(f"  ROCrate: {timeit(ROCrate, tmp_dir):.3f} s")
+    # per-crate overhead, as when loading many small crates
+    entities = make_metadata(1)["@graph"][2:3]
+    n = 10000
+    t_scan = timeit(lambda: [scan(entities) for _ in range(n)])
+    t_reg = timeit(lambda: [registry(entities) for _ in range(n)])
+    print(f"{n} single-file crates: scan {t_scan:.3f} s, registry {t_reg:.3f} s ({t_scan / t_reg:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -48,9 +48,17 @@ Copyright 2022 Center for Advanced Studies, Research and Development in Sardinia
 __license__ = ("Apache License, version 2.0 "
                "<https://www.apache.org/licenses/LICENSE-2.0>")
 
-# for arcp scheme registration with urllib.parse
-import arcp  # noqa
+# Register the arcp scheme with urllib.parse, as done by the arcp package, so
+# that urljoin can resolve relative ids against the crate's base URI. This
+# avoids importing arcp (and its dependencies) just for the side effect.
+import urllib.parse as _urlp
+for _uses in _urlp.uses_relative, _urlp.uses_netloc, _urlp.uses_params, _urlp.uses_fragment:
+    if "arcp" not in _uses:
+        _uses.append("arcp")
+del _urlp, _uses
 
 # Convenience export of public functions/types
 from .model.metadata import Metadata  # noqa
+from .rocrate import read_graph  # noqa
+from .parallel import load_many  # noqa
 from ._version import __version__  # noqa
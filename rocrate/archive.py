@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+
+# Copyright 2019-2022 The University of Manchester, UK
+# Copyright 2020-2022 Vlaams Instituut voor Biotechnologie (VIB), BE
+# Copyright 2020-2022 Barcelona Supercomputing Center (BSC), ES
+# Copyright 2020-2022 Center for Advanced Studies, Research and Development in Sardinia (CRS4), IT
+# Copyright 2022 École Polytechnique Fédérale de Lausanne, CH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""\
+Access to the contents of zipped crates without extracting them.
+"""
+
+import atexit
+import os
+import posixpath
+import shutil
+import tempfile
+import zipfile
+from pathlib import Path
+
+
+def _norm_name(name):
+    # like zipfile.ZipFile._extract_member, drop drive letters, leading
+    # slashes and parent dir components, so that names stay in the archive
+    name = os.path.splitdrive(str(name).replace(os.sep, "/"))[1]
+    parts = posixpath.normpath(name).split("/")
+    return "/".join(_ for _ in parts if _ not in ("", ".", ".."))
+
+
+def safe_join(base, name):
+    """\
+    Return base / name, raising ValueError if it's outside base.
+    """
+    dest = Path(base) / name
+    try:
+        dest.resolve().relative_to(Path(base).resolve())
+    except ValueError:
+        raise ValueError(f"{name!r} is outside {base}")
+    return dest
+
+
+class ZipArchive:
+    """\
+    A zip file holding an RO-Crate.
+
+    Members are read straight from the archive. ``archive / name`` returns
+    a ZipMember, mirroring what ``crate_dir / name`` does for a directory.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.__zf = None
+        # normalized name -> ZipInfo, for regular files
+        self.__files = None
+        self.__dirs = None
+        self.__extract_dir = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_ZipArchive__zf"] = None
+        # the index is rebuilt on demand
+        state["_ZipArchive__files"] = state["_ZipArchive__dirs"] = None
+        # the extraction dir is removed when the process that made it exits
+        state["_ZipArchive__extract_dir"] = None
+        return state
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({str(self.path)!r})"
+
+    def __str__(self):
+        return str(self.path)
+
+    def __truediv__(self, name):
+        return ZipMember(self, name)
+
+    @property
+    def zipfile(self):
+        if self.__zf is None:
+            self.__zf = zipfile.ZipFile(self.path, "r")
+        return self.__zf
+
+    def close(self):
+        if self.__zf is not None:
+            self.__zf.close()
+            self.__zf = None
+
+    def __index(self):
+        if self.__files is None:
+            files, dirs = {}, set()
+            for info in self.zipfile.infolist():
+                name = _norm_name(info.filename)
+                if info.is_dir():
+                    dirs.add(name)
+                else:
+                    files[name] = info
+                parent = posixpath.dirname(name)
+                while parent:
+                    dirs.add(parent)
+                    parent = posixpath.dirname(parent)
+            self.__files, self.__dirs = files, dirs
+        return self.__files, self.__dirs
+
+    def files(self):
+        """\
+        Return the (normalized) names of all regular files in the archive.
+        """
+        return self.__index()[0].keys()
+
+    def dirs(self):
+        """\
+        Return the (normalized) names of all directories in the archive,
+        including the ones that are only implied by file names.
+        """
+        return self.__index()[1]
+
+    def open(self, name):
+        return self.zipfile.open(self.__info(name))
+
+    def __info(self, name):
+        name = _norm_name(name)
+        try:
+            return self.__index()[0][name]
+        except KeyError:
+            raise FileNotFoundError(f"{name!r} not found in {self.path}")
+
+    def copy(self, name, dest):
+        """\
+        Copy a file member to the dest path, streaming its contents.
+        """
+        with self.open(name) as fsrc, open(dest, "wb") as fdst:
+            shutil.copyfileobj(fsrc, fdst)
+
+    def extract(self, name):
+        """\
+        Extract a member (with all its contents if it's a directory) to a
+        temporary location and return the corresponding path.
+        """
+        if self.__extract_dir is None:
+            self.__extract_dir = tempfile.mkdtemp(prefix="rocrate_")
+            atexit.register(shutil.rmtree, self.__extract_dir, True)
+        name = _norm_name(name)
+        dest = safe_join(self.__extract_dir, name)
+        if name in self.dirs():
+            prefix = f"{name}/" if name else ""
+            for f in self.files():
+                f_dest = safe_join(self.__extract_dir, f)
+                if f.startswith(prefix) and not f_dest.exists():
+                    f_dest.parent.mkdir(parents=True, exist_ok=True)
+                    self.copy(f, f_dest)
+            dest.mkdir(parents=True, exist_ok=True)
+        elif not dest.exists():
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            self.copy(name, dest)
+        return dest
+
+
+class ZipMember:
+    """\
+    A file or directory in a ZipArchive.
+
+    Supports the subset of the pathlib.Path interface used for entity
+    sources. Converting it to a file system path (e.g., by passing it to
+    open) extracts it to a temporary location.
+    """
+
+    def __init__(self, archive, name):
+        self.archive = archive
+        self.name_in_archive = _norm_name(name)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.archive!r}, {self.name_in_archive!r})"
+
+    def __str__(self):
+        return f"{self.archive.path.as_posix()}/{self.name_in_archive}"
+
+    def __eq__(self, other):
+        if not isinstance(other, ZipMember):
+            return NotImplemented
+        return self.archive is other.archive and self.name_in_archive == other.name_in_archive
+
+    def __hash__(self):
+        return hash((id(self.archive), self.name_in_archive))
+
+    def __truediv__(self, name):
+        return ZipMember(self.archive, posixpath.join(self.name_in_archive, str(name)))
+
+    def __fspath__(self):
+        return str(self.archive.extract(self.name_in_archive))
+
+    @property
+    def name(self):
+        return posixpath.basename(self.name_in_archive)
+
+    def exists(self):
+        return self.is_file() or self.is_dir()
+
+    def is_file(self):
+        return self.name_in_archive in self.archive.files()
+
+    def is_dir(self):
+        return self.name_in_archive in self.archive.dirs() or not self.name_in_archive
+
+    def open(self, mode="rb"):
+        if mode != "rb":
+            raise ValueError("zip members can only be opened in 'rb' mode")
+        return self.archive.open(self.name_in_archive)
+
+    def copy(self, dest):
+        self.archive.copy(self.name_in_archive, dest)
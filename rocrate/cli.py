@@ -16,7 +16,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
 import os
+import shlex
 from pathlib import Path
 
 import click
@@ -48,6 +50,31 @@ CSV = CSVParamType()
 OPTION_CRATE_PATH = click.option('-c', '--crate-dir', type=click.Path(), default=os.getcwd)
 
 
+class Batch:
+    """\
+    State shared by the operations of a ``batch`` invocation: the crate is
+    read once, modified in memory and written once at the end.
+    """
+
+    def __init__(self, crate_dir):
+        self.crate_dir = Path(crate_dir)
+        self.crate = ROCrate(crate_dir, init=False, gen_preview=False)
+
+
+def load_crate(crate_dir):
+    batch = click.get_current_context().find_object(Batch)
+    if batch is None:
+        return ROCrate(crate_dir, init=False, gen_preview=False)
+    if Path(crate_dir).resolve() != batch.crate_dir.resolve():
+        raise click.UsageError(f"operation on {crate_dir}, but batch is on {batch.crate_dir}")
+    return batch.crate
+
+
+def write_metadata(crate, crate_dir):
+    if click.get_current_context().find_object(Batch) is None:
+        crate.metadata.write(crate_dir)
+
+
 @click.group()
 def cli():
     pass
@@ -74,7 +101,7 @@ def add():
 @click.option('-l', '--language', type=click.Choice(LANG_CHOICES), default="cwl")
 @OPTION_CRATE_PATH
 def workflow(crate_dir, path, language):
-    crate = ROCrate(crate_dir, init=False, gen_preview=False)
+    crate = load_crate(crate_dir)
     source = Path(path).resolve(strict=True)
     try:
         dest_path = source.relative_to(crate_dir)
@@ -83,7 +110,7 @@ def workflow(crate_dir, path, language):
         raise ValueError(f"{source} is not in the crate dir {crate_dir}")
     # TODO: add command options for main and gen_cwl
     crate.add_workflow(source, dest_path, main=True, lang=language, gen_cwl=False)
-    crate.metadata.write(crate_dir)
+    write_metadata(crate, crate_dir)
 
 
 @add.command(name="test-suite")
@@ -92,9 +119,9 @@ def workflow(crate_dir, path, language):
 @click.option('-m', '--main-entity')
 @OPTION_CRATE_PATH
 def suite(crate_dir, identifier, name, main_entity):
-    crate = ROCrate(crate_dir, init=False, gen_preview=False)
+    crate = load_crate(crate_dir)
     suite = crate.add_test_suite(identifier=add_hash(identifier), name=name, main_entity=main_entity)
-    crate.metadata.write(crate_dir)
+    write_metadata(crate, crate_dir)
     print(suite.id)
 
 
@@ -107,12 +134,12 @@ def suite(crate_dir, identifier, name, main_entity):
 @click.option('-n', '--name')
 @OPTION_CRATE_PATH
 def instance(crate_dir, suite, url, resource, service, identifier, name):
-    crate = ROCrate(crate_dir, init=False, gen_preview=False)
+    crate = load_crate(crate_dir)
     instance_ = crate.add_test_instance(
         add_hash(suite), url, resource=resource, service=service,
         identifier=add_hash(identifier), name=name
     )
-    crate.metadata.write(crate_dir)
+    write_metadata(crate, crate_dir)
     print(instance_.id)
 
 
@@ -123,7 +150,7 @@ def instance(crate_dir, suite, url, resource, service, identifier, name):
 @click.option('-v', '--engine-version')
 @OPTION_CRATE_PATH
 def definition(crate_dir, suite, path, engine, engine_version):
-    crate = ROCrate(crate_dir, init=False, gen_preview=False)
+    crate = load_crate(crate_dir)
     source = Path(path).resolve(strict=True)
     try:
         dest_path = source.relative_to(crate_dir)
@@ -134,7 +161,86 @@ def definition(crate_dir, suite, path, engine, engine_version):
         add_hash(suite), source=source, dest_path=dest_path, engine=engine,
         engine_version=engine_version
     )
-    crate.metadata.write(crate_dir)
+    write_metadata(crate, crate_dir)
+
+
+def op_to_args(op):
+    """\
+    Convert a JSON batch operation to a command line.
+
+    The operation's "command" is the command path (e.g., "add test-suite");
+    the other keys are the names of the command's parameters.
+    """
+    op = dict(op)
+    try:
+        args = op.pop("command").split()
+    except (KeyError, AttributeError):
+        raise ValueError("operation must have a \"command\" string")
+    command = cli
+    for name in args:
+        try:
+            command = command.commands[name]
+        except (AttributeError, KeyError):
+            raise ValueError(f"unknown command: {' '.join(args)}")
+    params = {_.name: _ for _ in command.params}
+    for key, value in op.items():
+        try:
+            param = params[key.replace("-", "_")]
+        except KeyError:
+            raise ValueError(f"unknown parameter for {' '.join(args)}: {key}")
+        if isinstance(param, click.Argument):
+            continue
+        if param.is_flag:
+            if value:
+                args.append(param.opts[-1])
+        else:
+            args.extend([param.opts[-1], str(value)])
+    args.append("--")
+    for param in command.params:
+        if isinstance(param, click.Argument):
+            for key in param.name, param.name.replace("_", "-"):
+                if key in op:
+                    args.append(str(op[key]))
+                    break
+    return args
+
+
+@cli.command()
+@click.argument('ops', type=click.File('r'), default='-')
+@OPTION_CRATE_PATH
+@click.pass_context
+def batch(ctx, crate_dir, ops):
+    """\
+    Apply a sequence of operations to the crate, writing the metadata once.
+
+    Operations are read from OPS (default: standard input), one per line,
+    either as command lines (e.g., "add test-suite -i test1") or as JSON
+    objects (e.g., {"command": "add test-suite", "identifier": "test1"}).
+    Only "add" commands are supported. The crate is not modified unless all
+    operations succeed.
+    """
+    ctx.obj = Batch(crate_dir)
+    for lineno, line in enumerate(ops, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            args = op_to_args(json.loads(line)) if line.startswith("{") else shlex.split(line)
+        except ValueError as e:
+            raise click.UsageError(f"line {lineno}: {e}")
+        if args[:1] != ["add"]:
+            raise click.UsageError(f"line {lineno}: only \"add\" commands are supported")
+        default_map = {_: {"crate_dir": crate_dir} for _ in add.commands}
+        try:
+            with add.make_context("add", args[1:], parent=ctx, default_map=default_map) as sub_ctx:
+                add.invoke(sub_ctx)
+        except click.ClickException as e:
+            raise click.UsageError(f"line {lineno}: {e.format_message()}") from e
+        except (click.exceptions.Exit, click.Abort):
+            raise
+        except Exception as e:
+            raise click.ClickException(f"line {lineno}: {e}") from e
+    ctx.obj.crate.metadata.write(crate_dir)
 
 
 @cli.command()
@@ -0,0 +1,477 @@
+#!/usr/bin/env python
+
+# Copyright 2019-2022 The University of Manchester, UK
+# Copyright 2020-2022 Vlaams Instituut voor Biotechnologie (VIB), BE
+# Copyright 2020-2022 Barcelona Supercomputing Center (BSC), ES
+# Copyright 2020-2022 Center for Advanced Studies, Research and Development in Sardinia (CRS4), IT
+# Copyright 2022 École Polytechnique Fédérale de Lausanne, CH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""\
+Column-wise storage for File entities.
+
+Crates generated by data pipelines can list hundreds of thousands of File
+entities that all have the same few properties. A FileTable stores them as
+one column per property instead of one dict per entity: numbers are kept
+in arrays and strings (and other hashable values) are dictionary-encoded,
+so aggregates can be computed without creating any entity objects.
+"""
+
+import array
+from collections.abc import MutableMapping
+
+from .model.file import File
+from .utils import as_number
+
+# distinct values beyond which a column stops being dictionary-encoded,
+# unless they're less than half of the column's values
+MAX_CATEGORIES = 1024
+
+INT64_MIN, INT64_MAX = -(1 << 63), (1 << 63) - 1
+
+_MISSING = object()
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _ones(n):
+    return b"\x01" * n
+
+
+def _exact(values):
+    # int64 sums wrap around on overflow: use Python ints if they could
+    if len(values) and max(-int(values.min()), int(values.max())) * len(values) > INT64_MAX:
+        return values.astype(object)
+    return values
+
+
+def _category_key(value):
+    # hashable representation of a value, or None if it can't be encoded
+    cls = value.__class__
+    if cls is str or cls is bool or value is None:
+        return value
+    if cls is dict and len(value) == 1:
+        id_ = value.get("@id")
+        if id_.__class__ is str:
+            return ("@id", id_)
+    return None
+
+
+class _Column:
+    """\
+    The values of one property for all the rows of a FileTable.
+
+    A column's kind is set by its first value: "int" and "float" values are
+    kept in arrays (with an optional mask for missing values), "category"
+    values are dictionary-encoded (codes in an array, -1 for a missing
+    value); a value that does not fit turns the column into a list of
+    objects ("object").
+    """
+
+    __slots__ = ("kind", "n", "data", "mask", "categories", "codes")
+
+    def __init__(self, n_missing=0):
+        self.kind = None
+        self.n = n_missing
+        self.data = None
+        self.mask = None
+        self.categories = None
+        self.codes = None
+
+    def _init_kind(self, value):
+        n, cls = self.n, value.__class__
+        if cls is int and INT64_MIN <= value <= INT64_MAX:
+            self.kind, self.data = "int", array.array("q", bytes(8 * n))
+        elif cls is float:
+            self.kind, self.data = "float", array.array("d", bytes(8 * n))
+        elif _category_key(value) is not None or value is None:
+            self.kind, self.data = "category", array.array("i", [-1]) * n
+            self.categories, self.codes = [], {}
+            return
+        else:
+            self.kind, self.data = "object", [_MISSING] * n
+            return
+        if n:
+            self.mask = bytearray(n)
+
+    def _to_object(self):
+        self.data = [self.get(_) for _ in range(self.n)]
+        self.kind, self.mask, self.categories, self.codes = "object", None, None, None
+
+    def _encode(self, value):
+        # return the value's category code, or None if it can't be encoded
+        key = _category_key(value)
+        if key is None and value is not None:
+            return None
+        try:
+            return self.codes[key]
+        except KeyError:
+            code = len(self.categories)
+            if code >= MAX_CATEGORIES and code >= self.n // 2:
+                return None
+            self.categories.append(value)
+            self.codes[key] = code
+            return code
+
+    def _fits(self, value):
+        cls = value.__class__
+        if self.kind == "int":
+            return cls is int and INT64_MIN <= value <= INT64_MAX
+        return cls is float
+
+    def append(self, value):
+        kind = self.kind
+        if value is not _MISSING:
+            # fast paths for values that fit
+            if kind == "category":
+                code = self.codes.get(value) if value.__class__ is str else None
+                if code is None:
+                    code = self._encode(value)
+                if code is not None:
+                    self.data.append(code)
+                    self.n += 1
+                    return
+            elif kind == "object":
+                self.data.append(value)
+                self.n += 1
+                return
+            elif kind is not None and self._fits(value):
+                self.data.append(value)
+                if self.mask is not None:
+                    self.mask.append(1)
+                self.n += 1
+                return
+        if value is _MISSING:
+            if self.kind is None or self.kind == "object":
+                if self.kind:
+                    self.data.append(value)
+            elif self.kind == "category":
+                self.data.append(-1)
+            else:
+                self.data.append(0)
+                if self.mask is None:
+                    self.mask = bytearray(b"\x01") * self.n
+                self.mask.append(0)
+            self.n += 1
+            return
+        if self.kind is None:
+            self._init_kind(value)
+        self.n += 1
+        self.data.append(0 if self.kind != "object" else _MISSING)
+        if self.mask is not None:
+            self.mask.append(0)
+        self.set(self.n - 1, value)
+
+    def get(self, row):
+        kind = self.kind
+        if kind == "category":
+            code = self.data[row]
+            return _MISSING if code < 0 else self.categories[code]
+        if kind == "object":
+            return self.data[row]
+        if kind is None or (self.mask is not None and not self.mask[row]):
+            return _MISSING
+        return self.data[row]
+
+    def set(self, row, value):
+        if self.kind is None:
+            if value is _MISSING:
+                return
+            n, self.n = self.n, 0
+            self._init_kind(value)
+            for _ in range(n):
+                self.append(_MISSING)
+        kind = self.kind
+        if kind == "object":
+            self.data[row] = value
+        elif kind == "category":
+            if value is _MISSING:
+                self.data[row] = -1
+                return
+            code = self._encode(value)
+            if code is None:
+                self._to_object()
+                self.data[row] = value
+            else:
+                self.data[row] = code
+        elif value is _MISSING:
+            if self.mask is None:
+                self.mask = bytearray(b"\x01") * self.n
+            self.mask[row] = 0
+        elif self._fits(value):
+            self.data[row] = value
+            if self.mask is not None:
+                self.mask[row] = 1
+        else:
+            self._to_object()
+            self.data[row] = value
+
+    def labels(self):
+        # (per-row codes, code -> value), with references as their @id
+        if self.kind == "category":
+            return self.data, [_["@id"] if _.__class__ is dict else _ for _ in self.categories]
+        codes, labels, seen = array.array("i"), [], {}
+        for row in range(self.n):
+            v = self.get(row)
+            key = _category_key(v) if v is not _MISSING else _MISSING
+            if key is None and v is not None:
+                raise ValueError(f"cannot group by unhashable value {v!r}")
+            if key is _MISSING:
+                codes.append(-1)
+                continue
+            try:
+                codes.append(seen[key])
+            except KeyError:
+                codes.append(seen.setdefault(key, len(labels)))
+                labels.append(v["@id"] if v.__class__ is dict else v)
+        return codes, labels
+
+
+class FileTableRow(MutableMapping):
+    """\
+    The JSON-LD of a FileTable row, as seen by its File view.
+
+    Reads and writes go straight to the table's columns. The @id and @type
+    cannot be changed (File views are moved out of the table before their
+    @type is set, see ROCrate._detach).
+    """
+
+    __slots__ = ("table", "row")
+
+    def __init__(self, table, row):
+        self.table = table
+        self.row = row
+
+    def __getitem__(self, key):
+        if key == "@id":
+            return self.table.ids[self.row]
+        if key == "@type":
+            return "File"
+        try:
+            value = self.table.columns[key].get(self.row)
+        except KeyError:
+            value = _MISSING
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if key.startswith("@"):
+            raise KeyError(f"cannot set '{key}'")
+        self.table.set(self.row, key, value)
+
+    def __delitem__(self, key):
+        if key.startswith("@"):
+            raise KeyError(f"cannot delete '{key}'")
+        if key not in self:
+            raise KeyError(key)
+        self.table.columns[key].set(self.row, _MISSING)
+
+    def __iter__(self):
+        yield "@id"
+        yield "@type"
+        row = self.row
+        for name, column in list(self.table.columns.items()):
+            if column.get(row) is not _MISSING:
+                yield name
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class FileTable:
+    """\
+    Column-wise store for File entities whose @type is just "File".
+
+    Rows are indexed by entity key (see ROCrate) and handed out as File
+    views that read and write the columns directly: views of a row are not
+    valid anymore after its entity is deleted from (or replaced in) the
+    crate. The aggregates (count, sum) use NumPy if available.
+    """
+
+    def __init__(self):
+        self.ids = []
+        self.index = {}
+        self.columns = {}
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def append(self, key, id_, properties):
+        """\
+        Add a row for the entity with the given key and id.
+
+        The @id and @type in properties, if any, are ignored.
+        """
+        if key in self.index:
+            raise ValueError(f"{key!r} is already in the table")
+        row = len(self.ids)
+        self.ids.append(id_)
+        self.index[key] = row
+        columns = self.columns
+        for name, column in columns.items():
+            column.append(properties.get(name, _MISSING))
+        for name, value in properties.items():
+            if name not in columns and not name.startswith("@"):
+                column = columns[name] = _Column(row)
+                column.append(value)
+        return row
+
+    def set(self, row, name, value):
+        try:
+            column = self.columns[name]
+        except KeyError:
+            column = self.columns[name] = _Column(len(self.ids))
+        column.set(row, value)
+
+    def row(self, key):
+        """\
+        Return the row of the entity with the given key, or None.
+        """
+        return self.index.get(key)
+
+    def rows(self):
+        """\
+        Iterate over the rows of the entities in the table, in order.
+        """
+        return iter(self.index.values())
+
+    def view(self, crate, row, source=None):
+        """\
+        Return a File entity whose JSON-LD is stored in the given row.
+        """
+        entity = File.__new__(File)
+        entity.crate = crate
+        entity.id = self.ids[row]
+        entity._jsonld = FileTableRow(self, row)
+        entity.source = source
+        entity.fetch_remote = entity.validate_url = False
+        return entity
+
+    def discard(self, key):
+        """\
+        Remove the row of the entity with the given key, if present. Return
+        True if the row was removed.
+        """
+        try:
+            row = self.index.pop(key)
+        except KeyError:
+            return False
+        self.ids[row] = None
+        for column in self.columns.values():
+            column.set(row, _MISSING)
+        return True
+
+    def __groups(self, by):
+        codes, labels = self.columns[by].labels() if by in self.columns else (array.array("i"), [])
+        if len(codes) < len(self.ids):
+            codes = codes + array.array("i", [-1]) * (len(self.ids) - len(codes))
+        return codes, labels
+
+    def count(self, by=None):
+        """\
+        Return the number of entities in the table.
+
+        If by is a property name, return a dictionary that maps each value
+        of that property (references as their @id) to the number of
+        entities that have it; entities that lack the property are not
+        counted.
+        """
+        if by is None:
+            return len(self)
+        codes, labels = self.__groups(by)
+        np = _numpy()
+        if np is not None:
+            codes = np.frombuffer(codes, dtype=np.int32)
+            counts = np.bincount(codes[codes >= 0], minlength=len(labels)).tolist()
+        else:
+            counts = [0] * len(labels)
+            for code in codes:
+                if code >= 0:
+                    counts[code] += 1
+        return {label: n for label, n in zip(labels, counts) if n}
+
+    def sum(self, name, by=None):
+        """\
+        Return the sum of the (numeric) values of the given property.
+
+        If by is a property name, return a dictionary that maps each value
+        of that property to the sum for the entities that have it, as in
+        count. Entities that lack either property are left out. Strings
+        that hold integers count as numbers, as in ROCrate.subtree_size.
+        Raise TypeError if the values are not all numbers. Sums of integers
+        are exact, with or without NumPy.
+        """
+        try:
+            column = self.columns[name]
+        except KeyError:
+            return {} if by else 0
+        if column.kind in ("object", "category"):
+            values = [column.get(_) for _ in range(column.n)]
+            for i, v in enumerate(values):
+                if v is not _MISSING:
+                    values[i] = as_number(v)
+                    if values[i] is None:
+                        raise TypeError(f"{name!r} has non-numeric values")
+            ints = all(_ is _MISSING or (_.__class__ is int and INT64_MIN <= _ <= INT64_MAX) for _ in values)
+            column = _Column()
+            for v in values:
+                column.append(v if ints or v is _MISSING else float(v))
+        if column.kind is None:
+            return {} if by else 0
+        np = _numpy()
+        if by is None:
+            if np is None:
+                return sum(v for v, present in zip(column.data, column.mask or _ones(column.n)) if present)
+            values = np.frombuffer(column.data, dtype=np.int64 if column.kind == "int" else np.float64)
+            if column.mask is not None:
+                values = values[np.frombuffer(column.mask, dtype=np.bool_)]
+            if column.kind == "int":
+                return int(_exact(values).sum())
+            return values.sum().item()
+        codes, labels = self.__groups(by)
+        if np is None:
+            totals, seen = [0] * len(labels), [False] * len(labels)
+            for code, v, present in zip(codes, column.data, column.mask or _ones(column.n)):
+                if code >= 0 and present:
+                    totals[code] += v
+                    seen[code] = True
+        else:
+            codes = np.frombuffer(codes, dtype=np.int32)[:column.n]
+            keep = codes >= 0
+            if column.mask is not None:
+                keep &= np.frombuffer(column.mask, dtype=np.bool_)
+            codes = codes[keep]
+            values = np.frombuffer(column.data, dtype=np.int64 if column.kind == "int" else np.float64)[keep]
+            if column.kind == "int":
+                values = _exact(values)
+                totals = np.zeros(len(labels), dtype=values.dtype)
+                np.add.at(totals, codes, values)
+            else:
+                totals = np.bincount(codes, weights=values, minlength=len(labels))
+            totals = totals.tolist()
+            seen = np.bincount(codes, minlength=len(labels)).tolist()
+        return {label: t for label, t, n in zip(labels, totals, seen) if n}
@@ -8,3 +8,6 @@ curl -L -f -o schema.jsonld https://schema.org/version/10.0/schemaorg-all-http.j
 curl -L -f -o ro-crate.jsonld https://w3id.org/ro/crate/1.1/context
 # CC0  https://creativecommons.org/publicdomain/zero/1.0/
 # so no attribution needed
+
+# Regenerate the precompiled index (vocabs.idx) from the files above
+PYTHONPATH=../.. python3 -c "from rocrate.vocabs import compile_index; compile_index()"
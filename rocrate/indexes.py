@@ -0,0 +1,327 @@
+#!/usr/bin/env python
+
+# Copyright 2019-2022 The University of Manchester, UK
+# Copyright 2020-2022 Vlaams Instituut voor Biotechnologie (VIB), BE
+# Copyright 2020-2022 Barcelona Supercomputing Center (BSC), ES
+# Copyright 2020-2022 Center for Advanced Studies, Research and Development in Sardinia (CRS4), IT
+# Copyright 2022 École Polytechnique Fédérale de Lausanne, CH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""\
+Secondary indexes over the entities of a crate.
+
+Indexes are built on first use, from the raw JSON-LD of the entities (so
+lazily read entities and columnar rows are not instantiated), and then
+updated incrementally as entities are added, deleted or modified.
+"""
+
+from .references import ReferenceIndex, ref_ids
+from .utils import is_url
+
+
+def _diff(old, new):
+    # items of old that are not in new, and items of new that are not in old
+    old_set, new_set = set(old), set(new)
+    return [_ for _ in old if _ not in new_set], [_ for _ in new if _ not in old_set]
+
+
+class PropertyIndex:
+    """\
+    Map the values of a property to the keys of the entities that have
+    them, in insertion order.
+    """
+
+    __slots__ = ("__map",)
+
+    def __init__(self):
+        self.__map = {}
+
+    def __len__(self):
+        return len(self.__map)
+
+    def add(self, value, key):
+        self.__map.setdefault(value, {})[key] = None
+
+    def remove(self, value, key):
+        keys = self.__map.get(value)
+        if keys is not None:
+            keys.pop(key, None)
+            if not keys:
+                del self.__map[value]
+
+    def get(self, value):
+        """\
+        Return the keys of the entities that have the given value, as a dict
+        (which must not be modified) whose keys are entity keys.
+        """
+        return self.__map.get(value) or {}
+
+
+def is_path(key):
+    """\
+    Whether the given entity key is a path relative to the crate's root.
+    """
+    return bool(key) and not key.startswith("#") and not is_url(key)
+
+
+def _split(path):
+    return [_ for _ in path.split("/") if _ and _ != "."]
+
+
+class _Node:
+
+    __slots__ = ("key", "children")
+
+    def __init__(self, key=None):
+        self.key = key
+        self.children = {}
+
+
+class PathTrie:
+    """\
+    The keys of the entities whose ids are relative paths (e.g., "data/"
+    and "data/a.txt"), as a tree of path components.
+
+    Leaves are stored as the bare keys rather than as nodes, to save memory.
+    If the keys of two entities have the same path components (e.g., "x"
+    and "x/"), the one added last wins.
+    """
+
+    __slots__ = ("__root", "__len")
+
+    def __init__(self):
+        self.__root = _Node()
+        self.__len = 0
+
+    def __len__(self):
+        return self.__len
+
+    def __find(self, parts):
+        node = self.__root
+        for name in parts:
+            if not isinstance(node, _Node):
+                return None
+            node = node.children.get(name)
+            if node is None:
+                return None
+        return node
+
+    def __contains__(self, key):
+        parts = _split(key)
+        if not parts:
+            return False
+        node = self.__find(parts)
+        return (node.key if isinstance(node, _Node) else node) == key
+
+    def add(self, key):
+        parts = _split(key)
+        if not parts:
+            return
+        node = self.__root
+        for name in parts[:-1]:
+            child = node.children.get(name)
+            if not isinstance(child, _Node):
+                child = node.children[name] = _Node(child)
+            node = child
+        child = node.children.get(parts[-1])
+        if isinstance(child, _Node):
+            if child.key is None:
+                self.__len += 1
+            child.key = key
+        else:
+            if child is None:
+                self.__len += 1
+            node.children[parts[-1]] = key
+
+    def remove(self, key):
+        parts = _split(key)
+        if not parts:
+            return
+        nodes = [self.__root]
+        for name in parts[:-1]:
+            node = nodes[-1].children.get(name)
+            if not isinstance(node, _Node):
+                return
+            nodes.append(node)
+        child = nodes[-1].children.get(parts[-1])
+        if isinstance(child, _Node):
+            if child.key != key:
+                return
+            child.key = None
+            if child.children:
+                self.__len -= 1
+                return
+        elif child != key:
+            return
+        self.__len -= 1
+        del nodes[-1].children[parts[-1]]
+        # prune the nodes that are left with neither a key nor children
+        for i in range(len(nodes) - 1, 0, -1):
+            if nodes[i].key is not None or nodes[i].children:
+                break
+            del nodes[i - 1].children[parts[i - 1]]
+
+    def keys(self, path=""):
+        """\
+        Iterate over the keys in the subtree at path (a relative path, with
+        or without a trailing slash, or "" for the whole tree), depth-first
+        and in insertion order. The key at path, if any, comes first.
+        """
+        node = self.__find(_split(path))
+        if node is None:
+            return
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if not isinstance(node, _Node):
+                yield node
+                continue
+            if node.key is not None:
+                yield node.key
+            stack.extend(reversed(node.children.values()))
+
+
+class EntityIndexes:
+    """\
+    The reference index, the property indexes, the path trie and the
+    adjacency lists (see neighbours) of a crate.
+
+    Entities are identified by key, and key_of(id_) must return the key of
+    the entity with the given @id. Property values are indexed as they are,
+    except references, which are indexed as ("@id", key), and booleans,
+    which are indexed as ("@bool", value) so they don't match 0 and 1.
+    Values that are neither references nor strings, numbers, booleans or
+    null are not indexed.
+    """
+
+    __slots__ = ("key_of", "refs", "properties", "paths", "adjacency")
+
+    def __init__(self, key_of):
+        self.key_of = key_of
+        self.refs = None
+        self.properties = {}
+        self.paths = None
+        # key -> tuple of (property name, target key) pairs
+        self.adjacency = {}
+
+    def __bool__(self):
+        return self.refs is not None or self.paths is not None or bool(self.properties) or bool(self.adjacency)
+
+    def targets(self, value):
+        return [self.key_of(_) for _ in ref_ids(value)]
+
+    def value_keys(self, value):
+        keys = []
+        for item in value if isinstance(value, list) else [value]:
+            if isinstance(item, dict):
+                id_ = item.get("@id")
+                if isinstance(id_, str):
+                    keys.append(("@id", self.key_of(id_)))
+            elif isinstance(item, bool):
+                keys.append(("@bool", item))
+            elif item is None or isinstance(item, (str, int, float)):
+                keys.append(item)
+        return keys
+
+    def neighbours(self, key, properties):
+        """\
+        Return the (property name, target key) pairs of the references in
+        properties, the JSON-LD of the entity with the given key. The result
+        is cached until the entity is changed, added or removed.
+        """
+        pairs = self.adjacency.get(key)
+        if pairs is None:
+            pairs = self.adjacency[key] = tuple(
+                (name, target) for name, value in properties.items() if not name.startswith("@")
+                for target in self.targets(value)
+            )
+        return pairs
+
+    def build_refs(self, items):
+        """\
+        Build the reference index from (key, JSON-LD) pairs.
+        """
+        self.refs = ReferenceIndex()
+        for key, properties in items:
+            self.__add_refs(key, properties)
+
+    def build(self, name, items):
+        """\
+        Build the index of the given property from (key, JSON-LD) pairs.
+        """
+        index = self.properties[name] = PropertyIndex()
+        for key, properties in items:
+            if name in properties:
+                for value in self.value_keys(properties[name]):
+                    index.add(value, key)
+        return index
+
+    def build_paths(self, keys):
+        """\
+        Build the path trie from entity keys.
+        """
+        self.paths = PathTrie()
+        for key in keys:
+            if is_path(key):
+                self.paths.add(key)
+
+    def __add_refs(self, key, properties, remove=False):
+        update = self.refs.remove if remove else self.refs.add
+        for name, value in properties.items():
+            if name.startswith("@"):
+                continue
+            pair = None
+            for target in self.targets(value):
+                if pair is None:
+                    pair = (key, name)
+                update(target, pair)
+
+    def add(self, key, properties, remove=False):
+        """\
+        Add (or remove) an entity with the given key and JSON-LD.
+        """
+        self.adjacency.pop(key, None)
+        if self.refs is not None:
+            self.__add_refs(key, properties, remove)
+        if self.paths is not None and is_path(key):
+            (self.paths.remove if remove else self.paths.add)(key)
+        for name, index in self.properties.items():
+            if name in properties:
+                update = index.remove if remove else index.add
+                for value in self.value_keys(properties[name]):
+                    update(value, key)
+
+    def remove(self, key, properties):
+        self.add(key, properties, remove=True)
+
+    def update(self, key, name, old, new):
+        """\
+        Update the indexes after the value of property name of the entity
+        with the given key changes from old to new (None if missing).
+        """
+        self.adjacency.pop(key, None)
+        if self.refs is not None and not name.startswith("@"):
+            pair = (key, name)
+            removed, added = _diff(self.targets(old), self.targets(new))
+            for target in removed:
+                self.refs.remove(target, pair)
+            for target in added:
+                self.refs.add(target, pair)
+        index = self.properties.get(name)
+        if index is not None:
+            removed, added = _diff(self.value_keys(old), self.value_keys(new))
+            for value in removed:
+                index.remove(value, key)
+            for value in added:
+                index.add(value, key)
@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+
+# Copyright 2019-2022 The University of Manchester, UK
+# Copyright 2020-2022 Vlaams Instituut voor Biotechnologie (VIB), BE
+# Copyright 2020-2022 Barcelona Supercomputing Center (BSC), ES
+# Copyright 2020-2022 Center for Advanced Studies, Research and Development in Sardinia (CRS4), IT
+# Copyright 2022 École Polytechnique Fédérale de Lausanne, CH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""\
+JSON encoding and decoding with optional fast backends.
+
+The fast backends (orjson, ujson, simdjson) are used when installed, with the
+standard library's json module as the fallback. Whatever the backend, dumps
+returns exactly what ``json.dumps(obj, indent=4, sort_keys=True)`` would.
+"""
+
+import json
+import math
+import re
+
+# in order of preference (orjson is fast, but needs re-indenting)
+DUMP_BACKENDS = ("ujson", "orjson", "json")
+LOAD_BACKENDS = ("orjson", "ujson", "simdjson", "json")
+
+# Fix-ups applied to the output of the fast encoders. They are safe to run
+# on the whole document because, in indented JSON, strings cannot contain
+# raw newlines (or tabs) and non-ASCII bytes can only appear within strings.
+_NON_ASCII_RE = re.compile(rb"[\x7f-\xff]+")
+# Floats only: integers are formatted the same way by all backends. Object
+# members and array elements are matched separately, since a literal prefix
+# makes the scan much faster.
+_NUMBER = rb"-?[0-9]+(?:\.[0-9]+(?:e[-+]?[0-9]+)?|e[-+]?[0-9]+)(?=,?\n)"
+_MEMBER_FLOAT_RE = re.compile(rb": (" + _NUMBER + rb")")
+_ELEMENT_FLOAT_RE = re.compile(rb"([\[,]\n *)(" + _NUMBER + rb")")
+# digits and minus signs to "0", for a quick check of array elements
+_NUMBERS_TO_ZERO = bytes.maketrans(b"-123456789", b"0" * 10)
+
+_modules = {}
+
+
+def _import(name):
+    try:
+        return _modules[name]
+    except KeyError:
+        pass
+    try:
+        if name == "orjson":
+            import orjson as module
+        elif name == "ujson":
+            import ujson as module
+        elif name == "simdjson":
+            import simdjson as module
+        else:
+            module = json
+    except ImportError:
+        module = None
+    _modules[name] = module
+    return module
+
+
+def available_backends(backends=LOAD_BACKENDS + DUMP_BACKENDS):
+    """\
+    Return the names of the backends that can be used, in order of
+    preference.
+    """
+    return [_ for _ in dict.fromkeys(backends) if _import(_) is not None]
+
+
+def _pick(backend, backends):
+    if backend is None:
+        return available_backends(backends)[0]
+    if backend not in backends:
+        raise ValueError(f"unknown backend: {backend!r}")
+    if _import(backend) is None:
+        raise ValueError(f"backend not available: {backend!r}")
+    return backend
+
+
+def _escape(m):
+    out = []
+    for c in m.group().decode("utf-8"):
+        n = ord(c)
+        if n > 0xffff:
+            n -= 0x10000
+            out.append("\\u%04x\\u%04x" % (0xd800 | (n >> 10), 0xdc00 | (n & 0x3ff)))
+        else:
+            out.append("\\u%04x" % n)
+    return "".join(out).encode("ascii")
+
+
+def _fix_up(data):
+    if not data.isascii() or b"\x7f" in data:
+        data = _NON_ASCII_RE.sub(_escape, data)
+    data = _MEMBER_FLOAT_RE.sub(lambda m: b": " + repr(float(m.group(1))).encode("ascii"), data)
+    if b"\n0" in data.translate(_NUMBERS_TO_ZERO, b" "):
+        # there are numbers in arrays
+        data = _ELEMENT_FLOAT_RE.sub(lambda m: m.group(1) + repr(float(m.group(2))).encode("ascii"), data)
+    return data
+
+
+def _reindent(data):
+    # orjson only supports two-space indentation. Turn each level into a tab,
+    # deepest first so that converted lines are not matched again, then
+    # expand the tabs (they cannot appear anywhere else in the output).
+    depth = 1
+    while b"\n" + b"  " * depth in data:
+        depth += 1
+    for level in range(depth - 1, 0, -1):
+        data = data.replace(b"\n" + b"  " * level, b"\n" + b"\t" * level)
+    return data.replace(b"\t", b"    ")
+
+
+def _has_non_finite(obj):
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, float):
+            if not math.isfinite(obj):
+                return True
+        elif isinstance(obj, dict):
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple)):
+            stack.extend(obj)
+    return False
+
+
+def _dumps_orjson(obj):
+    orjson = _import("orjson")
+    data = orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS)
+    # orjson writes NaN and infinities as null (so only look for them then)
+    if b"null" in data and _has_non_finite(obj):
+        raise ValueError("non-finite float")
+    return _fix_up(_reindent(data)).decode("ascii")
+
+
+def _dumps_ujson(obj):
+    ujson = _import("ujson")
+    data = ujson.dumps(
+        obj, indent=4, sort_keys=True, ensure_ascii=False, escape_forward_slashes=False
+    ).encode("utf-8")
+    return _fix_up(data).decode("ascii")
+
+
+def _dumps_json(obj):
+    return json.dumps(obj, indent=4, sort_keys=True)
+
+
+_DUMPS = {
+    "orjson": _dumps_orjson,
+    "ujson": _dumps_ujson,
+    "json": _dumps_json,
+}
+
+
+def dumps(obj, backend=None):
+    """\
+    Serialize obj to an indented JSON string with sorted keys.
+
+    The output is the same as ``json.dumps(obj, indent=4, sort_keys=True)``.
+    If a fast backend cannot handle the object (e.g., integers that do not
+    fit in 64 bits, non-string keys, lone surrogates), the stdlib encoder is
+    used instead (including for non-finite floats, which orjson writes as
+    null).
+    """
+    backend = _pick(backend, DUMP_BACKENDS)
+    try:
+        return _DUMPS[backend](obj)
+    except (TypeError, ValueError, OverflowError, UnicodeError):
+        if backend == "json":
+            raise
+    return _dumps_json(obj)
+
+
+def loads(data, backend=None):
+    """\
+    Deserialize a JSON document from a str or bytes object.
+    """
+    return _import(_pick(backend, LOAD_BACKENDS)).loads(data)
+
+
+def dump_graph(f, context, graph, backend=None):
+    """\
+    Write a JSON-LD document with the given @context and @graph to the text
+    stream f, serializing one entity at a time.
+
+    The graph can be any iterable of entities (dicts), so it never needs to
+    be held in memory. The output is the same as that of dumps for the
+    corresponding {"@context": context, "@graph": [...]} document.
+    """
+    backend = _pick(backend, DUMP_BACKENDS)
+    f.write('{\n    "@context": ' + dumps(context, backend).replace("\n", "\n    ") + ',\n    "@graph": [')
+    sep = first = "\n" + " " * 8
+    for entity in graph:
+        f.write(sep + dumps(entity, backend).replace("\n", first))
+        sep = "," + first
+    f.write("]\n}" if sep is first else "\n    ]\n}")
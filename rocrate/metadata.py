@@ -16,27 +16,325 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import errno
+import io
 import json
 import warnings
+import zipfile
+from functools import partial
+from pathlib import Path
 
+from . import jsonio
+from .archive import ZipArchive, ZipMember
 from .model.metadata import Metadata, LegacyMetadata
 
+CHUNK_SIZE = 1 << 16
+WHITESPACE = " \t\n\r"
 
-def read_metadata(metadata_path):
+
+class _JSONStream:
+    """\
+    Incremental reader for the JSON values in a text stream.
+
+    Only the unparsed part of the input is kept in memory: each value is
+    decoded with the stdlib decoder as soon as enough text is available.
+    Like json.load does within a document, object keys are shared across
+    all values read from the stream, unless a different object_pairs_hook
+    is given.
+    """
+
+    def __init__(self, f, object_pairs_hook=None):
+        self.f = f
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.chunk_size = CHUNK_SIZE
+        if object_pairs_hook is None:
+            memo = {}
+
+            def object_pairs_hook(pairs, intern_key=memo.setdefault):
+                return {intern_key(k, k): v for k, v in pairs}
+
+        self.decoder = json.JSONDecoder(object_pairs_hook=object_pairs_hook)
+
+    def _fill(self):
+        chunk = self.f.read(self.chunk_size)
+        if chunk:
+            self.buf = self.buf[self.pos:] + chunk
+            self.pos = 0
+        else:
+            self.eof = True
+
+    def peek(self):
+        while True:
+            buf, pos = self.buf, self.pos
+            while pos < len(buf) and buf[pos] in WHITESPACE:
+                pos += 1
+            self.pos = pos
+            if pos < len(buf) or self.eof:
+                return buf[pos:pos + 1]
+            self._fill()
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"expected {char!r} at position {self.pos}")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            else:
+                # a number could continue in the next chunk
+                if end < len(self.buf) or self.eof:
+                    self.chunk_size = CHUNK_SIZE
+                    self.pos = end
+                    return value
+            # grow the read size to keep large values linear
+            self._fill()
+            self.chunk_size *= 2
+
+    def items(self):
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            c = self.peek()
+            self.pos += 1
+            if c == "]":
+                return
+            if c != ",":
+                raise ValueError(f"expected ',' or ']' at position {self.pos - 1}")
+
+
+class _Interner:
+    """\
+    Deduplicate the strings and reference dicts of parsed graph entities.
+
+    Property keys, @id and @type values are replaced by a single shared
+    copy, as are reference dicts like {"@id": "#alice"}: these are very
+    common in large crates (e.g., every file having the same author), and
+    are only ever replaced, not modified in place, by the entity API.
+    Lists are never shared. The pairs method can be used as the
+    object_pairs_hook of a JSON decoder; entity does the same for an
+    already decoded graph entity. If refs is False, only strings are shared.
+    """
+
+    def __init__(self, refs=True):
+        self.strings = {}
+        self.refs = {} if refs else None
+
+    def pairs(self, pairs):
+        intern = self.strings.setdefault
+        if len(pairs) == 1 and self.refs is not None:
+            k, v = pairs[0]
+            if k == "@id" and v.__class__ is str:
+                try:
+                    return self.refs[v]
+                except KeyError:
+                    ref = self.refs[v] = {"@id": intern(v, v)}
+                    return ref
+        d = {intern(k, k): v for k, v in pairs}
+        v = d.get("@id")
+        if v.__class__ is str:
+            d["@id"] = intern(v, v)
+        v = d.get("@type")
+        if v.__class__ is str:
+            d["@type"] = intern(v, v)
+        elif v.__class__ is list:
+            d["@type"] = [intern(_, _) if _.__class__ is str else _ for _ in v]
+        return d
+
+    def value(self, v):
+        if v.__class__ is dict:
+            return self.pairs([
+                (k, self.value(x) if x.__class__ is dict or x.__class__ is list else x) for k, x in v.items()
+            ])
+        if v.__class__ is list:
+            return [self.value(x) if x.__class__ is dict or x.__class__ is list else x for x in v]
+        return v
+
+    def own(self, entity):
+        # graph items are modified by the reader (e.g., their @id is popped)
+        id_ = entity.get("@id") if entity.__class__ is dict else None
+        if id_.__class__ is str and self.refs is not None and self.refs.get(id_) is entity:
+            return dict(entity)
+        return entity
+
+    def entity(self, entity):
+        return self.own(self.value(entity))
+
+
+def _open(metadata_path, binary=False):
+    if isinstance(metadata_path, ZipMember):
+        f = metadata_path.open()
+        return f if binary else io.TextIOWrapper(f, encoding="utf-8")
+    return open(metadata_path, "rb") if binary else open(metadata_path, encoding="utf-8")
+
+
+def _iter_graph_python(metadata_path, members, interner=None):
+    found = False
+    with _open(metadata_path) as f:
+        stream = _JSONStream(f, None if interner is None else interner.pairs)
+        stream.expect("{")
+        c = "}" if stream.peek() == "}" else ","
+        while c == ",":
+            key = stream.value()
+            stream.expect(":")
+            if key == "@graph":
+                found = True
+                if interner is None:
+                    yield from stream.items()
+                else:
+                    yield from map(interner.own, stream.items())
+            else:
+                members[key] = stream.value()
+            c = stream.peek()
+            stream.pos += 1
+            if c not in ",}":
+                raise ValueError(f"expected ',' or '}}' at position {stream.pos - 1}")
+    if not found:
+        raise ValueError(f"{metadata_path} has no @graph")
+
+
+def _iter_graph_ijson(metadata_path, members, interner=None):
+    import ijson
+    # the coroutines run the C parser, if available, and build the values
+    graph, context = ijson.sendable_list(), ijson.sendable_list()
+    coros = [
+        ijson.items_coro(graph, "@graph.item", use_float=True),
+        ijson.items_coro(context, "@context", use_float=True),
+    ]
+    n_items = 0
+    try:
+        with _open(metadata_path, binary=True) as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                for c in coros:
+                    c.send(chunk)
+                n_items += len(graph)
+                yield from graph if interner is None else map(interner.entity, graph)
+                del graph[:]
+            for c in coros:
+                c.close()
+    except ijson.JSONError as e:
+        raise ValueError(f"invalid JSON: {e}") from e
+    n_items += len(graph)
+    yield from graph if interner is None else map(interner.entity, graph)
+    if context:
+        members["@context"] = context[0]
+    if not n_items:
+        # distinguish an empty @graph from a missing one
+        for _ in _iter_graph_python(metadata_path, {}):
+            pass
+
+
+def _iter_graph_loads(metadata_path, members, interner=None, backend=None):
+    with _open(metadata_path, binary=True) as f:
+        doc = jsonio.loads(f.read(), backend=backend)
+    if not isinstance(doc, dict) or "@graph" not in doc:
+        raise ValueError(f"{metadata_path} has no @graph")
+    graph = doc.pop("@graph")
+    members.update(doc)
+    if not isinstance(graph, list):
+        raise ValueError(f"{metadata_path}: @graph is not a list")
+    # release each entity as soon as it's been consumed
+    graph.reverse()
+    while graph:
+        yield graph.pop() if interner is None else interner.entity(graph.pop())
+
+
+def _ijson_available():
+    try:
+        import ijson  # noqa
+    except ImportError:
+        return False
+    return True
+
+
+STREAM_BACKENDS = {
+    "ijson": _iter_graph_ijson,
+    "python": _iter_graph_python,
+}
+# whole-document parsers: faster, but the raw text is held in memory
+for _name in jsonio.LOAD_BACKENDS:
+    STREAM_BACKENDS[_name] = partial(_iter_graph_loads, backend=_name)
+
+
+def iter_graph(metadata_path, backend=None, members=None, intern=False):
+    """\
+    Iterate over the entities in an RO-Crate metadata file's @graph, parsing
+    them incrementally.
+
+    The metadata path can also be a ZipMember, to read from a zipped crate
+    in place. If members is a dictionary, the other top-level members of the
+    metadata (e.g., "@context") are stored into it as they are found. The
+    backend can be "python" (the default), which scans the document structure
+    in Python and decodes each entity with the stdlib's C-accelerated
+    decoder, or "ijson", which requires the ijson package and runs its C
+    parser (yajl) when available. The backend can also be one of
+    jsonio.LOAD_BACKENDS: these parse the whole document at once, which is
+    faster but needs memory for its full text. If intern is True, strings
+    and reference dicts that occur in more than one entity (property keys,
+    @id and @type values, {"@id": ...} references) are shared among them,
+    so the reference dicts must not be modified in place; if intern is
+    "strings", only the strings are shared. Raise ValueError if the file is
+    not valid JSON or has no @graph.
+    """
+    if backend is None:
+        backend = "python"
+    try:
+        iter_graph_ = STREAM_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"unknown backend: {backend!r}")
+    interner = _Interner(refs=intern != "strings") if intern else None
+    return iter_graph_(metadata_path, {} if members is None else members, interner)
+
+
+def read_metadata(metadata_path, backend=None, intern=False):
     """\
     Read an RO-Crate metadata file.
 
     Return a tuple of two elements: the context; a dictionary that maps entity
-    ids to the entities themselves.
+    ids to the entities themselves. The graph is read with iter_graph, so it
+    is never held in memory as a list in addition to the dictionary. The
+    intern argument is passed to iter_graph (by default, nothing is shared
+    among entities).
     """
-    with open(metadata_path) as f:
-        metadata = json.load(f)
+    members = {}
     try:
-        context = metadata['@context']
-        graph = metadata['@graph']
+        graph = iter_graph(metadata_path, backend=backend, members=members, intern=intern)
+        entities = {_["@id"]: _ for _ in graph}
+        context = members["@context"]
     except KeyError:
         raise ValueError(f"{metadata_path} must have a @context and a @graph")
-    return context, {_["@id"]: _ for _ in graph}
+    return context, entities
+
+
+def locate_metadata(source):
+    """\
+    Find the metadata file of the crate at source, a directory or a zip file.
+
+    Return a tuple of two elements: the crate's source (a Path or, for zip
+    files, a ZipArchive); the metadata file path (a Path or a ZipMember).
+    """
+    source = Path(source)
+    if not source.exists():
+        raise FileNotFoundError(errno.ENOENT, f"'{source}' not found")
+    if zipfile.is_zipfile(source):
+        # read in place: member contents are only streamed out on write
+        source = ZipArchive(source)
+    metadata_path = source / Metadata.BASENAME
+    if not metadata_path.is_file():
+        metadata_path = source / LegacyMetadata.BASENAME
+    if not metadata_path.is_file():
+        raise ValueError(f"Not a valid RO-Crate: missing {Metadata.BASENAME}")
+    return source, metadata_path
 
 
 def _check_descriptor(descriptor, entities):
@@ -22,7 +22,6 @@ import atexit
 import os
 import tempfile
 from contextlib import redirect_stdout
-from galaxy2cwl import get_cwl_interface
 
 from .file import File
 
@@ -32,6 +31,9 @@ class ComputationalWorkflow(File):
     A scientific workflow that was used (or can be used) to analyze or
     generate files in the RO-Crate.
     """
+
+    __slots__ = ()
+
     TYPES = ["File", "SoftwareSourceCode", "ComputationalWorkflow"]
 
     def _empty(self):
@@ -64,16 +66,22 @@ class WorkflowDescription(ComputationalWorkflow):
     """\
     Abstract CWL description of the main workflow.
     """
+
+    __slots__ = ()
+
     TYPES = ["File", "SoftwareSourceCode", "HowTo"]
 
 
 # Legacy
 class Workflow(ComputationalWorkflow):
 
+    __slots__ = ()
+
     TYPES = ["File", "SoftwareSourceCode", "Workflow"]
 
 
 def galaxy_to_abstract_cwl(workflow_path, delete=True):
+    from galaxy2cwl import get_cwl_interface
     with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix=".cwl") as f:
         with redirect_stdout(f):
             get_cwl_interface.main(['1', str(workflow_path)])
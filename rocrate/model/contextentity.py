@@ -30,6 +30,8 @@ def add_hash(id_):
 
 class ContextEntity(Entity):
 
+    __slots__ = ()
+
     def __init__(self, crate, identifier=None, properties=None):
         super(ContextEntity, self).__init__(crate, identifier, properties)
 
@@ -22,4 +22,5 @@ from .entity import Entity
 
 
 class CreativeWork(Entity):
-    pass
+
+    __slots__ = ()
@@ -24,5 +24,7 @@ from .entity import Entity
 
 class DataEntity(Entity):
 
+    __slots__ = ()
+
     def write(self, base_path):
         pass
@@ -22,14 +22,16 @@ import errno
 import os
 import shutil
 from pathlib import Path
-from urllib.request import urlopen
 
 from .file_or_dir import FileOrDir
+from ..archive import ZipMember
 from ..utils import is_url, iso_now
 
 
 class Dataset(FileOrDir):
 
+    __slots__ = ()
+
     def _empty(self):
         val = {
             "@id": self.id,
@@ -44,24 +46,27 @@ class Dataset(FileOrDir):
     def write(self, base_path):
         out_path = Path(base_path) / self.id
         if is_url(str(self.source)):
+            from urllib.request import urlopen
             if self.validate_url and not self.fetch_remote:
                 with urlopen(self.source) as _:
-                    self._jsonld['sdDatePublished'] = iso_now()
+                    self['sdDatePublished'] = iso_now()
             if self.fetch_remote:
                 self.__get_parts(out_path)
         else:
             if self.source is None:
                 out_path.mkdir(parents=True, exist_ok=True)
             else:
-                if not Path(self.source).exists():
+                source = self.source if isinstance(self.source, ZipMember) else Path(self.source)
+                if not source.exists():
                     raise FileNotFoundError(
                         errno.ENOENT, os.strerror(errno.ENOENT), str(self.source)
                     )
                 out_path.mkdir(parents=True, exist_ok=True)
                 if not self.crate.source:
-                    self.crate._copy_unlisted(self.source, out_path)
+                    self.crate._copy_unlisted(self.source, out_path, self.id)
 
     def __get_parts(self, out_path):
+        from urllib.request import urlopen
         out_path.mkdir(parents=True, exist_ok=True)
         base = self.source.rstrip("/")
         for entry in self._jsonld.get("hasPart", []):
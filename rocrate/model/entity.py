@@ -21,12 +21,21 @@
 import uuid
 from collections.abc import MutableMapping
 
-from dateutil.parser import isoparse
 from .. import vocabs
 
 
 class Entity(MutableMapping):
 
+    __slots__ = ("crate", "_id", "_canonical_id", "_jsonld", "__weakref__")
+
+    # incremented whenever a subclass is defined, so that caches of the class
+    # hierarchy (see registry.TypeRegistry) know when to rebuild
+    _subclass_generation = 0
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        Entity._subclass_generation += 1
+
     def __init__(self, crate, identifier=None, properties=None):
         self.crate = crate
         if identifier:
@@ -57,12 +66,26 @@ class Entity(MutableMapping):
     @property
     def _default_type(self):
         clsName = self.__class__.__name__
-        if clsName in vocabs.RO_CRATE["@context"]:
-            return clsName
-        return "Thing"
+        try:
+            vocabs.term_to_uri(clsName)
+        except KeyError:
+            return "Thing"
+        return clsName
+
+    @property
+    def id(self):
+        return self._id
+
+    @id.setter
+    def id(self, value):
+        self._id = value
+        self._canonical_id = None
 
     def canonical_id(self):
-        return self.crate.resolve_id(self.id)
+        # cached, since it's computed for each hash and crate lookup
+        if self._canonical_id is None:
+            self._canonical_id = self.crate.resolve_id(self.id)
+        return self._canonical_id
 
     def __hash__(self):
         return hash(self.canonical_id())
@@ -97,12 +120,16 @@ class Entity(MutableMapping):
             raise KeyError(f"cannot set '{key}'")
         values = value if isinstance(value, list) else [value]
         ref_values = [{"@id": _.id} if isinstance(_, Entity) else _ for _ in values]
-        self._jsonld[key] = ref_values if isinstance(value, list) else ref_values[0]
+        old = self._jsonld.get(key)
+        new = self._jsonld[key] = ref_values if isinstance(value, list) else ref_values[0]
+        self.crate._update_indexes(self, key, old, new)
 
     def __delitem__(self, key: str):
         if key.startswith("@"):
             raise KeyError(f"cannot delete '{key}'")
+        old = self._jsonld[key]
         del self._jsonld[key]
+        self.crate._update_indexes(self, key, old, None)
 
     def popitem(self):
         raise NotImplementedError
@@ -131,10 +158,22 @@ class Entity(MutableMapping):
     def type(self):
         return self._jsonld['@type']
 
+    @type.setter
+    def type(self, value):
+        old = self._jsonld['@type']
+        if not isinstance(self._jsonld, dict):
+            # a view of a file table row, which only holds plain Files
+            self.crate._detach(self)
+        self._jsonld['@type'] = value
+        self.crate._update_indexes(self, "@type", old, value)
+
     @property
     def datePublished(self):
         d = self.get('datePublished')
-        return d if not d else isoparse(d)
+        if not d:
+            return d
+        from dateutil.parser import isoparse
+        return isoparse(d)
 
     @datePublished.setter
     def datePublished(self, value):
@@ -155,6 +194,8 @@ class Entity(MutableMapping):
             current_value = self._jsonld[key] = [current_value]
         if not isinstance(value, list):
             value = [value]
-        current_value.extend([{"@id": _.id} if isinstance(_, Entity) else _ for _ in value])
+        new = [{"@id": _.id} if isinstance(_, Entity) else _ for _ in value]
+        current_value.extend(new)
+        self.crate._update_indexes(self, key, None, new)
         if compact and len(current_value) == 1:
             self._jsonld[key] = current_value[0]
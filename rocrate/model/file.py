@@ -20,17 +20,18 @@
 
 from pathlib import Path
 import shutil
-import urllib.request
 import warnings
-from http.client import HTTPResponse
 from io import BytesIO, StringIO
 
 from .file_or_dir import FileOrDir
+from ..archive import ZipMember
 from ..utils import is_url, iso_now
 
 
 class File(FileOrDir):
 
+    __slots__ = ()
+
     def _empty(self):
         val = {
             "@id": self.id,
@@ -47,18 +48,22 @@ class File(FileOrDir):
                 out_file.write(self.source.getvalue())
         elif is_url(str(self.source)):
             if self.fetch_remote or self.validate_url:
+                import urllib.request
+                from http.client import HTTPResponse
                 with urllib.request.urlopen(self.source) as response:
                     if self.validate_url:
                         if isinstance(response, HTTPResponse):
-                            self._jsonld.update({
-                                'contentSize': response.getheader('Content-Length'),
-                                'encodingFormat': response.getheader('Content-Type')
-                            })
+                            # via item assignment, to keep the crate's indexes up to date
+                            self['contentSize'] = response.getheader('Content-Length')
+                            self['encodingFormat'] = response.getheader('Content-Type')
                         if not self.fetch_remote:
-                            self._jsonld['sdDatePublished'] = iso_now()
+                            self['sdDatePublished'] = iso_now()
                     if self.fetch_remote:
                         out_file_path.parent.mkdir(parents=True, exist_ok=True)
                         urllib.request.urlretrieve(response.url, out_file_path)
+        elif isinstance(self.source, ZipMember):
+            out_file_path.parent.mkdir(parents=True, exist_ok=True)
+            self.source.copy(out_file_path)
         elif self.source is None:
             # Allows to record a File entity whose @id does not exist, see #73
             warnings.warn(f"No source for {self.id}")
@@ -25,8 +25,18 @@ from .data_entity import DataEntity
 from ..utils import is_url
 
 
+def _is_plain_path(path):
+    # a relative path that Path(path).as_posix() would leave unchanged
+    if not path or path[0] == "/" or "\\" in path or ":" in path:
+        return False
+    segments = path.split("/")
+    return "" not in segments and "." not in segments
+
+
 class FileOrDir(DataEntity):
 
+    __slots__ = ("source", "fetch_remote", "validate_url")
+
     def __init__(self, crate, source=None, dest_path=None, fetch_remote=False,
                  validate_url=False, properties=None):
         if properties is None:
@@ -34,16 +44,20 @@ class FileOrDir(DataEntity):
         self.fetch_remote = fetch_remote
         self.validate_url = validate_url
         self.source = source
+        identifier = self.source_identifier(source, dest_path, fetch_remote)
+        super().__init__(crate, identifier, properties)
+
+    # Compute the (unformatted) ID for the given source and destination path
+    def source_identifier(self, source, dest_path=None, fetch_remote=False):
         if dest_path:
+            if isinstance(dest_path, str) and _is_plain_path(dest_path):
+                return dest_path
             dest_path = Path(dest_path)
             if dest_path.is_absolute():
                 raise ValueError("if provided, dest_path must be relative")
-            identifier = dest_path.as_posix()
-        else:
-            if not isinstance(source, (str, Path)):
-                raise ValueError("dest_path must be provided if source is not a path or URI")
-            if is_url(str(source)):
-                identifier = os.path.basename(source) if fetch_remote else source
-            else:
-                identifier = "./" if source == "./" else os.path.basename(source)
-        super().__init__(crate, identifier, properties)
+            return dest_path.as_posix()
+        if not isinstance(source, (str, Path)):
+            raise ValueError("dest_path must be provided if source is not a path or URI")
+        if is_url(str(source)):
+            return os.path.basename(source) if fetch_remote else source
+        return "./" if source == "./" else os.path.basename(source)
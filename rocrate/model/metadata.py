@@ -18,11 +18,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import json
 from pathlib import Path
 
 from .file import File
 from .dataset import Dataset
+from .. import jsonio
 
 
 WORKFLOW_PROFILE = "https://w3id.org/workflowhub/workflow-ro-crate/1.0"
@@ -32,6 +32,9 @@ class Metadata(File):
     """\
     RO-Crate metadata file.
     """
+
+    __slots__ = ("extra_terms",)
+
     BASENAME = "ro-crate-metadata.json"
     PROFILE = "https://w3id.org/ro/crate/1.1"
 
@@ -57,22 +60,28 @@ class Metadata(File):
                "about": {"@id": "./"}}
         return val
 
-    # Generate the crate's `ro-crate-metadata.json`.
-    # @return [String] The rendered JSON-LD as a "prettified" string.
-    def generate(self):
-        graph = []
-        for entity in self.crate.get_entities():
-            graph.append(entity.properties())
+    def _context(self):
         context = f'{self.PROFILE}/context'
         if self.extra_terms:
             context = [context, self.extra_terms]
-        return {'@context': context, '@graph': graph}
+        return context
+
+    def _graph(self):
+        for entity in self.crate.get_entities():
+            properties = entity.properties()
+            # entities stored in a FileTable have a mapping view
+            yield properties if isinstance(properties, dict) else dict(properties)
+
+    # Generate the crate's `ro-crate-metadata.json`.
+    # @return [String] The rendered JSON-LD as a "prettified" string.
+    def generate(self):
+        return {'@context': self._context(), '@graph': list(self._graph())}
 
     def write(self, base_path):
         write_path = Path(base_path) / self.id
-        as_jsonld = self.generate()
+        # stream the entities, so the whole document is never in memory
         with open(write_path, 'w') as outfile:
-            json.dump(as_jsonld, outfile, indent=4, sort_keys=True)
+            jsonio.dump_graph(outfile, self._context(), self._graph())
 
     @property
     def root(self) -> Dataset:
@@ -81,6 +90,8 @@ class Metadata(File):
 
 class LegacyMetadata(Metadata):
 
+    __slots__ = ()
+
     BASENAME = "ro-crate-metadata.jsonld"
     PROFILE = "https://w3id.org/ro/crate/1.0"
 
@@ -23,6 +23,8 @@ from .contextentity import ContextEntity
 
 class Person(ContextEntity):
 
+    __slots__ = ()
+
     def __init__(self, crate, identifier=None, properties=None):
         super(Person, self).__init__(crate, identifier, properties)
 
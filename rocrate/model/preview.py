@@ -21,7 +21,6 @@
 import os
 from pathlib import Path
 
-from jinja2 import Template
 from .file import File
 
 
@@ -31,6 +30,9 @@ class Preview(File):
 
     This object holds a preview of an RO Crate in HTML format_
     """
+
+    __slots__ = ()
+
     BASENAME = "ro-crate-preview.html"
 
     def __init__(self, crate, source=None, properties=None):
@@ -46,6 +48,7 @@ class Preview(File):
         return val
 
     def generate_html(self):
+        from jinja2 import Template
         base_path = os.path.abspath(os.path.dirname(__file__))
         template = open(os.path.join(base_path, '..', 'templates', 'preview_template.html.j2'))
         src = Template(template.read())
@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+
+# Copyright 2019-2022 The University of Manchester, UK
+# Copyright 2020-2022 Vlaams Instituut voor Biotechnologie (VIB), BE
+# Copyright 2020-2022 Barcelona Supercomputing Center (BSC), ES
+# Copyright 2020-2022 Center for Advanced Studies, Research and Development in Sardinia (CRS4), IT
+# Copyright 2022 École Polytechnique Fédérale de Lausanne, CH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""\
+Mapping of JSON-LD @type names to entity classes.
+"""
+
+from .entity import Entity
+from .contextentity import ContextEntity
+from .data_entity import DataEntity
+from .file_or_dir import FileOrDir
+from ..utils import subclasses
+
+# maximum number of distinct @type lists whose class is cached
+LIST_CACHE_SIZE = 1024
+
+
+class TypeRegistry:
+    """\
+    Map @type names to the classes used to instantiate entities read from
+    the metadata.
+
+    Subclasses of base are discovered automatically, each one taking the
+    type name equal to its class name. The map is built on first use and
+    rebuilt when a new Entity subclass is defined. Classes can also be
+    registered explicitly, for any type names, with register.
+
+    When an entity has more than one type, the class is chosen by priority:
+    explicitly registered classes come first (the most recently registered
+    first); then discovered classes, subclasses before their parents. Among
+    discovered classes with the same name, the last one found is used.
+    """
+
+    def __init__(self, base, fallback):
+        self.base = base
+        self.fallback = fallback
+        self.__explicit = []  # (name, cls), in registration order
+        self.__map = None
+        self.__list_cache = {}
+        self.__generation = None
+
+    def register(self, cls, *type_names):
+        """\
+        Use cls for entities having any of type_names among their types
+        (by default, the class name).
+        """
+        if not (isinstance(cls, type) and issubclass(cls, Entity)):
+            raise ValueError(f"{cls!r} is not an Entity subclass")
+        for name in type_names or [cls.__name__]:
+            self.__explicit.append((name, cls))
+        self.__map = None
+
+    def __build(self):
+        # type name -> (priority, class), lower values having priority
+        map_ = {}
+        for i, cls in enumerate(subclasses(self.base)):
+            # if two classes have the same name, the last one wins
+            map_[cls.__name__] = (i, cls)
+        explicit = set()
+        for i, (name, cls) in enumerate(reversed(self.__explicit)):
+            if name not in explicit:
+                explicit.add(name)
+                map_[name] = (i - len(self.__explicit), cls)
+        self.__map = map_
+        self.__list_cache = {}
+        self.__generation = Entity._subclass_generation
+        return map_
+
+    @property
+    def type_map(self):
+        """\
+        Mapping of type names to (priority, class) pairs.
+        """
+        if self.__map is None or self.__generation != Entity._subclass_generation:
+            return self.__build()
+        return self.__map
+
+    def get(self, types):
+        """\
+        Return the class for the given type name or list of type names, or
+        the fallback class if none of them is registered.
+        """
+        map_ = self.type_map
+        if isinstance(types, str):
+            entry = map_.get(types) or map_.get(types.strip())
+            return entry[1] if entry else self.fallback
+        # large crates tend to repeat the same few type lists
+        try:
+            key = tuple(types)
+            return self.__list_cache[key]
+        except (KeyError, TypeError):
+            pass
+        best = None
+        for t in types:
+            entry = map_.get(t) or map_.get(t.strip())
+            if entry and (best is None or entry[0] < best[0]):
+                best = entry
+        cls = best[1] if best else self.fallback
+        if len(self.__list_cache) < LIST_CACHE_SIZE:
+            try:
+                self.__list_cache[key] = cls
+            except TypeError:
+                pass
+        return cls
+
+    def pick(self, json_entity):
+        """\
+        Return the class for the JSON-LD entity, based on its @type.
+        """
+        try:
+            types = json_entity["@type"]
+        except KeyError:
+            raise ValueError(f'entity {json_entity["@id"]!r} has no @type')
+        return self.get(types)
+
+
+DATA_ENTITY_TYPES = TypeRegistry(FileOrDir, DataEntity)
+CONTEXT_ENTITY_TYPES = TypeRegistry(ContextEntity, ContextEntity)
+
+
+def register_entity_class(cls, *type_names):
+    """\
+    Use cls, a DataEntity or ContextEntity subclass, to instantiate entities
+    of the given types (by default, the class name) when reading crates.
+    """
+    if isinstance(cls, type) and issubclass(cls, DataEntity):
+        DATA_ENTITY_TYPES.register(cls, *type_names)
+    elif isinstance(cls, type) and issubclass(cls, ContextEntity):
+        CONTEXT_ENTITY_TYPES.register(cls, *type_names)
+    else:
+        raise ValueError(f"{cls!r} is neither a DataEntity nor a ContextEntity subclass")
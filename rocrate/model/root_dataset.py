@@ -19,12 +19,20 @@
 # limitations under the License.
 
 from .dataset import Dataset
+from .entity import Entity
 from ..utils import iso_now
 
+# the storage of Entity._jsonld, which RootDataset wraps in a property
+_JSONLD = Entity._jsonld
+
 
 class RootDataset(Dataset):
 
+    # keys of the entities to be removed from hasPart (see _remove_part)
+    __slots__ = ("_removed_parts",)
+
     def __init__(self, crate, source=None, dest_path=None, properties=None):
+        self._removed_parts = None
         if source is None and dest_path is None:
             dest_path = "./"
         super().__init__(
@@ -43,3 +51,54 @@ class RootDataset(Dataset):
             "datePublished": iso_now(),
         }
         return val
+
+    @property
+    def _jsonld(self):
+        if self._removed_parts:
+            self._compact_parts()
+        return _JSONLD.__get__(self)
+
+    @_jsonld.setter
+    def _jsonld(self, value):
+        _JSONLD.__set__(self, value)
+
+    def _remove_part(self, key):
+        # Removing an entry from the middle of hasPart takes linear time, so
+        # references are only dropped (all at once) the next time the
+        # properties are accessed, and deleting data entities one by one
+        # takes constant time each.
+        if self._removed_parts is None:
+            self._removed_parts = set()
+        self._removed_parts.add(key)
+
+    def _compact_parts(self):
+        removed, self._removed_parts = self._removed_parts, None
+        jsonld = _JSONLD.__get__(self)
+        parts = jsonld.get("hasPart")
+        if parts is None:
+            return
+        key_of = self.crate._key_of
+        parts = [_ for _ in (parts if isinstance(parts, list) else [parts])
+                 if not isinstance(_, dict) or key_of(_.get("@id", "")) not in removed]
+        if parts:
+            jsonld["hasPart"] = parts
+        else:
+            jsonld.pop("hasPart", None)
+
+    def append_to(self, key, value, compact=False):
+        removed = self._removed_parts
+        if key != "hasPart" or not removed or compact:
+            return super().append_to(key, value, compact)
+        key_of = self.crate._key_of
+        for v in (value if isinstance(value, list) else [value]):
+            id_ = v.id if isinstance(v, Entity) else v.get("@id") if isinstance(v, dict) else None
+            if id_ is not None and key_of(id_) in removed:
+                # added back: the pending removal must not apply to it
+                return super().append_to(key, value, compact)
+        # new entries are appended after the ones to be removed, which stay
+        # pending (so that adding and deleting can be interleaved cheaply)
+        self._removed_parts = None
+        try:
+            super().append_to(key, value, compact)
+        finally:
+            self._removed_parts = removed
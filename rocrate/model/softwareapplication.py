@@ -22,6 +22,8 @@ from .creativework import CreativeWork
 
 class SoftwareApplication(ContextEntity, CreativeWork):
 
+    __slots__ = ()
+
     def _empty(self):
         return {
             "@id": self.id,
@@ -21,6 +21,8 @@ from .file import File
 
 class TestDefinition(File):
 
+    __slots__ = ()
+
     def _empty(self):
         return {
             "@id": self.id,
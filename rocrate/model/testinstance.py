@@ -21,6 +21,8 @@ from .contextentity import ContextEntity
 
 class TestInstance(ContextEntity):
 
+    __slots__ = ()
+
     def _empty(self):
         return {
             "@id": self.id,
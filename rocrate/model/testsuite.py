@@ -21,6 +21,8 @@ from .contextentity import ContextEntity
 
 class TestSuite(ContextEntity):
 
+    __slots__ = ()
+
     def _empty(self):
         return {
             "@id": self.id,
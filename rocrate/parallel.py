@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+
+# Copyright 2019-2022 The University of Manchester, UK
+# Copyright 2020-2022 Vlaams Instituut voor Biotechnologie (VIB), BE
+# Copyright 2020-2022 Barcelona Supercomputing Center (BSC), ES
+# Copyright 2020-2022 Center for Advanced Studies, Research and Development in Sardinia (CRS4), IT
+# Copyright 2022 École Polytechnique Fédérale de Lausanne, CH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""\
+Load many crates in parallel.
+"""
+
+import os
+import time
+from collections import Counter, namedtuple
+from itertools import repeat
+
+from .archive import ZipArchive
+from .metadata import find_root_entity_id, locate_metadata, read_metadata
+from .rocrate import ROCrate
+
+MODES = ("summary", "graph", "crate")
+
+LoadResult = namedtuple("LoadResult", ["path", "value", "error", "elapsed"])
+LoadResult.__doc__ = """\
+Outcome of loading a crate: value is None if there was an error, in which
+case error is a string describing it. Elapsed is the loading time in seconds.
+"""
+
+
+def _ids(value):
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        value = [value]
+    return [_["@id"] if isinstance(_, dict) else _ for _ in value]
+
+
+def summarize(source):
+    """\
+    Read the metadata of the crate at source (a directory or a zip file) and
+    return a dictionary summarizing it: the root dataset's properties, except
+    hasPart, which is replaced by its length ("n_parts"); the number of
+    entities of each type; the ids of mainEntity and conformsTo (as declared
+    by the metadata descriptor). Entities are not instantiated.
+    """
+    archive, metadata_path = locate_metadata(source)
+    try:
+        # the entities are not handed out, so references can be shared
+        _, entities = read_metadata(metadata_path, intern=True)
+    finally:
+        if isinstance(archive, ZipArchive):
+            archive.close()
+    metadata_id, root_id = find_root_entity_id(entities)
+    root = dict(entities[root_id])
+    n_parts = len(_ids(root.pop("hasPart", None)))
+    types = Counter()
+    for entity in entities.values():
+        t = entity.get("@type", [])
+        types.update(t if isinstance(t, list) else [t])
+    main_entity = _ids(root.get("mainEntity"))
+    return {
+        "root": root,
+        "n_parts": n_parts,
+        "n_entities": len(entities),
+        "types": dict(types),
+        "mainEntity": main_entity[0] if main_entity else None,
+        "conformsTo": _ids(entities[metadata_id].get("conformsTo")),
+    }
+
+
+def _load(path, mode):
+    t0 = time.perf_counter()
+    try:
+        if mode == "summary":
+            value = summarize(path)
+        else:
+            value = ROCrate(path, metadata_only=(mode == "graph"))
+    except Exception as e:
+        return LoadResult(path, None, f"{e.__class__.__name__}: {e}", time.perf_counter() - t0)
+    return LoadResult(path, value, None, time.perf_counter() - t0)
+
+
+def load_many(paths, workers=None, mode="summary", chunksize=None):
+    """\
+    Load the crates at paths (directories or zip files) in a pool of worker
+    processes.
+
+    mode can be "summary" (see the summarize function), "graph" (crates
+    read with metadata_only=True) or "crate" (regular crates, whose data
+    entities can read the payload files). workers defaults to the number of
+    CPUs; if it's 1, crates are loaded in the current process.
+
+    Return a list of LoadResult objects, in the same order as paths. Errors
+    raised while loading a crate (e.g., if it's not a valid RO-Crate) are
+    reported in the corresponding result.
+    """
+    if mode not in MODES:
+        raise ValueError(f"unknown mode: {mode!r}")
+    paths = list(paths)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers must be a positive integer")
+    if workers == 1 or len(paths) < 2:
+        return [_load(_, mode) for _ in paths]
+    if chunksize is None:
+        # fewer round trips, while keeping the workers evenly loaded
+        chunksize = max(1, min(64, len(paths) // (4 * workers)))
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_load, paths, repeat(mode), chunksize=chunksize))
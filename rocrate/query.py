@@ -0,0 +1,290 @@
+#!/usr/bin/env python
+
+# Copyright 2019-2022 The University of Manchester, UK
+# Copyright 2020-2022 Vlaams Instituut voor Biotechnologie (VIB), BE
+# Copyright 2020-2022 Barcelona Supercomputing Center (BSC), ES
+# Copyright 2020-2022 Center for Advanced Studies, Research and Development in Sardinia (CRS4), IT
+# Copyright 2022 École Polytechnique Fédérale de Lausanne, CH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""\
+A small query language over the entity graph of a crate.
+
+A query is a start followed by zero or more steps, e.g.:
+
+    ./ > mainEntity > input|output [FormalParameter] < exampleOfWork [File]
+
+reads "the File entities whose exampleOfWork is one of the FormalParameter
+entities that are inputs or outputs of the main entity of the root
+dataset". The start can be:
+
+* an entity id, e.g. ./ or "#my param" (in double quotes if it contains
+  spaces or any of <>[]()");
+* * for all entities.
+
+Steps are:
+
+* > p1|p2: follow the references in properties p1 or p2 (> * for any);
+* < p1|p2: go back to the entities that refer to the current ones via p1
+  or p2 (< * for any);
+* [T1|T2]: keep the entities whose @type includes T1 or T2;
+* (p = v): keep the entities that have v among the values of p, where v is
+  a JSON value; as in ROCrate.find, strings also match references to the
+  entity with that id.
+
+A query is compiled once (see compile_query) into a pipeline of
+generators over entity keys. The filters that directly follow a * start
+are looked up in the crate's type and property indexes (see ROCrate.find),
+forward steps use the cached adjacency lists (see ROCrate.walk) and
+backward steps use the reference index (see ROCrate.referrers), so none
+of them needs a scan of the graph. Results are streamed, without
+duplicates, and only the entities that are returned are instantiated.
+"""
+
+import json
+import re
+from functools import lru_cache
+
+from .utils import get_norm_value
+
+_TOKEN_RE = re.compile(r"""
+    \s*(?:
+        (?P<arrow>[<>])
+        | \[(?P<types>[^\]]*)\]
+        | \((?P<filter>[^)]*)\)
+        | (?P<string>"(?:[^"\\]|\\.)*")
+        | (?P<word>[^\s<>\[\]()"]+)
+    )""", re.VERBOSE)
+
+
+def _tokens(text):
+    pos, end = 0, len(text.rstrip())
+    while pos < end:
+        m = _TOKEN_RE.match(text, pos)
+        if m is None:
+            raise ValueError(f"invalid query {text!r}: unexpected character at position {pos}")
+        pos = m.end()
+        yield m.lastgroup, m.group(m.lastgroup)
+
+
+def _names(text):
+    # "a|b" -> frozenset, "*" -> None (any)
+    names = frozenset(_.strip() for _ in text.split("|"))
+    if "" in names:
+        raise ValueError(f"invalid names: {text!r}")
+    return None if names == {"*"} else names
+
+
+class _Start:
+
+    __slots__ = ("id",)
+
+    def __init__(self, id_):
+        self.id = id_
+
+    def __repr__(self):
+        return f"start {self.id!r}"
+
+    def run(self, crate, keys):
+        key = crate._key_of(self.id)
+        if crate._properties(key) is not None:
+            yield key
+
+
+class _Select:
+    # all entities, or those matching the (name, value) conditions
+
+    __slots__ = ("conditions",)
+
+    def __init__(self, conditions=()):
+        self.conditions = list(conditions)
+
+    def __repr__(self):
+        if not self.conditions:
+            return "all"
+        return "select " + " and ".join(f"{n} = {v!r}" for n, v in self.conditions)
+
+    def run(self, crate, keys):
+        if not self.conditions:
+            return crate._all_keys()
+        return iter(crate._find_keys(self.conditions))
+
+
+class _Follow:
+
+    __slots__ = ("names",)
+
+    def __init__(self, names):
+        self.names = names
+
+    def __repr__(self):
+        return f"follow {'*' if self.names is None else '|'.join(sorted(self.names))}"
+
+    def run(self, crate, keys):
+        seen = set()
+        names = self.names
+        for key in keys:
+            pairs = crate._neighbours(key)
+            if pairs is None:
+                continue
+            for name, target in pairs:
+                if (names is None or name in names) and target not in seen:
+                    seen.add(target)
+                    yield target
+
+
+class _Back:
+
+    __slots__ = ("names",)
+
+    def __init__(self, names):
+        self.names = names
+
+    def __repr__(self):
+        return f"back {'*' if self.names is None else '|'.join(sorted(self.names))}"
+
+    def run(self, crate, keys):
+        seen = set()
+        names = self.names
+        for key in keys:
+            for source, name in crate._referrer_keys(key):
+                if (names is None or name in names) and source not in seen:
+                    seen.add(source)
+                    yield source
+
+
+class _IsA:
+
+    __slots__ = ("types",)
+
+    def __init__(self, types):
+        self.types = types
+
+    def __repr__(self):
+        return f"is a {'|'.join(sorted(self.types))}"
+
+    def run(self, crate, keys):
+        types = self.types
+        for key in keys:
+            properties = crate._properties(key)
+            if properties is not None and not types.isdisjoint(get_norm_value(properties, "@type")):
+                yield key
+
+
+class _Has:
+
+    __slots__ = ("name", "value")
+
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+
+    def __repr__(self):
+        return f"has {self.name} = {self.value!r}"
+
+    def run(self, crate, keys):
+        wanted = set(crate._match_keys(self.value))
+        name = self.name
+        for key in keys:
+            properties = crate._properties(key)
+            if properties is None or name not in properties:
+                continue
+            if any(_ in wanted for _ in crate._value_keys(properties[name])):
+                yield key
+
+
+def _parse_filter(text):
+    name, sep, value = text.partition("=")
+    name = name.strip()
+    if not sep or not name:
+        raise ValueError(f"invalid filter: ({text})")
+    try:
+        value = json.loads(value)
+    except ValueError:
+        raise ValueError(f"invalid value in filter: ({text})")
+    return name, value
+
+
+class Query:
+    """\
+    A compiled query: a list of steps, each of which maps a stream of entity
+    keys to another. Use compile_query to create one.
+    """
+
+    __slots__ = ("text", "steps")
+
+    def __init__(self, text, steps):
+        self.text = text
+        self.steps = steps
+
+    def __repr__(self):
+        return f"<Query {self.text!r}: {' | '.join(repr(_) for _ in self.steps)}>"
+
+    def run(self, crate):
+        """\
+        Iterate over the entities of crate that match this query.
+        """
+        keys = None
+        for step in self.steps:
+            keys = step.run(crate, keys)
+        for key in keys:
+            entity = crate._by_key(key)
+            if entity is not None:
+                yield entity
+
+
+@lru_cache(maxsize=256)
+def compile_query(text):
+    """\
+    Compile a query (see the module's docstring) into a Query object.
+    Raise ValueError if the query is not valid.
+    """
+    tokens = list(_tokens(text))
+    if not tokens:
+        raise ValueError("empty query")
+    kind, value = tokens[0]
+    if kind == "word" and value == "*":
+        steps = [_Select()]
+    elif kind in ("word", "string"):
+        steps = [_Start(json.loads(value) if kind == "string" else value)]
+    else:
+        raise ValueError(f"invalid query {text!r}: it must start with an id or *")
+    i = 1
+    while i < len(tokens):
+        kind, value = tokens[i]
+        if kind == "arrow":
+            if i + 1 == len(tokens) or tokens[i + 1][0] != "word":
+                raise ValueError(f"invalid query {text!r}: {value} must be followed by property names or *")
+            names = _names(tokens[i + 1][1])
+            steps.append(_Follow(names) if value == ">" else _Back(names))
+            i += 2
+            continue
+        if kind == "types":
+            types = _names(value)
+            if types is None:
+                raise ValueError(f"invalid query {text!r}: [*] is not a type")
+            step = _IsA(types)
+            condition = ("@type", sorted(types))
+        elif kind == "filter":
+            step = _Has(*_parse_filter(value))
+            condition = (step.name, step.value)
+        else:
+            raise ValueError(f"invalid query {text!r}: unexpected {value!r}")
+        # filters right after a * start are turned into index lookups
+        if isinstance(steps[-1], _Select):
+            steps[-1].conditions.append(condition)
+        else:
+            steps.append(step)
+        i += 1
+    return Query(text, steps)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+
+# Copyright 2019-2022 The University of Manchester, UK
+# Copyright 2020-2022 Vlaams Instituut voor Biotechnologie (VIB), BE
+# Copyright 2020-2022 Barcelona Supercomputing Center (BSC), ES
+# Copyright 2020-2022 Center for Advanced Studies, Research and Development in Sardinia (CRS4), IT
+# Copyright 2022 École Polytechnique Fédérale de Lausanne, CH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""\
+Reverse index of the references between the entities of a crate.
+
+A reference is a property value (or list item) of the form {"@id": ...}.
+The index maps the key of each referenced entity to the (source key,
+property name) pairs of the references to it, so finding the entities
+that point at a given one doesn't require scanning the whole graph.
+"""
+
+
+def ref_ids(value):
+    """\
+    Yield the @id of each reference in a property value.
+    """
+    for item in value if isinstance(value, list) else [value]:
+        if isinstance(item, dict):
+            id_ = item.get("@id")
+            if isinstance(id_, str):
+                yield id_
+
+
+class ReferenceIndex:
+    """\
+    Map target keys to the (source key, property name) pairs referring to
+    them, in insertion order.
+
+    A pair is added once, however many times the property refers to the
+    target, so the references from a property must be removed (or added)
+    all at once, i.e., with the property's whole value.
+    """
+
+    __slots__ = ("__map",)
+
+    def __init__(self):
+        # target -> pair, or target -> {pair: None} for two or more pairs:
+        # most entities are referenced only once (e.g., from hasPart)
+        self.__map = {}
+
+    def __len__(self):
+        return len(self.__map)
+
+    def __contains__(self, target):
+        return target in self.__map
+
+    def add(self, target, pair):
+        refs = self.__map.get(target)
+        if refs is None:
+            self.__map[target] = pair
+        elif isinstance(refs, dict):
+            refs[pair] = None
+        elif refs != pair:
+            self.__map[target] = {refs: None, pair: None}
+
+    def remove(self, target, pair):
+        refs = self.__map.get(target)
+        if refs is None:
+            return
+        if isinstance(refs, dict):
+            refs.pop(pair, None)
+            if len(refs) == 1:
+                self.__map[target] = next(iter(refs))
+        elif refs == pair:
+            del self.__map[target]
+
+    def get(self, target):
+        """\
+        Return the list of (source key, property name) pairs referring to
+        the given target key.
+        """
+        refs = self.__map.get(target)
+        if refs is None:
+            return []
+        return list(refs) if isinstance(refs, dict) else [refs]
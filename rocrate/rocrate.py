@@ -18,19 +18,16 @@
 
 import errno
 import uuid
-import zipfile
-import atexit
 import shutil
 import tempfile
 
-from collections import OrderedDict
+from collections import deque
+from functools import lru_cache
+from itertools import chain
 from pathlib import Path
-from urllib.parse import urljoin
 
-from .model.contextentity import ContextEntity
 from .model.entity import Entity
 from .model.root_dataset import RootDataset
-from .model.data_entity import DataEntity
 from .model.file_or_dir import FileOrDir
 from .model.file import File
 from .model.dataset import Dataset
@@ -43,31 +40,106 @@ from .model.testinstance import TestInstance
 from .model.testservice import TestService, get_service
 from .model.softwareapplication import SoftwareApplication, get_app, PLANEMO_DEFAULT_VERSION
 from .model.testsuite import TestSuite
+from .model.registry import DATA_ENTITY_TYPES, CONTEXT_ENTITY_TYPES
 
-from .utils import is_url, subclasses, get_norm_value, walk
-from .metadata import read_metadata, find_root_entity_id
+from .archive import ZipArchive, safe_join
+from .columnar import FileTable, FileTableRow
+from .indexes import EntityIndexes
+from .query import compile_query
+from .store import SQLiteStore
+from .utils import as_number, is_url, get_norm_value, join_id, walk
+from .metadata import read_metadata, find_root_entity_id, locate_metadata
 
 
-def pick_type(json_entity, type_map, fallback=None):
-    try:
-        t = json_entity["@type"]
-    except KeyError:
-        raise ValueError(f'entity {json_entity["@id"]!r} has no @type')
-    types = {_.strip() for _ in set(t if isinstance(t, list) else [t])}
-    for name, c in type_map.items():
-        if name in types:
-            return c
-    return fallback
+# maximum number of (base URI, id) pairs whose resolution is cached
+RESOLVE_CACHE_SIZE = 1 << 16
+
+
+@lru_cache(maxsize=RESOLVE_CACHE_SIZE)
+def _resolve(base_uri, id_):
+    return join_id(base_uri, id_)
+
+
+@lru_cache(maxsize=256)
+def _role(cls):
+    # how add handles entities of the given class
+    if issubclass(cls, RootDataset):
+        return "root"
+    if issubclass(cls, (Metadata, LegacyMetadata)):
+        return "metadata"
+    if issubclass(cls, Preview):
+        return "preview"
+    return "data" if hasattr(cls, "write") else "contextual"
+
+
+class _LazyEntity:
+    """\
+    An entity read from the metadata whose instantiation has been deferred.
+    """
+
+    __slots__ = ("cls", "id", "properties", "source")
+
+    def __init__(self, cls, id_, properties, source=None):
+        self.cls = cls
+        self.id = id_
+        self.properties = properties
+        self.source = source
 
 
 class ROCrate():
 
-    def __init__(self, source=None, gen_preview=False, init=False, exclude=None):
+    def __init__(self, source=None, gen_preview=False, init=False, exclude=None, lazy=False,
+                 metadata_only=False, columnar=False, database=None):
+        """\
+        If lazy is True and the crate is read from source, entities other
+        than the root dataset, the metadata descriptor and the preview are
+        kept as raw JSON and converted to objects only when needed:
+        when dereferenced, when iterating over the crate's entities or when
+        the crate is modified.
+
+        If metadata_only is True, only the metadata file is read from source
+        (a directory or a zip file): data entities are not linked to the
+        corresponding payload files, so the crate can be queried and its
+        metadata written out (e.g., with crate.metadata.write), but write
+        and write_zip are not allowed.
+
+        If columnar is True, File entities read from source whose @type is
+        just "File" are stored column-wise in self.file_table (a
+        columnar.FileTable), which takes much less memory for large crates
+        and supports aggregates over their properties (e.g.,
+        crate.file_table.sum("contentSize", by="encodingFormat")). They are
+        handed out as File views on access: a new object each time, whose
+        properties are read from and written to the table. Setting the @type
+        of a view moves its entity out of the table, as a regular File.
+
+        If database is not None, entities are kept in a SQLite database at
+        that path (overwritten if it exists; use "" for a temporary file),
+        rather than in memory, so the crate can have more entities than
+        would fit in RAM. Only the entities in use are kept in memory, and
+        entities read from source are converted to objects only when
+        accessed. In this case, get_entities returns an iterator, while
+        data_entities and contextual_entities return lists that hold all
+        the corresponding entities, so they should be avoided for large
+        crates.
+        """
+        if metadata_only and (not source or init):
+            raise ValueError("metadata_only requires reading an existing crate")
+        if columnar and database is not None:
+            raise ValueError("columnar and database cannot be used together")
         self.exclude = exclude
+        self.lazy = lazy
+        self.metadata_only = metadata_only
+        self.file_table = FileTable() if columnar else None
+        self.__store = None if database is None else SQLiteStore(self, database, self.__instantiate_stored)
         self.__entity_map = {}
+        # lazily read entities that are not in the entity lists yet: key -> is data entity
+        self.__pending = {}
         self.default_entities = []
-        self.data_entities = []
-        self.contextual_entities = []
+        # key -> entity, in insertion order
+        self.__data_entities = {}
+        self.__contextual_entities = {}
+        # reference and property indexes, built on first use
+        self.__indexes = EntityIndexes(self._key_of)
         # TODO: add this as @base in the context? At least when loading
         # from zip
         self.uuid = uuid.uuid4()
@@ -82,7 +154,7 @@ class ROCrate():
             self.__init_from_tree(source, gen_preview=gen_preview)
         else:
             source = self.__read(source, gen_preview=gen_preview)
-        # in the zip case, self.source is the extracted dir
+        # in the zip case, self.source is a ZipArchive
         self.source = source
 
     def __init_from_tree(self, top_dir, gen_preview=False):
@@ -105,23 +177,25 @@ class ROCrate():
                     self.add(Preview(self, source))
 
     def __read(self, source, gen_preview=False):
-        source = Path(source)
-        if not source.exists():
-            raise FileNotFoundError(errno.ENOENT, f"'{source}' not found")
-        if zipfile.is_zipfile(source):
-            zip_path = tempfile.mkdtemp(prefix="rocrate_")
-            atexit.register(shutil.rmtree, zip_path)
-            with zipfile.ZipFile(source, "r") as zf:
-                zf.extractall(zip_path)
-            source = Path(zip_path)
-        metadata_path = source / Metadata.BASENAME
-        if not metadata_path.is_file():
-            metadata_path = source / LegacyMetadata.BASENAME
-        if not metadata_path.is_file():
-            raise ValueError(f"Not a valid RO-Crate: missing {Metadata.BASENAME}")
-        _, entities = read_metadata(metadata_path)
-        self.__read_data_entities(entities, source, gen_preview)
+        source, metadata_path = locate_metadata(source)
+        # already needed by the store, to rebind the sources of zip members
+        self.source = source
+        if self.__store is None:
+            # share repeated strings (immutable, unlike reference dicts,
+            # which Entity.properties hands out)
+            _, entities = read_metadata(metadata_path, intern="strings")
+        else:
+            # keep the raw entities in the database, rather than in memory
+            _, entities = self.__store.stage(metadata_path)
+        if self.metadata_only:
+            if isinstance(source, ZipArchive):
+                source.close()
+            self.__read_data_entities(entities, None, gen_preview)
+        else:
+            self.__read_data_entities(entities, source, gen_preview)
         self.__read_contextual_entities(entities)
+        if self.__store is not None:
+            self.__store.unstage()
         return source
 
     def __read_data_entities(self, entities, source, gen_preview):
@@ -136,28 +210,153 @@ class ROCrate():
         self.add(RootDataset(self, root_id, properties=root_entity))
         preview_entity = entities.pop(Preview.BASENAME, None)
         if preview_entity and not gen_preview:
-            self.add(Preview(self, source / Preview.BASENAME, properties=preview_entity))
-        type_map = OrderedDict((_.__name__, _) for _ in subclasses(FileOrDir))
-        for data_entity_ref in parts:
-            id_ = data_entity_ref['@id']
+            preview_source = None if source is None else source / Preview.BASENAME
+            self.add(Preview(self, preview_source, properties=preview_entity))
+        # consume the list from the end, so each reference can be freed as
+        # soon as it's been converted
+        parts.reverse()
+        while parts:
+            id_ = parts.pop()['@id']
             entity = entities.pop(id_)
             assert id_ == entity.pop('@id')
-            cls = pick_type(entity, type_map, fallback=DataEntity)
-            if cls is DataEntity:
-                instance = DataEntity(self, identifier=id_, properties=entity)
+            cls = DATA_ENTITY_TYPES.pick(entity)
+            if cls is File and self.file_table is not None and entity["@type"] == "File" and not is_url(id_):
+                if self.__add_row(id_, entity):
+                    continue
+            lazy_entity = _LazyEntity(cls, id_, entity, source)
+            if self.lazy or self.__store is not None:
+                self.__add_lazy(lazy_entity, True)
             else:
-                if is_url(id_):
-                    instance = cls(self, id_, properties=entity)
-                else:
-                    instance = cls(self, source / id_, id_, properties=entity)
-            self.add(instance)
+                self.add(self.__instantiate(lazy_entity))
 
     def __read_contextual_entities(self, entities):
-        type_map = {_.__name__: _ for _ in subclasses(ContextEntity)}
-        for identifier, entity in entities.items():
+        # pop entities as they are converted, so the raw dicts can be freed
+        # (staged entities can be popped while iterating)
+        for identifier in list(entities) if isinstance(entities, dict) else entities:
+            entity = entities.pop(identifier)
             assert identifier == entity.pop('@id')
-            cls = pick_type(entity, type_map, fallback=ContextEntity)
-            self.add(cls(self, identifier, entity))
+            cls = CONTEXT_ENTITY_TYPES.pick(entity)
+            lazy_entity = _LazyEntity(cls, identifier, entity)
+            if self.lazy or self.__store is not None:
+                self.__add_lazy(lazy_entity, False)
+            else:
+                self.add(self.__instantiate(lazy_entity))
+
+    def __instantiate(self, lazy_entity):
+        cls, id_, properties = lazy_entity.cls, lazy_entity.id, lazy_entity.properties
+        if not issubclass(cls, FileOrDir):
+            return cls(self, id_, properties=properties)
+        if is_url(id_):
+            return cls(self, id_, properties=properties)
+        if lazy_entity.source is None:
+            # metadata only
+            return cls(self, None, id_, properties=properties)
+        return cls(self, lazy_entity.source / id_, id_, properties=properties)
+
+    def __instantiate_stored(self, cls, id_, properties, source):
+        return self.__instantiate(_LazyEntity(cls, id_, properties, source))
+
+    def __has(self, key):
+        return key in (self.__entity_map if self.__store is None else self.__store)
+
+    @staticmethod
+    def __format_id(cls, id_):
+        # Compute the entity's id as its constructor would
+        bare = cls.__new__(cls)
+        if issubclass(cls, FileOrDir):
+            id_ = bare.source_identifier(id_, None if is_url(id_) else id_)
+        return bare.format_id(id_)
+
+    def __add_lazy(self, lazy_entity, is_data):
+        formatted_id = self.__format_id(lazy_entity.cls, lazy_entity.id)
+        key = self.__key(self.resolve_id(formatted_id))
+        if self.__has(key):
+            # replacement semantics: fall back to the eager path
+            self.add(self.__instantiate(lazy_entity))
+            return
+        if self.__store is None:
+            # also hold its place in the entity lists until it's materialized
+            self.__entity_map[key] = lazy_entity
+            (self.__data_entities if is_data else self.__contextual_entities)[key] = lazy_entity
+            self.__pending[key] = is_data
+        else:
+            self.__store.put_lazy(key, lazy_entity.cls, lazy_entity.id, lazy_entity.properties, lazy_entity.source,
+                                  "data" if is_data else "contextual")
+        if self.__indexes:
+            self.__indexes.add(key, lazy_entity.properties)
+        if is_data:
+            self.root_dataset.append_to("hasPart", {"@id": formatted_id})
+
+    def __add_row(self, id_, properties):
+        formatted_id = self.__format_id(File, id_)
+        key = self.__key(self.resolve_id(formatted_id))
+        if key in self.__entity_map or key in self.file_table:
+            return False
+        row = self.file_table.append(key, formatted_id, properties)
+        # rows are held by the entity lists as their number, so that their
+        # views keep their place among the other entities
+        self.__entity_map[key] = self.__data_entities[key] = row
+        if self.__indexes:
+            self.__indexes.add(key, properties)
+        self.root_dataset.append_to("hasPart", {"@id": formatted_id})
+        return True
+
+    def __view(self, row):
+        id_ = self.file_table.ids[row]
+        source = None if self.metadata_only else self.source / id_
+        return self.file_table.view(self, row, source)
+
+    def __materialize(self, key, value):
+        if isinstance(value, _LazyEntity):
+            value = self.__entity_map[key] = self.__instantiate(value)
+        elif value.__class__ is int:
+            return self.__view(value)
+        return value
+
+    def __entities(self, values):
+        if self.file_table is None:
+            return list(values)
+        return [self.__view(_) if _.__class__ is int else _ for _ in values]
+
+    def _detach(self, entity):
+        """\
+        Turn a File view of a row of the file table into a regular entity,
+        which takes the place of the row in the crate. Entities call this
+        before changing their @type, which the table cannot store.
+        """
+        jsonld = entity._jsonld
+        if not isinstance(jsonld, FileTableRow):
+            return
+        key = self.__key(entity.canonical_id())
+        registered = self.__registered(key, entity)
+        entity._jsonld = dict(jsonld)
+        if registered:
+            self.file_table.discard(key)
+            self.__entity_map[key] = self.__data_entities[key] = entity
+
+    def __materialize_all(self):
+        if not self.__pending:
+            return
+        for key, is_data in self.__pending.items():
+            entities = self.__data_entities if is_data else self.__contextual_entities
+            # unless it has been replaced by an entity with a different role
+            if key in entities:
+                entities[key] = self.__materialize(key, self.__entity_map[key])
+        self.__pending.clear()
+
+    @property
+    def data_entities(self):
+        if self.__store is not None:
+            return list(self.__store.values("data"))
+        self.__materialize_all()
+        return self.__entities(self.__data_entities.values())
+
+    @property
+    def contextual_entities(self):
+        if self.__store is not None:
+            return list(self.__store.values("contextual"))
+        self.__materialize_all()
+        return list(self.__contextual_entities.values())
 
     @property
     def name(self):
@@ -271,22 +470,354 @@ class ROCrate():
         return list(set(mentions + about))  # remove any duplicate refs
 
     def resolve_id(self, id_):
-        if not is_url(id_):
-            id_ = urljoin(self.arcp_base_uri, id_)  # also does path normalization
-        return id_.rstrip("/")
+        return _resolve(self.arcp_base_uri, id_)
+
+    def _key_of(self, id_):
+        # the key (see __key) of the entity with the given @id
+        return self.__key(self.resolve_id(id_))
+
+    def __key(self, canonical_id):
+        # the entity map is keyed by canonical ids without the crate's base
+        base_uri = self.arcp_base_uri
+        if canonical_id.startswith(base_uri):
+            return canonical_id[len(base_uri):]
+        if canonical_id == base_uri[:-1]:
+            return ""  # root dataset
+        return canonical_id
 
     def get_entities(self):
+        if self.__store is not None:
+            return self.__store.values()
+        self.__materialize_all()
+        if self.file_table is not None:
+            return self.__entities(self.__entity_map.values())
         return self.__entity_map.values()
 
     def _get_root_jsonld(self):
         self.root_dataset.properties()
 
     def dereference(self, entity_id, default=None):
-        canonical_id = self.resolve_id(entity_id)
-        return self.__entity_map.get(canonical_id, default)
+        return self._by_key(self.__key(self.resolve_id(entity_id)), default)
 
     get = dereference
 
+    def _by_key(self, key, default=None):
+        if self.__store is not None:
+            return self.__store.get(key, default)
+        try:
+            value = self.__entity_map[key]
+        except KeyError:
+            return default
+        return self.__materialize(key, value)
+
+    def _properties(self, key):
+        # the JSON-LD of the entity with the given key (or None), without
+        # instantiating it
+        if self.__store is not None:
+            return self.__store.properties(key)
+        value = self.__entity_map.get(key)
+        return None if value is None else self.__jsonld(value)
+
+    def __jsonld(self, value):
+        # the JSON-LD of an entity map value
+        if isinstance(value, _LazyEntity):
+            return value.properties
+        if value.__class__ is int:
+            return FileTableRow(self.file_table, value)
+        return value._jsonld
+
+    def __all_properties(self):
+        if self.__store is not None:
+            yield from self.__store.items()
+            return
+        for key, value in self.__entity_map.items():
+            yield key, self.__jsonld(value)
+
+    def _all_keys(self):
+        if self.__store is not None:
+            return self.__store.keys()
+        return iter(self.__entity_map)
+
+    def __registered(self, key, entity):
+        # is entity the object held by the crate for key?
+        if self.__store is not None:
+            return self.__store.live(key) is entity
+        if self.__entity_map.get(key) is entity:
+            return True
+        jsonld = entity._jsonld
+        return (isinstance(jsonld, FileTableRow) and jsonld.table is self.file_table
+                and self.file_table.row(key) == jsonld.row)
+
+    def _update_indexes(self, entity, name, old, new):
+        """\
+        Update the indexes after a change to the value of a property of
+        entity, from old to new (raw JSON-LD values, None if missing).
+        Entities call this from __setitem__, __delitem__, append_to and the
+        type setter.
+        """
+        if not self.__indexes:
+            return
+        key = self.__key(entity.canonical_id())
+        if self.__registered(key, entity):
+            self.__indexes.update(key, name, old, new)
+
+    def __property_index(self, name):
+        index = self.__indexes.properties.get(name)
+        if index is None:
+            index = self.__indexes.build(name, self.__all_properties())
+        return index
+
+    def get_by_type(self, type_):
+        """\
+        Return a list of the entities in the crate that have the given
+        @type, among others for entities with multiple types (e.g.,
+        get_by_type("File") includes ComputationalWorkflow entities).
+
+        With a database, entities are looked up via the database's type
+        index. Otherwise, the first call builds an index of all entities by
+        type, which is then kept up to date as entities are added or deleted
+        or their type is set via Entity.type (changes made directly to an
+        entity's JSON-LD are not tracked), so later calls take time
+        proportional to the number of entities found.
+        """
+        if self.__store is not None:
+            self.__store.flush()
+            return list(self.__store.values(type_=type_))
+        return [self._by_key(_) for _ in self.__property_index("@type").get(type_)]
+
+    def __path_trie(self):
+        if self.__indexes.paths is None:
+            self.__indexes.build_paths(self._all_keys())
+        return self.__indexes.paths
+
+    def __listed(self, path):
+        # is there an entity for the given relative path?
+        return self._key_of(path) in self.__path_trie()
+
+    def subtree(self, path):
+        """\
+        Return a list of the entities whose ids are relative paths at or
+        under the given one (e.g., "results/sample42/"), depth-first: each
+        Dataset comes before its contents. Use "" for the whole crate.
+
+        Entities are found through a tree of their paths, built on first use
+        and then kept up to date as entities are added or deleted, so this
+        takes time proportional to the size of the subtree.
+        """
+        return [self._by_key(_) for _ in self.__path_trie().keys(self._key_of(path))]
+
+    def subtree_size(self, path):
+        """\
+        Return the sum of the contentSize of the entities at or under the
+        given path (see subtree). Entities without a numeric contentSize
+        are skipped. Entities are not instantiated.
+        """
+        total = 0
+        for key in self.__path_trie().keys(self._key_of(path)):
+            size = as_number((self._properties(key) or {}).get("contentSize"))
+            if size is not None:
+                total += size
+        return total
+
+    def delete_subtree(self, path):
+        """\
+        Delete the entities at or under the given path (see subtree),
+        except for the metadata descriptor.
+        """
+        self.delete_many([_ for _ in self.subtree(path) if _ is not self.metadata])
+
+    def _match_keys(self, value):
+        # the index keys (see indexes.EntityIndexes) that match a filter value
+        # of find
+        if isinstance(value, list):
+            return [k for _ in value for k in self._match_keys(_)]
+        if isinstance(value, Entity):
+            return [("@id", self.__key(value.canonical_id()))]
+        keys = self.__indexes.value_keys(value)
+        if isinstance(value, str):
+            keys.append(("@id", self._key_of(value)))
+        return keys
+
+    def find(self, type=None, **filters):
+        """\
+        Return a list of the entities in the crate that have the given @type
+        (if not None) and, for each keyword argument, the given value among
+        the values of the property with that name. For instance:
+
+            crate.find(type="File", encodingFormat="text/csv", author=alice)
+
+        Values can be strings, numbers, booleans or None. Entities (or
+        {"@id": ...} dicts) match references to them, and strings also match
+        references to the entity with that id (e.g., author="#alice"). A
+        list matches any of its values.
+
+        Each property is looked up in an index that is built on first use
+        and then kept up to date like the reference index (see referrers).
+        The query starts from the most selective property, i.e., the one
+        with the fewest matching entities, and the others are checked by
+        membership in their index: the entities are returned in the order of
+        the first index.
+        """
+        conditions = list(filters.items())
+        if type is not None:
+            conditions.append(("@type", type))
+        if not conditions:
+            return list(self.get_entities())
+        return [self._by_key(_) for _ in self._find_keys(conditions)]
+
+    def _find_keys(self, conditions):
+        # the keys of the entities that match all the given (property name,
+        # value) conditions of find
+        plan = []
+        for name, value in conditions:
+            # each condition matches the union of one or more sets of keys
+            index = self.__property_index(name)
+            plan.append([_ for _ in map(index.get, self._match_keys(value)) if _])
+        plan.sort(key=lambda sets: sum(len(_) for _ in sets))
+        first, rest = plan[0], plan[1:]
+        # several sets (or none, e.g., for []): dedupe, keeping the order
+        keys = first[0] if len(first) == 1 else dict.fromkeys(chain.from_iterable(first))
+        # filter by one condition at a time, so the list shrinks as it goes
+        for sets in rest:
+            if len(sets) == 1:
+                keys = [k for k in keys if k in sets[0]]
+            else:
+                keys = [k for k in keys if any(k in _ for _ in sets)]
+        return list(keys)
+
+    def query(self, query):
+        """\
+        Iterate over the entities that match the given query, a string (see
+        the rocrate.query module for the syntax) or a compiled query.Query.
+        For instance, the files that are examples of the main workflow's
+        inputs or outputs:
+
+            crate.query("./ > mainEntity > input|output [FormalParameter] < exampleOfWork [File]")
+
+        The results are computed as they are consumed, so the crate should
+        not be modified in the meantime.
+        """
+        if isinstance(query, str):
+            query = compile_query(query)
+        return query.run(self)
+
+    def _value_keys(self, value):
+        # the index keys (see indexes.EntityIndexes) of a property value
+        return self.__indexes.value_keys(value)
+
+    def referrers(self, entity):
+        """\
+        Return a list of (entity, property name) pairs, one for each
+        property of an entity in the crate that refers to the given entity
+        (or id).
+
+        The first call builds an index of all the references in the crate,
+        which is then kept up to date as entities are added, deleted or
+        modified (via item assignment, deletion and append_to: changes made
+        directly to an entity's JSON-LD are not tracked), so later calls take
+        time proportional to the number of references found.
+        """
+        id_ = entity.canonical_id() if isinstance(entity, Entity) else self.resolve_id(entity)
+        rval = []
+        for source, name in self._referrer_keys(self.__key(id_)):
+            e = self._by_key(source)
+            if e is not None:
+                rval.append((e, name))
+        return rval
+
+    def _referrer_keys(self, key):
+        # the (source key, property name) pairs of the references to key
+        if self.__indexes.refs is None:
+            self.__indexes.build_refs(self.__all_properties())
+        return self.__indexes.refs.get(key)
+
+    def _neighbours(self, key):
+        # the (property name, target key) pairs of the references from the
+        # entity with the given key, or None if there's no such entity
+        pairs = self.__indexes.adjacency.get(key)
+        if pairs is not None:
+            return pairs
+        properties = self._properties(key)
+        return None if properties is None else self.__indexes.neighbours(key, properties)
+
+    def __start_key(self, start):
+        return self.__key(start.canonical_id()) if isinstance(start, Entity) else self._key_of(start)
+
+    def _walk_keys(self, start, properties=None, depth=None, order="bfs"):
+        # (key, depth) pairs for walk; start is a key
+        if order not in ("bfs", "dfs"):
+            raise ValueError(f"order must be 'bfs' or 'dfs', not {order!r}")
+        names = None if properties is None else frozenset([properties] if isinstance(properties, str) else properties)
+        if order == "bfs":
+            # an entity is seen when queued, visited when dequeued
+            queue, seen = deque([(start, 0)]), {start}
+            pop = queue.popleft
+        else:
+            # an entity can be pushed more than once, but is visited once
+            queue, seen = [(start, 0)], set()
+            pop = queue.pop
+        while queue:
+            key, d = pop()
+            if order == "dfs":
+                if key in seen:
+                    continue
+                seen.add(key)
+            pairs = self._neighbours(key)
+            if pairs is None:
+                continue
+            yield key, d
+            if depth is not None and d >= depth:
+                continue
+            if order == "bfs":
+                for name, t in pairs:
+                    if (names is None or name in names) and t not in seen:
+                        seen.add(t)
+                        queue.append((t, d + 1))
+            else:
+                queue.extend((t, d + 1) for name, t in reversed(pairs) if (names is None or name in names) and t not in seen)
+
+    def walk(self, start, properties=None, depth=None, order="bfs"):
+        """\
+        Iterate over the entities that can be reached from start (an entity
+        or id, which comes first) by following references, each of them
+        once, so cycles are not a problem. Only references from the given
+        properties (a name or a collection of names) are followed, if
+        properties is not None, and only up to depth hops from start, if
+        depth is not None. References to ids with no entity in the crate
+        are skipped.
+
+        The order is breadth-first ("bfs") or depth-first ("dfs", each
+        entity before the ones it refers to). With "dfs" and a depth, an
+        entity is only expanded at the depth it's first reached at.
+
+        Walking takes time proportional to the number of entities and
+        references visited: each entity's references are computed from its
+        JSON-LD once, then cached until the entity is changed (via the
+        Entity interface, as for referrers), added or deleted.
+        """
+        for key, _ in self._walk_keys(self.__start_key(start), properties, depth, order):
+            yield self._by_key(key)
+
+    def is_reachable(self, source, target, properties=None):
+        """\
+        Whether target (an entity or id) can be reached from source by
+        following references (see walk).
+        """
+        target = self.__start_key(target)
+        return any(key == target for key, _ in self._walk_keys(self.__start_key(source), properties))
+
+    def unreachable(self, start=None, properties=None):
+        """\
+        Return a list of the entities that cannot be reached from start (see
+        walk), by default the metadata descriptor, which refers to the root
+        dataset. The default entities (metadata descriptor, root dataset
+        and preview) are never included.
+        """
+        start = self.__key(self.metadata.canonical_id()) if start is None else self.__start_key(start)
+        reached = {key for key, _ in self._walk_keys(start, properties)}
+        reached.update(self.__key(_.canonical_id()) for _ in self.default_entities)
+        return [self._by_key(_) for _ in self._all_keys() if _ not in reached]
+
     def add_file(
             self,
             source=None,
@@ -323,6 +854,38 @@ class ROCrate():
 
     add_directory = add_dataset
 
+    def add_files(self, records, fetch_remote=False, validate_url=False):
+        """\
+        Add data entities for the files (or directories) from the given
+        iterable, which can be a generator, in a single pass (see add_many).
+        Each item is either a source, as in add_file, or a dictionary with
+        any of the source, dest_path and properties arguments of add_file.
+        The class of each entity is picked based on the @type in its
+        properties, if any (e.g., {"@type": "Dataset"} gives a Dataset, whose
+        id ends with "/"), and is File otherwise. Return a list of the added
+        entities.
+        """
+        return self.add_many(self.__file_entities(records, fetch_remote, validate_url))
+
+    def __file_entities(self, records, fetch_remote, validate_url):
+        base_uri = self.arcp_base_uri
+        for record in records:
+            if isinstance(record, dict):
+                source, dest_path = record.get("source"), record.get("dest_path")
+                properties = record.get("properties")
+            else:
+                source, dest_path, properties = record, None, None
+            cls = File
+            if properties and "@type" in properties:
+                cls = DATA_ENTITY_TYPES.get(properties["@type"])
+                if not issubclass(cls, FileOrDir):
+                    cls = File
+            e = cls(self, source, dest_path, fetch_remote, validate_url, properties)
+            # the ids are usually all different, so resolving them through
+            # the cache (see resolve_id) would just evict its other entries
+            e._canonical_id = join_id(base_uri, e.id)
+            yield e
+
     def add(self, *entities):
         """\
         Add one or more entities to this RO-Crate.
@@ -336,33 +899,88 @@ class ROCrate():
         @id is undefined". In practice, due to the replacement semantics, the
         entity for a given id is the last one added to the crate with that id.
         """
-        for e in entities:
-            key = e.canonical_id()
-            if isinstance(e, RootDataset):
-                self.root_dataset = e
-            if isinstance(e, (Metadata, LegacyMetadata)):
-                self.metadata = e
-            if isinstance(e, Preview):
-                self.preview = e
-            if isinstance(e, (RootDataset, Metadata, LegacyMetadata, Preview)):
-                self.default_entities.append(e)
-            elif hasattr(e, "write"):
-                self.data_entities.append(e)
-                if key not in self.__entity_map:
-                    self.root_dataset.append_to("hasPart", e)
-            else:
-                self.contextual_entities.append(e)
-            self.__entity_map[key] = e
+        self.add_many(entities)
         return entities[0] if len(entities) == 1 else entities
 
+    def add_many(self, entities):
+        """\
+        Add the entities from the given iterable, which can be a generator,
+        in a single pass (see add). References to the new data entities are
+        appended to the root dataset's hasPart all at once. Return a list of
+        the added entities.
+        """
+        self.__materialize_all()
+        store, table = self.__store, self.file_table
+        # looked up once, since they do not change while adding entities
+        indexes = self.__indexes if self.__indexes else None
+        added = []
+        parts = []
+        try:
+            for e in entities:
+                added.append(e)
+                key = self.__key(e.canonical_id())
+                old = None if indexes is None else self._properties(key)
+                if old is not None:
+                    indexes.remove(key, old)
+                in_table = table is not None and key in table
+                if in_table:
+                    # replace the table row
+                    if isinstance(e._jsonld, FileTableRow):
+                        e._jsonld = dict(e._jsonld)
+                    table.discard(key)
+                role = _role(type(e))
+                if role == "root":
+                    if parts:
+                        # the parts added so far belong to the current root
+                        self.root_dataset.append_to("hasPart", parts)
+                        parts = []
+                    self.root_dataset = e
+                elif role == "metadata":
+                    self.metadata = e
+                elif role == "preview":
+                    self.preview = e
+                if role in ("root", "metadata", "preview"):
+                    self.default_entities.append(e)
+                    role = "default"
+                elif role == "data":
+                    if store is None:
+                        self.__contextual_entities.pop(key, None)
+                        self.__data_entities[key] = e
+                    if not self.__has(key) and not in_table:
+                        parts.append({"@id": e.id})
+                elif store is None:
+                    self.__data_entities.pop(key, None)
+                    self.__contextual_entities[key] = e
+                if store is None:
+                    self.__entity_map[key] = e
+                else:
+                    store.put(key, e, role)
+                if indexes is not None:
+                    indexes.add(key, e._jsonld)
+        finally:
+            if parts:
+                self.root_dataset.append_to("hasPart", parts)
+        return added
+
     def delete(self, *entities):
         """\
         Delete one or more entities from this RO-Crate.
 
         Note that the crate could be left in an inconsistent state as a result
         of calling this method, since neither entities pointing to the deleted
-        ones nor entities pointed to by the deleted ones are modified.
+        ones nor entities pointed to by the deleted ones are modified (except
+        for the root dataset's hasPart). Use referrers to find the former.
+        """
+        self.delete_many(entities)
+
+    def delete_many(self, entities):
+        """\
+        Delete the entities (or ids) from the given iterable, in a single
+        pass. Deleting an entity takes constant time, so this is linear in
+        the number of entities to delete, whatever the size of the crate.
+        See delete.
         """
+        self.__materialize_all()
         for e in entities:
             if not isinstance(e, Entity):
                 e = self.dereference(e)
@@ -372,25 +990,39 @@ class ROCrate():
                 raise ValueError("cannot delete the root data entity")
             if e is self.metadata:
                 raise ValueError("cannot delete the metadata entity")
+            key = self.__key(e.canonical_id())
+            if self.__indexes:
+                # e may have been replaced since: unindex the current entity
+                jsonld = self._properties(key)
+                if jsonld is not None:
+                    self.__indexes.remove(key, jsonld)
             if e is self.preview:
                 self.default_entities.remove(e)
                 self.preview = None
             elif hasattr(e, "write"):
-                try:
-                    self.data_entities.remove(e)
-                except ValueError:
-                    pass
-                self.root_dataset["hasPart"] = [_ for _ in self.root_dataset.get("hasPart", []) if _ != e]
-                if not self.root_dataset["hasPart"]:
-                    del self.root_dataset._jsonld["hasPart"]
+                self.__data_entities.pop(key, None)
+                self.__remove_part(key)
             else:
-                try:
-                    self.contextual_entities.remove(e)
-                except ValueError:
-                    pass
-            self.__entity_map.pop(e.canonical_id(), None)
+                self.__contextual_entities.pop(key, None)
+            if self.__store is None:
+                self.__entity_map.pop(key, None)
+            else:
+                self.__store.discard(key)
+            if self.file_table is not None:
+                self.file_table.discard(key)
+
+    def __remove_part(self, key):
+        # remove references to the entity with the given key from hasPart
+        # (deferred by the root dataset, see RootDataset._remove_part)
+        if self.__indexes:
+            self.__indexes.update(self.__key(self.root_dataset.canonical_id()), "hasPart", {"@id": key}, None)
+        self.root_dataset._remove_part(key)
 
-    def _copy_unlisted(self, top, base_path):
+    def _copy_unlisted(self, top, base_path, prefix=""):
+        # copy the files under top that have no entity; prefix is the
+        # relative path of top in the crate
+        if isinstance(top, ZipArchive):
+            return self.__extract_unlisted(top, base_path)
         for root, dirs, files in walk(top, exclude=self.exclude):
             root = Path(root)
             for name in dirs:
@@ -400,22 +1032,41 @@ class ROCrate():
             for name in files:
                 source = root / name
                 rel = source.relative_to(top)
-                if not self.dereference(str(rel)):
+                if not self.__listed(prefix + rel.as_posix()):
                     dest = base_path / rel
                     if not dest.exists() or not dest.samefile(source):
                         shutil.copyfile(source, dest)
 
+    def __extract_unlisted(self, archive, base_path):
+        exclude = frozenset(self.exclude or [])
+        for name in sorted(archive.dirs()):
+            if not exclude.intersection(name.split("/")):
+                safe_join(base_path, name).mkdir(parents=True, exist_ok=True)
+        for name in archive.files():
+            if exclude.intersection(name.split("/")):
+                continue
+            if not self.__listed(name):
+                dest = safe_join(base_path, name)
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                archive.copy(name, dest)
+
     def write(self, base_path):
+        if self.metadata_only:
+            raise RuntimeError("crate was read with metadata_only=True: payload files are not available")
         base_path = Path(base_path)
         base_path.mkdir(parents=True, exist_ok=True)
         if self.source:
             self._copy_unlisted(self.source, base_path)
-        for writable_entity in self.data_entities + self.default_entities:
+        # with a database, stream the data entities rather than listing them
+        data_entities = self.data_entities if self.__store is None else self.__store.values("data")
+        for writable_entity in chain(data_entities, self.default_entities):
             writable_entity.write(base_path)
 
     write_crate = write  # backwards compatibility
 
     def write_zip(self, out_path):
+        if self.metadata_only:
+            raise RuntimeError("crate was read with metadata_only=True: payload files are not available")
         out_path = Path(out_path)
         if out_path.suffix == ".zip":
             out_path = out_path.parent / out_path.stem
@@ -427,6 +1078,21 @@ class ROCrate():
             shutil.rmtree(tmp_dir)
         return archive
 
+    def close(self):
+        """\
+        Write any pending changes to the database (see the database
+        argument of the constructor) and close it. The crate must not be
+        used afterwards. Does nothing for crates held in memory.
+        """
+        if self.__store is not None:
+            self.__store.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def add_workflow(
             self, source=None, dest_path=None, fetch_remote=False, validate_url=False, properties=None,
             main=False, lang="cwl", lang_version=None, gen_cwl=False, cls=ComputationalWorkflow
@@ -523,6 +1189,16 @@ class ROCrate():
         return suite
 
 
+def read_graph(source, lazy=False):
+    """\
+    Read only the metadata of the crate at source (a directory or a zip
+    file), without accessing any payload file.
+
+    Return a crate opened with metadata_only=True.
+    """
+    return ROCrate(source, lazy=lazy, metadata_only=True)
+
+
 def make_workflow_rocrate(workflow_path, wf_type, include_files=[],
                           fetch_remote=False, cwl=None, diagram=None):
     wf_crate = ROCrate()
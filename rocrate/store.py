@@ -0,0 +1,543 @@
+#!/usr/bin/env python
+
+# Copyright 2019-2022 The University of Manchester, UK
+# Copyright 2020-2022 Vlaams Instituut voor Biotechnologie (VIB), BE
+# Copyright 2020-2022 Barcelona Supercomputing Center (BSC), ES
+# Copyright 2020-2022 Center for Advanced Studies, Research and Development in Sardinia (CRS4), IT
+# Copyright 2022 École Polytechnique Fédérale de Lausanne, CH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""\
+Out-of-core storage of crate entities in a SQLite database.
+
+Entities are stored as rows holding their JSON-LD, their role in the crate
+(default, data or contextual entity) and their pickled Python state (class,
+source, etc.). Only the entities that are referenced from the outside,
+plus a small cache of recently used ones, are kept in memory: changes to
+an entity are recorded when it's dropped from memory and written back on
+the next store operation (or when the store is flushed).
+"""
+
+import json
+import pickle
+import weakref
+from collections import OrderedDict, namedtuple
+from collections.abc import MutableMapping
+
+from .archive import ZipArchive, ZipMember
+from .metadata import iter_graph
+
+# entities kept in memory when not referenced elsewhere
+CACHE_SIZE = 1024
+# pending writes that trigger a flush to the database; also the number of
+# rows fetched per query when iterating
+BATCH_SIZE = 10000
+
+ROLES = ("default", "data", "contextual")
+
+_BASE_SLOTS = frozenset(["crate", "_id", "_canonical_id", "_jsonld", "__weakref__", "__dict__"])
+
+SCHEMA = """\
+DROP TABLE IF EXISTS entities;
+DROP TABLE IF EXISTS entity_types;
+CREATE TABLE entities (
+    key TEXT PRIMARY KEY,
+    id TEXT NOT NULL,
+    role TEXT NOT NULL,
+    lazy INTEGER NOT NULL,
+    properties TEXT NOT NULL,
+    state BLOB NOT NULL
+);
+CREATE INDEX entities_id ON entities (id);
+CREATE TABLE entity_types (
+    key TEXT NOT NULL,
+    type TEXT NOT NULL
+);
+CREATE INDEX entity_types_key ON entity_types (key);
+CREATE INDEX entity_types_type ON entity_types (type);
+"""
+
+STAGED_SCHEMA = """\
+DROP TABLE IF EXISTS staged;
+CREATE TABLE staged (id TEXT PRIMARY KEY, properties TEXT NOT NULL);
+"""
+
+STAGED_UPSERT = """\
+INSERT INTO staged (id, properties) VALUES (?, ?)
+ON CONFLICT (id) DO UPDATE SET properties = excluded.properties
+"""
+
+UPSERT = """\
+INSERT INTO entities (key, id, role, lazy, properties, state) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (key) DO UPDATE SET
+    id = excluded.id, role = excluded.role, lazy = excluded.lazy,
+    properties = excluded.properties, state = excluded.state
+"""
+
+COLUMNS = "e.rowid, e.key, e.id, e.role, e.lazy, e.properties, e.state"
+
+
+def _dumps(properties):
+    return json.dumps(properties, ensure_ascii=False, separators=(",", ":"))
+
+
+def _types(properties):
+    t = properties.get("@type", [])
+    return [_ for _ in (t if isinstance(t, list) else [t]) if isinstance(_, str)]
+
+
+# a zip archive (name is None) or member, stored by path and name rather
+# than pickled with the archive's index (see SQLiteStore.__unpack)
+_ZipRef = namedtuple("_ZipRef", "path name")
+
+
+def _pack(value):
+    if isinstance(value, ZipMember):
+        return _ZipRef(value.archive.path, value.name_in_archive)
+    if isinstance(value, ZipArchive):
+        return _ZipRef(value.path, None)
+    return value
+
+
+def _state(entity):
+    # the entity's class and attributes, except those handled by the store
+    attrs = {}
+    for cls in type(entity).__mro__:
+        slots = cls.__dict__.get("__slots__", ())
+        for name in [slots] if isinstance(slots, str) else slots:
+            if name not in _BASE_SLOTS and hasattr(entity, name):
+                attrs[name] = getattr(entity, name)
+    attrs.update(getattr(entity, "__dict__", {}))
+    attrs = {k: _pack(v) for k, v in attrs.items()}
+    return pickle.dumps((type(entity), attrs), protocol=pickle.HIGHEST_PROTOCOL)
+
+
+class StagedEntities(MutableMapping):
+    """\
+    The raw entities of a metadata file, by id, in a database table.
+
+    Works like the dictionary returned by read_metadata, without holding
+    the entities in memory. Entities can be removed while iterating.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __getitem__(self, id_):
+        row = self.conn.execute("SELECT properties FROM staged WHERE id = ?", (id_,)).fetchone()
+        if row is None:
+            raise KeyError(id_)
+        return json.loads(row[0])
+
+    def __setitem__(self, id_, properties):
+        self.conn.execute(STAGED_UPSERT, (id_, _dumps(properties)))
+
+    def __delitem__(self, id_):
+        if self.conn.execute("DELETE FROM staged WHERE id = ?", (id_,)).rowcount == 0:
+            raise KeyError(id_)
+
+    def __iter__(self):
+        last = 0
+        while True:
+            rows = self.conn.execute(
+                f"SELECT rowid, id FROM staged WHERE rowid > ? ORDER BY rowid LIMIT {BATCH_SIZE}", (last,)
+            ).fetchall()
+            for _, id_ in rows:
+                yield id_
+            if len(rows) < BATCH_SIZE:
+                return
+            last = rows[-1][0]
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM staged").fetchone()[0]
+
+
+class SQLiteStore:
+    """\
+    Entity storage for an ROCrate, backed by a SQLite database.
+
+    Entities are indexed by key (the crate's compact canonical id), id and
+    type. The database at path is overwritten; if path is "", SQLite uses a
+    temporary file that is removed when the store is closed. Entities read
+    from a metadata file are stored as raw JSON and converted to objects
+    only when accessed, by calling instantiate(cls, id_, properties, source).
+    """
+
+    def __init__(self, crate, path, instantiate, cache_size=None):
+        self.crate = crate
+        self.instantiate = instantiate
+        self.cache_size = CACHE_SIZE if cache_size is None else cache_size
+        import sqlite3
+        self.conn = sqlite3.connect(str(path))
+        self.conn.executescript(SCHEMA)
+        # key -> weakref.finalize, for the entities that are in memory
+        self.__live = {}
+        self.__cache = OrderedDict()
+        # pending writes: key -> (row, types); key -> (properties text, types); keys
+        self.__upserts = {}
+        self.__updates = {}
+        self.__deletes = set()
+        # (key, properties, text) of the entities dropped from memory since
+        # the last store operation, recorded by their finalizers
+        self.__released = []
+        # path -> ZipArchive, for zip members of archives other than the
+        # crate's source
+        self.__archives = {}
+
+    def close(self):
+        """\
+        Flush all changes and close the database connection.
+        """
+        if self.conn is None:
+            return
+        self.flush()
+        for f in self.__live.values():
+            f.detach()
+        self.__live.clear()
+        self.__cache.clear()
+        for archive in self.__archives.values():
+            archive.close()
+        self.__archives.clear()
+        self.conn.close()
+        self.conn = None
+
+    # -- in-memory entities --
+
+    def __in_memory(self, key):
+        f = self.__live.get(key)
+        info = f.peek() if f is not None else None
+        return None if info is None else info[0]
+
+    def __keep(self, key, entity, text):
+        old = self.__live.pop(key, None)
+        if old is not None:
+            old.detach()
+        f = weakref.finalize(entity, self.__release, key, entity._jsonld, text)
+        f.atexit = False
+        self.__live[key] = f
+        self.__touch(key, entity)
+
+    def __touch(self, key, entity):
+        cache = self.__cache
+        cache[key] = entity
+        cache.move_to_end(key)
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+
+    def __release(self, key, properties, text):
+        # called when an entity is garbage collected, possibly in the middle
+        # of another operation: just record it for __settle
+        self.__released.append((key, properties, text))
+
+    def __settle(self):
+        # queue the changes to the entities dropped from memory
+        released, self.__released = self.__released, []
+        for key, properties, text in released:
+            f = self.__live.get(key)
+            if f is not None and not f.alive:
+                del self.__live[key]
+            new_text = _dumps(properties)
+            if new_text != text:
+                self.__update(key, new_text, properties)
+
+    def __update(self, key, text, properties):
+        try:
+            row, _ = self.__upserts[key]
+        except KeyError:
+            self.__updates[key] = (text, _types(properties))
+        else:
+            self.__upserts[key] = (row[:4] + (text, row[5]), _types(properties))
+        self.__maybe_flush()
+
+    def __forget(self, key):
+        f = self.__live.pop(key, None)
+        if f is not None:
+            f.detach()
+        self.__cache.pop(key, None)
+
+    # -- pending writes --
+
+    def __maybe_flush(self):
+        if len(self.__upserts) + len(self.__updates) + len(self.__deletes) >= BATCH_SIZE:
+            self.__write()
+
+    def __write(self):
+        if self.__released:
+            self.__settle()
+        conn = self.conn
+        deletes, self.__deletes = self.__deletes, set()
+        upserts, self.__upserts = self.__upserts, {}
+        updates, self.__updates = self.__updates, {}
+        if deletes:
+            keys = [(_,) for _ in deletes]
+            conn.executemany("DELETE FROM entities WHERE key = ?", keys)
+            conn.executemany("DELETE FROM entity_types WHERE key = ?", keys)
+        if upserts:
+            conn.executemany(UPSERT, [row for row, _ in upserts.values()])
+            self.__write_types((k, types) for k, (_, types) in upserts.items())
+        if updates:
+            conn.executemany("UPDATE entities SET properties = ? WHERE key = ?", [
+                (text, k) for k, (text, _) in updates.items()
+            ])
+            self.__write_types((k, types) for k, (_, types) in updates.items())
+
+    def __write_types(self, items):
+        items = list(items)
+        self.conn.executemany("DELETE FROM entity_types WHERE key = ?", [(k,) for k, _ in items])
+        self.conn.executemany("INSERT INTO entity_types VALUES (?, ?)", [(k, t) for k, types in items for t in types])
+
+    def flush(self):
+        """\
+        Write all changes, including those to entities in memory, to the
+        database.
+        """
+        self.__settle()
+        for key, f in list(self.__live.items()):
+            info = f.peek()
+            if info is None:
+                continue
+            entity, _, (_, properties, text), _ = info
+            new_text = _dumps(properties)
+            if new_text != text:
+                self.__update(key, new_text, properties)
+                self.__keep(key, entity, new_text)
+        self.__write()
+        self.conn.commit()
+
+    # -- reading --
+
+    def stage(self, metadata_path):
+        """\
+        Read the entities in the given metadata file into a StagedEntities
+        mapping. Return a tuple of the context and the mapping, like
+        read_metadata does.
+        """
+        self.conn.executescript(STAGED_SCHEMA)
+        members = {}
+        batch = []
+        try:
+            for entity in iter_graph(metadata_path, members=members):
+                batch.append((entity["@id"], _dumps(entity)))
+                if len(batch) >= BATCH_SIZE:
+                    self.conn.executemany(STAGED_UPSERT, batch)
+                    batch = []
+            self.conn.executemany(STAGED_UPSERT, batch)
+            context = members["@context"]
+        except KeyError:
+            raise ValueError(f"{metadata_path} must have a @context and a @graph")
+        return context, StagedEntities(self.conn)
+
+    def unstage(self):
+        self.conn.execute("DROP TABLE IF EXISTS staged")
+
+    # -- mapping interface --
+
+    def put(self, key, entity, role):
+        """\
+        Store an entity (replacing any entity with the same key).
+        """
+        if self.__released:
+            self.__settle()
+        if key in self.__deletes:
+            # delete the old row first, so that the entity goes to the end
+            # (replacing a row keeps its place)
+            self.__write()
+        text = _dumps(entity._jsonld)
+        self.__deletes.discard(key)
+        self.__updates.pop(key, None)
+        self.__upserts[key] = ((key, entity.id, role, 0, text, _state(entity)), _types(entity._jsonld))
+        self.__keep(key, entity, text)
+        self.__maybe_flush()
+
+    def put_lazy(self, key, cls, id_, properties, source, role):
+        """\
+        Store an entity as raw JSON, to be instantiated when accessed.
+        """
+        if self.__released:
+            self.__settle()
+        if key in self.__deletes:
+            # delete the old row first, so that the entity goes to the end
+            # (replacing a row keeps its place)
+            self.__write()
+        self.__forget(key)
+        self.__deletes.discard(key)
+        self.__updates.pop(key, None)
+        state = pickle.dumps((cls, _pack(source)), protocol=pickle.HIGHEST_PROTOCOL)
+        self.__upserts[key] = ((key, id_, role, 1, _dumps(properties), state), _types(properties))
+        self.__maybe_flush()
+
+    def discard(self, key):
+        """\
+        Remove the entity with the given key, if present.
+        """
+        if self.__released:
+            self.__settle()
+        self.__forget(key)
+        self.__upserts.pop(key, None)
+        self.__updates.pop(key, None)
+        self.__deletes.add(key)
+        self.__maybe_flush()
+
+    def __contains__(self, key):
+        if self.__released:
+            self.__settle()
+        if key in self.__upserts or self.__in_memory(key) is not None:
+            return True
+        if key in self.__deletes:
+            return False
+        return self.conn.execute("SELECT 1 FROM entities WHERE key = ?", (key,)).fetchone() is not None
+
+    def __len__(self):
+        self.__write()
+        return self.conn.execute("SELECT COUNT(*) FROM entities").fetchone()[0]
+
+    def __load(self, row):
+        _, key, id_, _, lazy, text, state = row
+        entity = self.__in_memory(key)
+        if entity is not None:
+            self.__touch(key, entity)
+            return entity
+        properties = json.loads(text)
+        if lazy:
+            cls, source = pickle.loads(state)
+            entity = self.instantiate(cls, id_, properties, self.__unpack(source))
+            text = _dumps(entity._jsonld)
+        else:
+            cls, attrs = pickle.loads(state)
+            entity = cls.__new__(cls)
+            entity.crate = self.crate
+            entity.id = id_
+            entity._jsonld = properties
+            for name, value in attrs.items():
+                setattr(entity, name, self.__unpack(value))
+        self.__keep(key, entity, text)
+        return entity
+
+    def __unpack(self, value):
+        # rebind zip archives and members to the crate's archive, so that
+        # they share it
+        if value.__class__ is not _ZipRef:
+            return value
+        archive = getattr(self.crate, "source", None)
+        if not (isinstance(archive, ZipArchive) and archive.path == value.path):
+            archive = self.__archives.get(value.path)
+            if archive is None:
+                archive = self.__archives[value.path] = ZipArchive(value.path)
+        return archive if value.name is None else ZipMember(archive, value.name)
+
+    def get(self, key, default=None):
+        """\
+        Return the entity with the given key, or default.
+        """
+        if self.__released:
+            self.__settle()
+        entity = self.__in_memory(key)
+        if entity is not None:
+            self.__touch(key, entity)
+            return entity
+        if key in self.__deletes:
+            return default
+        if key in self.__upserts or key in self.__updates:
+            self.__write()
+        row = self.conn.execute(f"SELECT {COLUMNS} FROM entities e WHERE key = ?", (key,)).fetchone()
+        return default if row is None else self.__load(row)
+
+    def live(self, key):
+        """\
+        Return the entity with the given key if it's in memory, else None.
+        """
+        return self.__in_memory(key)
+
+    def properties(self, key):
+        """\
+        Return the JSON-LD of the entity with the given key, or None,
+        without instantiating it.
+        """
+        if self.__released:
+            self.__settle()
+        entity = self.__in_memory(key)
+        if entity is not None:
+            return entity._jsonld
+        if key in self.__deletes:
+            return None
+        if key in self.__upserts or key in self.__updates:
+            self.__write()
+        row = self.conn.execute("SELECT properties FROM entities WHERE key = ?", (key,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def keys(self):
+        """\
+        Iterate over the keys of the stored entities, in insertion order.
+        """
+        last = 0
+        while True:
+            self.__write()
+            rows = self.conn.execute(
+                f"SELECT rowid, key FROM entities WHERE rowid > ? ORDER BY rowid LIMIT {BATCH_SIZE}", (last,)
+            ).fetchall()
+            for _, key in rows:
+                yield key
+            if len(rows) < BATCH_SIZE:
+                return
+            last = rows[-1][0]
+
+    def items(self):
+        """\
+        Iterate over (key, JSON-LD) pairs for the stored entities, in
+        insertion order, without instantiating them.
+        """
+        last = 0
+        while True:
+            self.__write()
+            rows = self.conn.execute(
+                f"SELECT rowid, key, properties FROM entities WHERE rowid > ? ORDER BY rowid LIMIT {BATCH_SIZE}", (last,)
+            ).fetchall()
+            for _, key, text in rows:
+                entity = self.__in_memory(key)
+                if entity is None and self.__released:
+                    # the entity may have been dropped with unsaved changes
+                    self.__settle()
+                    self.__write()
+                    row = self.conn.execute("SELECT properties FROM entities WHERE key = ?", (key,)).fetchone()
+                    text = text if row is None else row[0]
+                yield key, json.loads(text) if entity is None else entity._jsonld
+            if len(rows) < BATCH_SIZE:
+                return
+            last = rows[-1][0]
+
+    def values(self, role=None, type_=None):
+        """\
+        Iterate over the stored entities, in insertion order, optionally
+        selecting those with the given role and/or type. Entities are
+        fetched in batches.
+        """
+        query, head, tail = f"SELECT {COLUMNS} FROM entities e", [], []
+        if type_ is not None:
+            query += " JOIN entity_types t ON t.key = e.key AND t.type = ?"
+            head.append(type_)
+        query += " WHERE e.rowid > ?"
+        if role is not None:
+            query += " AND e.role = ?"
+            tail.append(role)
+        query += f" ORDER BY e.rowid LIMIT {BATCH_SIZE}"
+        last = 0
+        while True:
+            # each batch is a separate query, so writes can happen in between
+            self.__write()
+            rows = self.conn.execute(query, head + [last] + tail).fetchall()
+            for row in rows:
+                yield self.__load(row)
+            if len(rows) < BATCH_SIZE:
+                return
+            last = rows[-1][0]
@@ -19,8 +19,14 @@
 # limitations under the License.
 
 import os
+import re
 from datetime import datetime, timezone
-from urllib.parse import urlsplit
+from functools import lru_cache
+from urllib.parse import urljoin, urlsplit
+
+# what makes an id "exotic" for join_id: scheme, query and params delimiters,
+# backslashes, whitespace and controls (which urlsplit strips), absolute paths
+_EXOTIC_ID_RE = re.compile(r"[:?;\\\x00-\x20\x7f]|^/")
 
 
 def is_url(string):
@@ -62,6 +68,22 @@ def get_norm_value(json_entity, prop):
         raise ValueError(f"Malformed value for {prop!r}: {json_entity.get(prop)!r}")
 
 
+def as_number(value):
+    """\
+    Return value if it is a number (an int or a float, not a bool), the
+    integer it holds if it is a string such as "1024" (sizes often come as
+    strings), else None.
+    """
+    if value.__class__ in (int, float):
+        return value
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            return None
+    return None
+
+
 def walk(top, topdown=True, onerror=None, followlinks=False, exclude=None):
     exclude = frozenset(exclude or [])
     for root, dirs, files in os.walk(top):
@@ -69,3 +91,44 @@ def walk(top, topdown=True, onerror=None, followlinks=False, exclude=None):
             dirs[:] = [_ for _ in dirs if _ not in exclude]
             files[:] = [_ for _ in files if _ not in exclude]
         yield root, dirs, files
+
+
+@lru_cache(maxsize=64)
+def _is_simple_base(base_uri):
+    parts = urlsplit(base_uri)
+    return bool(parts.scheme and parts.netloc) and parts.path == "/" and not (parts.query or parts.fragment) \
+        and base_uri == f"{parts.scheme}://{parts.netloc}/"
+
+
+def join_id(base_uri, id_):
+    """\
+    Resolve id_ against base_uri and strip any trailing slashes.
+
+    Same as urljoin(base_uri, id_).rstrip("/") if id_ is not a URL (as
+    defined by is_url), else id_.rstrip("/"). Relative paths (possibly with a
+    fragment) are handled in a single pass when the base is of the form
+    "scheme://authority/", which is the case for crate base URIs; other ids
+    go through urljoin.
+    """
+    if not isinstance(id_, str) or _EXOTIC_ID_RE.search(id_) or not _is_simple_base(base_uri):
+        if not is_url(id_):
+            id_ = urljoin(base_uri, id_)  # also does path normalization
+        return id_.rstrip("/")
+    path, sep, fragment = id_.partition("#")
+    if path:
+        # remove dot segments and collapse repeated slashes, like urljoin
+        segments = []
+        for seg in path.split("/"):
+            if seg == "..":
+                if segments:
+                    segments.pop()
+            elif seg and seg != ".":
+                segments.append(seg)
+        resolved = base_uri + "/".join(segments)
+        if segments and seg in ("", ".", ".."):
+            resolved += "/"
+    else:
+        resolved = base_uri
+    if fragment:
+        resolved = f"{resolved}#{fragment}"
+    return resolved.rstrip("/")
@@ -18,25 +18,199 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+"""\
+Access to the vocabularies bundled with the package.
+
+Lookups are served from ``data/vocabs.idx``, a compact binary index compiled
+from ``data/ro-crate.jsonld`` and ``data/schema.jsonld`` (see
+``data/update.sh``). The index is memory-mapped, so opening it costs next to
+nothing and its pages are shared by all processes that use it. If the index
+is not available, lookups fall back to the JSON-LD sources.
+
+The parsed JSON-LD documents are still available as ``RO_CRATE``, ``SCHEMA``
+and ``SCHEMA_MAP``: they are materialized on first attribute access and
+cached in the module namespace.
+"""
+
 import json
-import pkg_resources
+import mmap
+import os
+import struct
+
+DATA_DIR = os.path.join(os.path.abspath(os.path.dirname(__file__)), "data")
+INDEX_PATH = os.path.join(DATA_DIR, "vocabs.idx")
+
+# Index layout (all integers are little-endian uint32, offsets are absolute):
+#   header: magic, then the offset of each table in TABLES order
+#   table:  entry count, then (key_off, key_len, value_off, value_len) for
+#           each entry, sorted by UTF-8 encoded key
+#   blob:   UTF-8 encoded keys and values
+INDEX_MAGIC = b"RCVOCAB\x01"
+TABLES = ("terms", "comments", "superclasses")
+_HEADER = struct.Struct("<8s%dI" % len(TABLES))
+_COUNT = struct.Struct("<I")
+_ENTRY = struct.Struct("<4I")
+_SEP = "\n"
+
+
+def _load_json(name):
+    with open(os.path.join(DATA_DIR, name), "rb") as f:
+        return json.load(f)
+
+
+def _load_schema_map():
+    return dict((e["@id"], e) for e in _get("SCHEMA")["@graph"])
+
+
+_LOADERS = {
+    "RO_CRATE": lambda: _load_json("ro-crate.jsonld"),
+    "SCHEMA": lambda: _load_json("schema.jsonld"),
+    "SCHEMA_MAP": _load_schema_map,
+}
+
+
+def _get(name):
+    try:
+        return globals()[name]
+    except KeyError:
+        value = globals()[name] = _LOADERS[name]()
+        return value
+
 
-# FIXME: Avoid eager loading?
-RO_CRATE = json.loads(pkg_resources.resource_string(
-    __name__, "data/ro-crate.jsonld"
-))
-SCHEMA = json.loads(pkg_resources.resource_string(
-    __name__, "data/schema.jsonld"
-))
-SCHEMA_MAP = dict((e["@id"], e) for e in SCHEMA["@graph"])
+def __getattr__(name):
+    if name in _LOADERS:
+        return _get(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _is_class(entry):
+    t = entry.get("@type", [])
+    return "rdfs:Class" in (t if isinstance(t, list) else [t])
+
+
+def _superclass_closure(schema_map, uri):
+    closure = []
+    queue = [uri]
+    while queue:
+        entry = schema_map.get(queue.pop(0), {})
+        parents = entry.get("rdfs:subClassOf", [])
+        for p in (parents if isinstance(parents, list) else [parents]):
+            if p["@id"] not in closure and p["@id"] != uri:
+                closure.append(p["@id"])
+                queue.append(p["@id"])
+    return closure
+
+
+class VocabIndex:
+    """\
+    Read-only, memory-mapped view of a compiled vocabulary index.
+    """
+
+    def __init__(self, path=INDEX_PATH):
+        with open(path, "rb") as f:
+            self._buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, *offsets = _HEADER.unpack_from(self._buf)
+        if magic != INDEX_MAGIC:
+            raise ValueError(f"{path} is not a vocabulary index")
+        self._tables = dict(zip(TABLES, offsets))
+
+    def lookup(self, table, key):
+        buf = self._buf
+        base = self._tables[table]
+        n, = _COUNT.unpack_from(buf, base)
+        start = base + _COUNT.size
+        k = key.encode("utf-8")
+        lo, hi = 0, n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            key_off, key_len, value_off, value_len = _ENTRY.unpack_from(buf, start + mid * _ENTRY.size)
+            probe = buf[key_off:key_off + key_len]
+            if probe < k:
+                lo = mid + 1
+            elif probe > k:
+                hi = mid
+            else:
+                return buf[value_off:value_off + value_len].decode("utf-8")
+        raise KeyError(key)
+
+
+def compile_index(out_path=INDEX_PATH):
+    """\
+    Compile the bundled JSON-LD vocabularies into a binary index.
+    """
+    schema_map = _get("SCHEMA_MAP")
+    tables = {
+        "terms": _get("RO_CRATE")["@context"],
+        "comments": {k: v.get("rdfs:comment", "") for k, v in schema_map.items()},
+        "superclasses": {
+            k: _SEP.join(_superclass_closure(schema_map, k))
+            for k, v in schema_map.items() if _is_class(v)
+        },
+    }
+    header_size = _HEADER.size
+    table_offsets = []
+    offset = header_size
+    for name in TABLES:
+        table_offsets.append(offset)
+        offset += _COUNT.size + _ENTRY.size * len(tables[name])
+    blob = bytearray()
+    chunks = []
+    for name in TABLES:
+        items = sorted((k.encode("utf-8"), v.encode("utf-8")) for k, v in tables[name].items())
+        chunk = bytearray(_COUNT.pack(len(items)))
+        for k, v in items:
+            key_off = offset + len(blob)
+            blob += k
+            value_off = offset + len(blob)
+            blob += v
+            chunk += _ENTRY.pack(key_off, len(k), value_off, len(v))
+        chunks.append(chunk)
+    with open(out_path, "wb") as f:
+        f.write(_HEADER.pack(INDEX_MAGIC, *table_offsets))
+        for chunk in chunks:
+            f.write(chunk)
+        f.write(blob)
+
+
+def _index():
+    try:
+        return globals()["_INDEX"]
+    except KeyError:
+        try:
+            index = VocabIndex()
+        except (FileNotFoundError, ValueError):
+            index = None
+        globals()["_INDEX"] = index
+        return index
 
 
 def term_to_uri(name):
     # NOTE: Assumes RO-Crate's flat-style context
-    return RO_CRATE["@context"][name]
+    index = _index()
+    if index:
+        return index.lookup("terms", name)
+    return _get("RO_CRATE")["@context"][name]
 
 
 def schema_doc(uri):
     # NOTE: Ensure rdfs:comment still appears in newer schema.org downloads
     # TODO: Support terms outside schema.org?
-    return SCHEMA_MAP[uri].get("rdfs:comment", "")
+    index = _index()
+    if index:
+        return index.lookup("comments", uri)
+    return _get("SCHEMA_MAP")[uri].get("rdfs:comment", "")
+
+
+def superclasses(uri):
+    """\
+    Return the URIs of all (direct and indirect) superclasses of the given
+    schema.org class, closest first.
+    """
+    index = _index()
+    if index:
+        value = index.lookup("superclasses", uri)
+        return value.split(_SEP) if value else []
+    schema_map = _get("SCHEMA_MAP")
+    if not _is_class(schema_map[uri]):
+        raise KeyError(uri)
+    return _superclass_closure(schema_map, uri)
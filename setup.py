@@ -69,7 +69,7 @@ setup(
     )),
     python_requires='>=3.7',
     author_email='stain@apache.org',
-    package_data={'': ['data/*.jsonld', 'templates/*.j2']},
+    package_data={'': ['data/*.jsonld', 'data/*.idx', 'templates/*.j2']},
     # SPDX, pending https://github.com/pombredanne/spdx-pypi-pep/pull/2
     license="Apache-2.0",
     url='https://github.com/ResearchObject/ro-crate-py/',
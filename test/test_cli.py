@@ -21,7 +21,7 @@ import click
 from click.testing import CliRunner
 import pytest
 
-from rocrate.cli import cli
+from rocrate.cli import cli, op_to_args
 from rocrate.model.file import File
 from rocrate.model.metadata import TESTING_EXTRA_TERMS
 from rocrate.rocrate import ROCrate
@@ -274,3 +274,79 @@ def test_cli_write_zip(test_data_dir, monkeypatch, cwd):
 
     crate = ROCrate(output_zip_path)
     assert crate.mainEntity is not None
+
+
+@pytest.mark.parametrize("json_ops", [False, True])
+def test_cli_batch(test_data_dir, helpers, monkeypatch, json_ops):
+    crate_dir = test_data_dir / "ro-crate-galaxy-sortchangecase"
+    runner = CliRunner()
+    assert runner.invoke(cli, ["init", "-c", str(crate_dir)]).exit_code == 0
+    monkeypatch.chdir(str(crate_dir))
+    def_id = "test/test1/sort-and-change-case-test.yml"
+    if json_ops:
+        ops = [
+            {"command": "add workflow", "path": "sort-and-change-case.ga", "language": "galaxy"},
+            {"command": "add test-suite", "identifier": "test1"},
+            {"command": "add test-instance", "suite": "test1", "url": "http://example.com", "resource": "jobs",
+             "identifier": "test1_1"},
+            {"command": "add test-definition", "suite": "test1", "path": def_id, "engine-version": ">=0.70"},
+        ]
+        lines = [json.dumps(_) for _ in ops]
+    else:
+        lines = [
+            "add workflow -l galaxy sort-and-change-case.ga",
+            "# comment",
+            "add test-suite -i test1",
+            "",
+            "add test-instance test1 http://example.com -r jobs -i test1_1",
+            f"add test-definition test1 {def_id} -v '>=0.70'",
+        ]
+    result = runner.invoke(cli, ["batch"], input="\n".join(lines))
+    assert result.exit_code == 0, result.output
+    assert result.output.split() == ["#test1", "#test1_1"]
+    json_entities = helpers.read_json_entities(crate_dir)
+    helpers.check_wf_crate(json_entities, "sort-and-change-case.ga")
+    assert json_entities["#test1"]["instance"] == [{"@id": "#test1_1"}]
+    assert json_entities["#test1"]["definition"] == {"@id": def_id}
+    assert json_entities[def_id]["engineVersion"] == ">=0.70"
+
+
+def test_cli_batch_error(test_data_dir, helpers):
+    crate_dir = test_data_dir / "ro-crate-galaxy-sortchangecase"
+    runner = CliRunner()
+    assert runner.invoke(cli, ["init", "-c", str(crate_dir)]).exit_code == 0
+    metadata_path = crate_dir / helpers.METADATA_FILE_NAME
+    before = metadata_path.read_text()
+    ops_path = crate_dir.parent / "ops.txt"
+    for bad_op in "add test-instance test1 http://example.com -s foo", "init", '{"command": "add foo"}':
+        ops_path.write_text(f"add test-suite -i test1\n{bad_op}\n")
+        result = runner.invoke(cli, ["batch", "-c", str(crate_dir), str(ops_path)])
+        assert result.exit_code == 2
+        assert "line 2" in result.output
+        assert metadata_path.read_text() == before
+
+
+def test_cli_batch_value_error(test_data_dir, helpers):
+    crate_dir = test_data_dir / "ro-crate-galaxy-sortchangecase"
+    runner = CliRunner()
+    assert runner.invoke(cli, ["init", "-c", str(crate_dir)]).exit_code == 0
+    metadata_path = crate_dir / helpers.METADATA_FILE_NAME
+    before = metadata_path.read_text()
+    ops_path = crate_dir.parent / "ops.txt"
+    outside = test_data_dir / "sample_cwl_wf.cwl"
+    for bad_op in "add test-instance nosuchsuite http://example.com", f"add workflow {outside}":
+        ops_path.write_text(f"add test-suite -i test1\n{bad_op}\n")
+        result = runner.invoke(cli, ["batch", "-c", str(crate_dir), str(ops_path)])
+        assert result.exit_code == 1
+        assert "line 2: " in result.output
+        assert not isinstance(result.exception, ValueError)
+        assert metadata_path.read_text() == before
+
+
+def test_op_to_args():
+    op = {"command": "add test-instance", "suite": "#s", "url": "http://example.com", "service": "github"}
+    assert op_to_args(op) == ["add", "test-instance", "--service", "github", "--", "#s", "http://example.com"]
+    assert op_to_args({"command": "init", "gen-preview": True}) == ["init", "--gen-preview", "--"]
+    for bad_op in {"suite": "#s"}, {"command": "add foo"}, {"command": "add test-suite", "foo": "bar"}:
+        with pytest.raises(ValueError):
+            op_to_args(bad_op)
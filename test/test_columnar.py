@@ -0,0 +1,191 @@
+# Copyright 2019-2022 The University of Manchester, UK
+# Copyright 2020-2022 Vlaams Instituut voor Biotechnologie (VIB), BE
+# Copyright 2020-2022 Barcelona Supercomputing Center (BSC), ES
+# Copyright 2020-2022 Center for Advanced Studies, Research and Development in Sardinia (CRS4), IT
+# Copyright 2022 École Polytechnique Fédérale de Lausanne, CH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+import pytest
+
+import rocrate.columnar
+from rocrate.columnar import FileTable
+from rocrate.model.file import File
+from rocrate.rocrate import ROCrate
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "python"])
+def numpy(request, monkeypatch):
+    if request.param:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(rocrate.columnar, "_numpy", lambda: None)
+    return request.param
+
+
+def test_file_table(numpy):
+    table = FileTable()
+    for i in range(10):
+        properties = {"@type": "File", "contentSize": i, "encodingFormat": "text/plain" if i % 2 else "text/csv"}
+        if i % 3 == 0:
+            properties["author"] = {"@id": f"#person_{i % 2}"}
+        table.append(f"f{i}", f"f{i}", properties)
+    with pytest.raises(ValueError):
+        table.append("f0", "f0", {})
+    assert len(table) == 10
+    assert "f3" in table
+    assert table.row("f3") == 3
+    assert table.row("foo") is None
+    assert {k: v.kind for k, v in table.columns.items()} == {
+        "contentSize": "int", "encodingFormat": "category", "author": "category"
+    }
+    assert table.count(by="encodingFormat") == {"text/csv": 5, "text/plain": 5}
+    assert table.count(by="author") == {"#person_0": 2, "#person_1": 2}
+    assert table.sum("contentSize") == 45
+    assert table.sum("contentSize", by="encodingFormat") == {"text/csv": 20, "text/plain": 25}
+    assert table.sum("contentSize", by="author") == {"#person_0": 6, "#person_1": 12}
+    assert table.sum("foo") == 0
+    assert table.sum("foo", by="encodingFormat") == {}
+    with pytest.raises(TypeError):
+        table.sum("encodingFormat")
+    # rows
+    row = rocrate.columnar.FileTableRow(table, 3)
+    assert dict(row) == {
+        "@id": "f3", "@type": "File", "contentSize": 3, "encodingFormat": "text/plain", "author": {"@id": "#person_1"}
+    }
+    row["contentSize"] = 30
+    row["name"] = "foo"
+    del row["author"]
+    with pytest.raises(KeyError):
+        del row["author"]
+    with pytest.raises(KeyError):
+        row["@id"] = "f33"
+    assert dict(row) == {"@id": "f3", "@type": "File", "contentSize": 30, "encodingFormat": "text/plain", "name": "foo"}
+    assert "name" not in rocrate.columnar.FileTableRow(table, 2)
+    assert table.sum("contentSize") == 72
+    assert table.count(by="author") == {"#person_0": 2, "#person_1": 1}
+    # values that don't fit turn the column into a list of objects
+    row["contentSize"] = "30"
+    assert table.columns["contentSize"].kind == "object"
+    assert table.sum("contentSize") == 72
+    row["contentSize"] = "thirty"
+    with pytest.raises(TypeError):
+        table.sum("contentSize")
+    row["contentSize"] = 30.5
+    assert table.sum("contentSize") == 72.5
+    assert table.sum("contentSize", by="encodingFormat") == {"text/csv": 20, "text/plain": 52.5}
+    assert table.discard("f3")
+    assert not table.discard("f3")
+    assert len(table) == 9
+    assert list(table.rows()) == [0, 1, 2, 4, 5, 6, 7, 8, 9]
+    assert table.count(by="encodingFormat") == {"text/csv": 5, "text/plain": 4}
+    assert table.sum("contentSize") == 42
+
+
+def test_string_sizes(numpy):
+    table = FileTable()
+    for i in range(6):
+        table.append(f"f{i}", f"f{i}", {"contentSize": str(i), "encodingFormat": "text/plain" if i % 2 else "text/csv"})
+    table.append("f6", "f6", {"encodingFormat": "text/csv"})
+    assert table.columns["contentSize"].kind == "category"
+    assert table.sum("contentSize") == 15
+    assert table.sum("contentSize", by="encodingFormat") == {"text/csv": 6, "text/plain": 9}
+    table.append("f7", "f7", {"contentSize": 0.5, "encodingFormat": "text/csv"})
+    assert table.sum("contentSize", by="encodingFormat") == {"text/csv": 6.5, "text/plain": 9}
+
+
+def test_large_sizes(numpy):
+    table = FileTable()
+    size = 1 << 62
+    for i in range(4):
+        table.append(f"f{i}", f"f{i}", {"contentSize": size, "encodingFormat": "text/csv" if i else "text/plain"})
+    assert table.columns["contentSize"].kind == "int"
+    assert table.sum("contentSize") == 4 * size
+    assert table.sum("contentSize", by="encodingFormat") == {"text/csv": 3 * size, "text/plain": size}
+    table.append("f4", "f4", {"contentSize": -size, "encodingFormat": "text/csv"})
+    assert table.sum("contentSize") == 3 * size
+
+
+def test_many_categories(monkeypatch):
+    monkeypatch.setattr(rocrate.columnar, "MAX_CATEGORIES", 4)
+    table = FileTable()
+    for i in range(10):
+        table.append(f"f{i}", f"f{i}", {"sha256": f"{i:064x}", "encodingFormat": "text/plain"})
+    assert table.columns["sha256"].kind == "object"
+    assert table.columns["encodingFormat"].kind == "category"
+    assert table.count(by="sha256") == {f"{i:064x}": 1 for i in range(10)}
+
+
+def test_columnar_crate(test_data_dir, tmpdir):
+    crate_dir = test_data_dir / "read_crate"
+    crate = ROCrate(crate_dir, columnar=True)
+    expected = ROCrate(crate_dir)
+    assert len(crate.file_table) == 1
+    f = crate.dereference("test_file_galaxy.txt")
+    assert type(f) is File
+    assert f == expected.dereference("test_file_galaxy.txt")
+    assert f.source == crate_dir / "test_file_galaxy.txt"
+    assert f in crate.data_entities
+    assert f in crate.root_dataset["hasPart"]
+    assert set(_.id for _ in crate.data_entities) == set(_.id for _ in expected.data_entities)
+    assert set(_.id for _ in crate.get_entities()) == set(_.id for _ in expected.get_entities())
+    # views write to the table
+    f["name"] = "Galaxy test file"
+    assert crate.dereference("test_file_galaxy.txt")["name"] == "Galaxy test file"
+    expected.dereference("test_file_galaxy.txt")["name"] = "Galaxy test file"
+    out_path = tmpdir / "out"
+    crate.write(out_path)
+    assert (out_path / "test_file_galaxy.txt").is_file()
+    with open(out_path / "ro-crate-metadata.json") as f_out:
+        graph = {_["@id"]: _ for _ in json.load(f_out)["@graph"]}
+    assert graph == {_["@id"]: _ for _ in expected.metadata.generate()["@graph"]}
+    # adding an entity with the same id replaces the row
+    crate.add(f)
+    assert len(crate.file_table) == 0
+    assert crate.dereference("test_file_galaxy.txt") is f
+    assert f["name"] == "Galaxy test file"
+    assert len(crate.root_dataset["hasPart"]) == len(expected.root_dataset["hasPart"])
+    crate = ROCrate(crate_dir, columnar=True)
+    crate.delete("test_file_galaxy.txt")
+    assert len(crate.file_table) == 0
+    assert crate.dereference("test_file_galaxy.txt") is None
+    assert "test_file_galaxy.txt" not in [_.id for _ in crate.root_dataset["hasPart"]]
+
+
+def test_columnar_order_and_type(tmpdir):
+    crate = ROCrate()
+    for i in range(4):
+        crate.add_file(dest_path=f"f{i}.txt", properties={"contentSize": str(i)})
+        crate.add_dataset(dest_path=f"d{i}")
+    crate.metadata.write(tmpdir)
+    expected = ROCrate(tmpdir, metadata_only=True)
+    crate = ROCrate(tmpdir, metadata_only=True, columnar=True)
+    assert len(crate.file_table) == 4
+    # views are where the entities would be in an eager crate
+    assert [_.id for _ in crate.get_entities()] == [_.id for _ in expected.get_entities()]
+    assert [_.id for _ in crate.data_entities] == [_.id for _ in expected.data_entities]
+    assert crate.subtree_size("./") == crate.file_table.sum("contentSize") == 6
+    # the table only holds plain Files: changing the @type moves the row out
+    f = crate.dereference("f1.txt")
+    f.type = ["File", "Person"]
+    assert len(crate.file_table) == 3
+    assert crate.dereference("f1.txt") is f
+    assert f.type == ["File", "Person"]
+    assert f["contentSize"] == "1"
+    assert crate.get_by_type("Person") == [f]
+    for e in crate, expected:
+        e.dereference("f1.txt").type = ["File", "Person"]
+    assert [_.id for _ in crate.get_entities()] == [_.id for _ in expected.get_entities()]
+    assert crate.metadata.generate() == expected.metadata.generate()
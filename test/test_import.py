@@ -0,0 +1,94 @@
+# Copyright 2019-2022 The University of Manchester, UK
+# Copyright 2020-2022 Vlaams Instituut voor Biotechnologie (VIB), BE
+# Copyright 2020-2022 Barcelona Supercomputing Center (BSC), ES
+# Copyright 2020-2022 Center for Advanced Studies, Research and Development in Sardinia (CRS4), IT
+# Copyright 2022 École Polytechnique Fédérale de Lausanne, CH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Only needed for conversions, previews, date parsing, remote entities or fast JSON
+DEFERRED_MODULES = [
+    "dateutil", "galaxy2cwl", "http.client", "jinja2", "numpy", "orjson", "simdjson", "sqlite3", "ujson",
+    "urllib.request"
+]
+# A stdlib module, not imported by rocrate, that is imported after
+# rocrate.rocrate in the same interpreter to get a machine-independent
+# bound: the cumulative import time of rocrate.rocrate must be less than
+# IMPORT_TIME_RATIO times that of REFERENCE_MODULE
+REFERENCE_MODULE = "asyncio"
+IMPORT_TIME_RATIO = float(os.getenv("ROCRATE_IMPORT_TIME_RATIO", "2.5"))
+
+
+def import_times(*modules):
+    """\
+    Import modules, in the given order, in a fresh interpreter with
+    -X importtime.
+
+    Return a dictionary that maps the name of each imported module to its
+    cumulative import time in seconds.
+    """
+    p = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "; ".join(f"import {_}" for _ in modules)],
+        check=True, capture_output=True, text=True
+    )
+    times = {}
+    for line in p.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split(":", 1)[1].split("|")
+        try:
+            times[name.strip()] = int(cumulative) / 1e6
+        except ValueError:
+            pass  # header
+    return times
+
+
+def test_deferred_imports():
+    times = import_times("rocrate.rocrate")
+    assert "rocrate.rocrate" in times
+    for name in DEFERRED_MODULES:
+        assert name not in times, f"{name} imported by rocrate.rocrate"
+    assert REFERENCE_MODULE not in times
+
+
+def test_import_time():
+    ratios = []
+    for _ in range(3):
+        times = import_times("rocrate.rocrate", REFERENCE_MODULE)
+        ratios.append(times["rocrate.rocrate"] / times[REFERENCE_MODULE])
+    assert min(ratios) < IMPORT_TIME_RATIO
+
+
+def test_namespace():
+    import rocrate
+    from urllib.parse import urljoin
+    assert "_urlp" not in vars(rocrate) and "_uses" not in vars(rocrate)
+    assert urljoin("arcp://uuid,0/a/", "b.txt") == "arcp://uuid,0/a/b.txt"
+
+
+def test_deferred_features(test_data_dir):
+    pytest.importorskip("galaxy2cwl")
+    from rocrate.rocrate import ROCrate
+    from rocrate.model.computationalworkflow import galaxy_to_abstract_cwl
+    crate = ROCrate(gen_preview=True)
+    crate.datePublished = "2022-01-01T00:00:00+00:00"
+    assert crate.datePublished.year == 2022
+    assert "<html" in crate.preview.generate_html()
+    cwl_path = galaxy_to_abstract_cwl(test_data_dir / "test_galaxy_wf.ga")
+    assert os.path.getsize(cwl_path) > 0
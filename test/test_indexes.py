@@ -0,0 +1,142 @@
+# Copyright 2019-2022 The University of Manchester, UK
+# Copyright 2020-2022 Vlaams Instituut voor Biotechnologie (VIB), BE
+# Copyright 2020-2022 Barcelona Supercomputing Center (BSC), ES
+# Copyright 2020-2022 Center for Advanced Studies, Research and Development in Sardinia (CRS4), IT
+# Copyright 2022 École Polytechnique Fédérale de Lausanne, CH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from rocrate.indexes import EntityIndexes, PathTrie, PropertyIndex
+from rocrate.model.file import File
+from rocrate.model.person import Person
+from rocrate.rocrate import ROCrate
+
+STORAGES = [{}, {"lazy": True}, {"columnar": True}, {"database": ""}]
+
+
+def test_property_index():
+    index = PropertyIndex()
+    index.add("text/csv", "a.csv")
+    index.add("text/csv", "b.csv")
+    index.add("text/csv", "a.csv")
+    assert list(index.get("text/csv")) == ["a.csv", "b.csv"]
+    index.remove("text/csv", "a.csv")
+    index.remove("text/csv", "b.csv")
+    assert index.get("text/csv") == {}
+    assert len(index) == 0
+
+
+def test_value_keys():
+    indexes = EntityIndexes(lambda id_: id_.lstrip("#"))
+    assert indexes.value_keys([{"@id": "#alice"}, "x", 1, True, None, {"@value": 1}, [1]]) == [
+        ("@id", "alice"), "x", 1, ("@bool", True), None
+    ]
+    indexes.update("a", "author", None, {"@id": "#alice"})  # no index built: nothing to do
+    assert not indexes
+
+
+@pytest.mark.parametrize("options", STORAGES)
+def test_find(tmpdir, options):
+    crate = ROCrate()
+    crate.add(Person(crate, "#alice"), Person(crate, "#bob"))
+    for i in range(6):
+        crate.add(File(crate, dest_path=f"{i}.txt", properties={
+            "encodingFormat": "text/csv" if i % 2 else "text/plain",
+            "author": {"@id": "#alice" if i < 3 else "#bob"},
+            "contentSize": i,
+        }))
+    crate.metadata.write(tmpdir)
+    crate = ROCrate(tmpdir, metadata_only=True, **options)
+
+    def ids(**kwargs):
+        return sorted(_.id for _ in crate.find(**kwargs))
+
+    alice = crate.dereference("#alice")
+    assert ids(type="Person") == ["#alice", "#bob"]
+    assert ids(encodingFormat="text/csv") == ["1.txt", "3.txt", "5.txt"]
+    assert ids(encodingFormat="text/csv", author=alice) == ["1.txt"]
+    assert ids(type="File", author="#bob", encodingFormat="text/plain") == ["4.txt"]
+    assert ids(author={"@id": "#alice"}, contentSize=2) == ["2.txt"]
+    assert ids(contentSize=[0, 5]) == ["0.txt", "5.txt"]
+    assert ids(encodingFormat="text/csv", foo="bar") == []
+    assert ids(contentSize=[]) == []
+    assert len(crate.find()) == 10
+    # the indexes are kept up to date
+    f = crate.dereference("1.txt")
+    f["encodingFormat"] = "text/plain"
+    f.append_to("author", crate.dereference("#bob"))
+    assert ids(encodingFormat="text/csv") == ["3.txt", "5.txt"]
+    assert ids(author="#bob", encodingFormat="text/plain") == ["1.txt", "4.txt"]
+    crate.delete("4.txt")
+    crate.add(File(crate, dest_path="6.txt", properties={"encodingFormat": "text/plain"}))
+    assert ids(encodingFormat="text/plain") == ["0.txt", "1.txt", "2.txt", "6.txt"]
+    alice.type = "Organization"
+    assert ids(type="Person") == ["#bob"]
+
+
+def test_path_trie():
+    trie = PathTrie()
+    for key in "a/", "a/b.txt", "a/c/", "a/c/d.txt", "e.txt", "x/y/z.txt":
+        trie.add(key)
+    assert len(trie) == 6
+    assert list(trie.keys()) == ["a/", "a/b.txt", "a/c/", "a/c/d.txt", "e.txt", "x/y/z.txt"]
+    assert list(trie.keys("a/c")) == list(trie.keys("a/c/")) == ["a/c/", "a/c/d.txt"]
+    assert list(trie.keys("x")) == ["x/y/z.txt"]
+    assert list(trie.keys("foo")) == list(trie.keys("e.txt/foo")) == []
+    assert "a/c/d.txt" in trie
+    assert "a/c" not in trie
+    assert "x/y/" not in trie
+    trie.remove("x/y/z.txt")
+    trie.remove("a/")
+    trie.remove("foo/bar")
+    assert list(trie.keys()) == ["a/b.txt", "a/c/", "a/c/d.txt", "e.txt"]
+    trie.remove("a/c/d.txt")
+    trie.remove("a/b.txt")
+    assert list(trie.keys("a")) == ["a/c/"]
+    trie.add("a/c/")
+    assert len(trie) == 2
+
+
+@pytest.mark.parametrize("options", STORAGES)
+def test_subtree(tmpdir, options):
+    crate = ROCrate()
+    for path in "results/", "results/s1/", "results/s2/", "other/":
+        crate.add_dataset(dest_path=path)
+    for i in range(6):
+        crate.add_file(dest_path=f"results/s{i % 2 + 1}/{i}.txt", properties={"contentSize": str(i) if i % 3 else i})
+    crate.add_file(dest_path="other/x.txt", properties={"contentSize": "n/a"})
+    crate.add(Person(crate, "#alice"))
+    crate.metadata.write(tmpdir)
+    crate = ROCrate(tmpdir, metadata_only=True, **options)
+
+    def ids(path):
+        return sorted(_.id for _ in crate.subtree(path))
+
+    assert ids("results/s1") == ["results/s1/", "results/s1/0.txt", "results/s1/2.txt", "results/s1/4.txt"]
+    assert [_.id for _ in crate.subtree("results/s1/")][0] == "results/s1/"
+    assert "ro-crate-metadata.json" in ids("")
+    assert "#alice" not in ids("")
+    assert ids("foo") == []
+    assert crate.subtree_size("results/s2") == 1 + 3 + 5
+    assert crate.subtree_size("results") == 15
+    assert crate.subtree_size("other") == 0
+    crate.add_file(dest_path="results/s1/6.txt", properties={"contentSize": 6})
+    assert crate.subtree_size("results/s1") == 12
+    crate.delete_subtree("results/s1")
+    assert ids("results") == ["results/", "results/s2/", "results/s2/1.txt", "results/s2/3.txt", "results/s2/5.txt"]
+    assert crate.dereference("results/s1/0.txt") is None
+    assert "results/s1/" not in [_["@id"] for _ in crate.root_dataset["hasPart"]]
+    crate.delete_subtree("")
+    assert ids("") == ["ro-crate-metadata.json"]
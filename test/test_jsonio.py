@@ -0,0 +1,86 @@
+# Copyright 2019-2022 The University of Manchester, UK
+# Copyright 2020-2022 Vlaams Instituut voor Biotechnologie (VIB), BE
+# Copyright 2020-2022 Barcelona Supercomputing Center (BSC), ES
+# Copyright 2020-2022 Center for Advanced Studies, Research and Development in Sardinia (CRS4), IT
+# Copyright 2022 École Polytechnique Fédérale de Lausanne, CH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+import pytest
+
+from rocrate import jsonio
+from rocrate.rocrate import ROCrate
+
+DUMP_BACKENDS = [pytest.param(_, marks=pytest.mark.skipif(
+    _ not in jsonio.available_backends(), reason=f"{_} not installed"
+)) for _ in jsonio.DUMP_BACKENDS]
+LOAD_BACKENDS = [pytest.param(_, marks=pytest.mark.skipif(
+    _ not in jsonio.available_backends(), reason=f"{_} not installed"
+)) for _ in jsonio.LOAD_BACKENDS]
+
+DOC = {
+    "@context": ["https://w3id.org/ro/crate/1.1/context", {"x": "http://example.org/x"}],
+    "@graph": [
+        {
+            "@id": "#a",
+            "name": "café \U0001d11e \x7f \x00\x1f\t\n\"\\/ :,[",
+            "members": [1e16, 1e15, 1e-05, 0.0001, -0.0, 1.5, -2, 2 ** 63 - 1],
+            "float": 1e-07,
+            "big": 123456789012345678.0,
+            "nested": [[], {}, [{"z": 1, "a": [0.1, "1.5"]}], True, False, None],
+            "é": "sorted last",
+            "Z": "sorted first",
+        },
+        {"@id": "#b", "weird": "line ends with 1.5,", "count": 3},
+    ],
+}
+
+
+@pytest.mark.parametrize("backend", DUMP_BACKENDS)
+def test_dumps(backend):
+    assert jsonio.dumps(DOC, backend=backend) == json.dumps(DOC, indent=4, sort_keys=True)
+    # fall back to the stdlib encoder for what the backend can't handle
+    for obj in {"a": 2 ** 70}, {1: "a"}, {"a": "\ud800"}, {"a": [None, {"b": float("nan")}]}, {"a": -float("inf")}:
+        assert jsonio.dumps(obj, backend=backend) == json.dumps(obj, indent=4, sort_keys=True)
+    with pytest.raises(TypeError):
+        jsonio.dumps({"a": object()}, backend=backend)
+
+
+@pytest.mark.parametrize("backend", LOAD_BACKENDS)
+def test_loads(backend):
+    text = json.dumps(DOC)
+    assert jsonio.loads(text, backend=backend) == DOC
+    assert jsonio.loads(text.encode("utf-8"), backend=backend) == DOC
+    with pytest.raises(ValueError):
+        jsonio.loads('{"a": 1', backend=backend)
+
+
+def test_backends():
+    assert jsonio.available_backends()[-1] == "json"
+    with pytest.raises(ValueError):
+        jsonio.dumps({}, backend="foo")
+    with pytest.raises(ValueError):
+        jsonio.loads("{}", backend="foo")
+
+
+def test_metadata_write(test_data_dir, tmpdir, helpers):
+    crate = ROCrate(test_data_dir / "read_crate")
+    crate.root_dataset["description"] = "été \U0001f600"
+    crate.root_dataset["version"] = 1.0
+    crate.root_dataset["score"] = float("nan")
+    out_path = tmpdir / "crate_out"
+    crate.write(out_path)
+    expected = json.dumps(crate.metadata.generate(), indent=4, sort_keys=True)
+    assert (out_path / helpers.METADATA_FILE_NAME).read_text(encoding="ascii") == expected
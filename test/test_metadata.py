@@ -16,10 +16,20 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
+
 import pytest
 from copy import deepcopy
 
-from rocrate.metadata import find_root_entity_id
+import rocrate.metadata
+from rocrate.jsonio import LOAD_BACKENDS, available_backends
+from rocrate.metadata import find_root_entity_id, iter_graph, read_metadata
+
+BACKENDS = ["python", pytest.param("ijson", marks=pytest.mark.skipif(
+    not rocrate.metadata._ijson_available(), reason="ijson not installed"
+))] + [pytest.param(_, marks=pytest.mark.skipif(
+    _ not in available_backends(), reason=f"{_} not installed"
+)) for _ in LOAD_BACKENDS]
 
 
 @pytest.mark.parametrize("root,basename", [
@@ -180,3 +190,75 @@ def test_find_root_multiple_types():
     entities["./"]["@type"] = "NotADataset"
     with pytest.raises(ValueError):
         find_root_entity_id(entities)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 16])
+def test_read_metadata(test_data_dir, helpers, monkeypatch, backend, chunk_size):
+    monkeypatch.setattr(rocrate.metadata, "CHUNK_SIZE", chunk_size)
+    metadata_path = test_data_dir / "read_crate" / helpers.METADATA_FILE_NAME
+    with open(metadata_path) as f:
+        json_data = json.load(f)
+    json_data["@graph"].append({"@id": "#n", "@type": "Thing", "n": [12345, -1.5e3, True, None, "x\\\"y"]})
+    metadata_path.write_text(json.dumps(json_data, indent=None if chunk_size > 1 else 2))
+    context, entities = read_metadata(metadata_path, backend=backend)
+    assert context == json_data["@context"]
+    assert entities == {_["@id"]: _ for _ in json_data["@graph"]}
+    assert list(iter_graph(metadata_path, backend=backend)) == json_data["@graph"]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_iter_graph(tmpdir, backend):
+    metadata_path = tmpdir / "ro-crate-metadata.json"
+    metadata_path.write_text('{"@graph": [{"@id": "./"}, {"@id": "#a"}], "@context": "foo", "x": [1]}')
+    members = {}
+    graph = iter_graph(metadata_path, backend=backend, members=members)
+    assert next(graph) == {"@id": "./"}
+    assert list(graph) == [{"@id": "#a"}]
+    assert members["@context"] == "foo"
+    for text in '{"@graph": []}', '{"@context": "foo"}', "{}":
+        metadata_path.write_text(text)
+        with pytest.raises(ValueError):
+            read_metadata(metadata_path, backend=backend)
+    metadata_path.write_text('{"@context": "foo", "@graph": []}')
+    assert read_metadata(metadata_path, backend=backend) == ("foo", {})
+    for text in '{"@context": "foo", "@graph": [{"@id": "./"} {"@id": "#a"}]}', '{"@context": "foo"', "[]":
+        metadata_path.write_text(text)
+        with pytest.raises(ValueError):
+            read_metadata(metadata_path, backend=backend)
+    with pytest.raises(ValueError):
+        read_metadata(metadata_path, backend="foo")
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_intern(tmpdir, backend):
+    metadata_path = tmpdir / "ro-crate-metadata.json"
+    graph = [
+        {"@id": "./", "@type": "Dataset", "hasPart": [{"@id": "a.txt"}, {"@id": "b.txt"}]},
+        {"@id": "a.txt", "@type": "File", "author": {"@id": "#alice"}},
+        {"@id": "b.txt", "@type": ["File", "Thing"], "author": [{"@id": "#alice"}, {"@id": "#bob"}]},
+        {"@id": "#alice"},
+        {"@id": "#bob", "@type": "Person", "knows": {"@id": "#alice", "name": "Alice"}},
+    ]
+    metadata_path.write_text(json.dumps({"@context": "foo", "@graph": graph}))
+    _, entities = read_metadata(metadata_path, backend=backend, intern=True)
+    assert entities == {_["@id"]: _ for _ in graph}
+    # not interned by default
+    plain = read_metadata(metadata_path, backend=backend)[1]
+    assert plain == entities
+    assert plain["a.txt"]["author"] is not plain["b.txt"]["author"][0]
+    strings = read_metadata(metadata_path, backend=backend, intern="strings")[1]
+    assert strings == entities
+    assert strings["a.txt"]["author"] is not strings["b.txt"]["author"][0]
+    assert strings["a.txt"]["author"]["@id"] is strings["#alice"]["@id"]
+    root, a, b, alice, bob = entities.values()
+    assert a["author"] is b["author"][0]
+    assert a["author"]["@id"] is alice["@id"]
+    assert root["hasPart"][0]["@id"] is a["@id"]
+    assert a["@type"] is b["@type"][0]
+    assert list(a)[-1] is list(b)[-1]
+    # entities are never shared with references
+    assert alice is not a["author"]
+    assert bob["knows"] is not a["author"]
+    alice.pop("@id")
+    assert a["author"] == {"@id": "#alice"}
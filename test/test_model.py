@@ -18,13 +18,16 @@
 
 import datetime
 import json
+import pickle
 import tempfile
 import timeit
 import uuid
+from itertools import chain
 from pathlib import Path
 
 import pytest
 from rocrate.rocrate import ROCrate
+from rocrate.utils import get_norm_value
 from rocrate.model.data_entity import DataEntity
 from rocrate.model.file import File
 from rocrate.model.dataset import Dataset
@@ -85,6 +88,39 @@ def test_dereferencing_equivalent_id(test_data_dir, name):
         assert deref_entity is entity
 
 
+def test_resolve_id():
+    crate = ROCrate()
+    base = crate.arcp_base_uri
+    for id_, expected in [
+            ("./", base[:-1]),
+            ("foo/bar.txt", f"{base}foo/bar.txt"),
+            ("./a/../foo/", f"{base}foo"),
+            ("#x", f"{base}#x"),
+            ("http://example.org/a/", "http://example.org/a"),
+    ]:
+        assert crate.resolve_id(id_) == expected
+        assert crate.resolve_id(id_) == expected  # cached
+
+
+def test_canonical_id_cache(test_data_dir):
+    crate = ROCrate()
+    person = crate.add(Person(crate, "#joe"))
+    assert person.canonical_id() == f"{crate.arcp_base_uri}#joe"
+    person.id = "#jane"
+    assert person.canonical_id() == f"{crate.arcp_base_uri}#jane"
+    assert hash(person) == hash(f"{crate.arcp_base_uri}#jane")
+    # the entity map is keyed by the ids without the crate's base URI
+    f = crate.add_file(test_data_dir / "sample_file.txt", "a/b.txt")
+    url = "https://example.org/x.txt"
+    crate.add_file(url)
+    keys = set(crate._ROCrate__entity_map)
+    assert {"", "a/b.txt", url} <= keys
+    assert not any(_.startswith("arcp:") for _ in keys)
+    assert crate.dereference("a/./b.txt") is f
+    assert crate.dereference(f"{crate.arcp_base_uri}a/b.txt") is f
+    assert crate.dereference(crate.arcp_base_uri) is crate.root_dataset
+
+
 def test_data_entities(test_data_dir):
     crate = ROCrate()
     file_ = crate.add(File(crate, test_data_dir / 'sample_file.txt'))
@@ -109,6 +145,50 @@ def test_data_entities_perf():
     ).timeit(500) < 0.1
 
 
+@pytest.mark.parametrize("options", [{}, {"columnar": True}, {"database": ""}])
+def test_add_many(options):
+    crate = ROCrate(**options)
+    crate.add_file(dest_path="a.txt")
+    entities = (File(crate, dest_path=f"f{i}.txt") for i in range(3))
+    added = crate.add_many(chain(entities, [Person(crate, "#joe"), File(crate, dest_path="a.txt")]))
+    assert [_.id for _ in added] == ["f0.txt", "f1.txt", "f2.txt", "#joe", "a.txt"]
+    assert [_["@id"] for _ in crate.root_dataset._jsonld["hasPart"]] == ["a.txt", "f0.txt", "f1.txt", "f2.txt"]
+    assert crate.dereference("a.txt") is added[-1]
+    assert [_.id for _ in crate.contextual_entities] == ["#joe"]
+    assert crate.add_many([]) == []
+
+    def failing():
+        yield File(crate, dest_path="g.txt")
+        raise RuntimeError("no more files")
+    with pytest.raises(RuntimeError):
+        crate.add_many(failing())
+    assert crate.root_dataset["hasPart"][-1] is crate.dereference("g.txt")
+
+
+def test_add_files(test_data_dir):
+    crate = ROCrate()
+    added = crate.add_files(chain([
+        test_data_dir / "sample_file.txt",
+        str(test_data_dir / "test_add_dir"),
+        {"dest_path": "./a/.//b.txt", "properties": {"name": "b"}},
+        {"dest_path": "wf.cwl", "properties": {"@type": ["File", "SoftwareSourceCode", "ComputationalWorkflow"]}},
+        {"dest_path": "d", "properties": {"@type": "Dataset"}},
+        {"source": test_data_dir / "sample_cwl_wf.cwl", "dest_path": "x/y.cwl", "properties": {"@type": "Foo"}},
+    ], ({"dest_path": f"data/f{i}.txt"} for i in range(3))))
+    ids = ["sample_file.txt", "test_add_dir", "a/b.txt", "wf.cwl", "d/", "x/y.cwl"] + [f"data/f{i}.txt" for i in range(3)]
+    assert [_.id for _ in added] == ids
+    assert [type(_) for _ in added[3:6]] == [ComputationalWorkflow, Dataset, File]
+    assert added[2]["name"] == "b"
+    assert added[5].type == "Foo"
+    assert added[5].source == test_data_dir / "sample_cwl_wf.cwl"
+    for e in added:
+        assert e.canonical_id() == crate.resolve_id(e.id)
+        assert crate.dereference(e.id) is e
+    assert [_["@id"] for _ in crate.root_dataset._jsonld["hasPart"]] == ids
+    with pytest.raises(ValueError):
+        crate.add_files([{"dest_path": "/abs.txt"}])
+
+
 def test_remote_data_entities():
     crate = ROCrate()
     file_uri = "https://www.rfc-editor.org/rfc/rfc3986.txt"
@@ -324,6 +404,74 @@ def test_self_delete(test_data_dir):
     assert "hasPart" not in crate.root_dataset
 
 
+@pytest.mark.parametrize("options", [{}, {"lazy": True}, {"columnar": True}, {"database": ""}])
+def test_delete_many(tmpdir, helpers, options):
+    crate = ROCrate()
+    for i in range(10):
+        crate.add_file(f"f{i}.txt", properties={"name": f"f{i}"})
+        crate.add(Person(crate, f"#p{i}"))
+    crate.metadata.write(tmpdir)
+    crate = ROCrate(tmpdir, metadata_only=True, **options)
+    crate.delete_many(_ for _ in ["f1.txt", "f3.txt", crate.dereference("#p2"), "#p4", "missing.txt"])
+    ids = [f"f{i}.txt" for i in (0, 2, 4, 5, 6, 7, 8, 9)]
+    assert [_.id for _ in crate.data_entities] == ids
+    assert [_.id for _ in crate.contextual_entities] == [f"#p{i}" for i in (0, 1, 3, 5, 6, 7, 8, 9)]
+    # deleted and added back before hasPart is compacted
+    crate.delete("f5.txt", "f6.txt")
+    crate.add_file("new.txt")
+    crate.add_file("f6.txt")
+    crate.delete("f7.txt")
+    crate.add(Person(crate, "#p4"))
+    ids = [f"f{i}.txt" for i in (0, 2, 4, 8, 9)] + ["new.txt", "f6.txt"]
+    assert [_["@id"] for _ in crate.root_dataset._jsonld["hasPart"]] == ids
+    assert set(_.id for _ in crate.data_entities) == set(ids)
+    assert crate.contextual_entities[-1].id == "#p4"
+    out_path = tmpdir / "out"
+    out_path.mkdir()
+    crate.metadata.write(out_path)
+    json_entities = helpers.read_json_entities(out_path)
+    assert [_["@id"] for _ in json_entities["./"]["hasPart"]] == ids
+    assert set(json_entities) == set(ids) | {f"#p{i}" for i in (0, 1, 3, 4, 5, 6, 7, 8, 9)} | {
+        "./", "ro-crate-metadata.json"
+    }
+    crate.delete_many(ids)
+    assert crate.data_entities == []
+    assert "hasPart" not in crate.root_dataset
+
+
+@pytest.mark.parametrize("options", [{}, {"database": ""}])
+def test_delete_replaced(options):
+    crate = ROCrate(**options)
+    old = crate.add(Person(crate, "#p", {"name": "Old", "knows": {"@id": "#a"}}))
+    assert crate.find(name="Old") == [old]
+    assert crate.referrers("#a") == [(old, "knows")]
+    new = crate.add(Person(crate, "#p", {"name": "New", "knows": {"@id": "#b"}}))
+    assert crate.find(name="New") == [new]
+    assert crate.referrers("#b") == [(new, "knows")]
+    # the entity that was replaced stands for the one in the crate
+    crate.delete_many([old])
+    assert crate.dereference("#p") is None
+    assert crate.find(name="New") == []
+    assert crate.find(type="Person") == []
+    assert crate.referrers("#b") == []
+    assert crate.referrers("#a") == []
+
+
+def test_delete_perf():
+    """\
+    Test that deleting a data entity happens in constant time.
+
+    Deleting 500 entities from a crate with 100000 data entities should take
+    well below 0.1s, while it took several seconds with linear-time deletes.
+    """
+    crate = ROCrate()
+    for i in range(100000):
+        crate.add_file(f"f{i}.txt")
+    ids = iter([f"f{i}.txt" for i in range(0, 100000, 200)])
+    assert timeit.Timer("crate.delete(next(ids))", globals=locals()).timeit(500) < 0.1
+    assert len(crate.root_dataset["hasPart"]) == 99500
+
+
 def test_entity_as_mapping(tmpdir, helpers):
     orcid = "https://orcid.org/0000-0002-1825-0097"
     metadata = {
@@ -420,6 +568,37 @@ def test_wf_types():
     assert "HowTo" not in bar_wf.type
 
 
+@pytest.mark.parametrize("options", [{}, {"lazy": True}, {"columnar": True}, {"database": ""}])
+def test_get_by_type(test_data_dir, options):
+    crate = ROCrate(test_data_dir / "read_crate", **options)
+    expected = ROCrate(test_data_dir / "read_crate")
+
+    def ids(type_):
+        return sorted(_.id for _ in crate.get_by_type(type_))
+
+    for type_ in "File", "Dataset", "Person", "ComputationalWorkflow":
+        assert ids(type_) == sorted(_.id for _ in expected.get_entities() if type_ in get_norm_value(_, "@type"))
+    assert "test_galaxy_wf.ga" in ids("File")
+    assert ids("Foo") == []
+    # changes
+    crate.add(Person(crate, "#alice"))
+    crate.delete("#joe")
+    assert ids("Person") == ["#alice"]
+    crate.delete("test_galaxy_wf.ga")
+    assert "test_galaxy_wf.ga" not in ids("File")
+    assert ids("ComputationalWorkflow") == ["abstract_wf.cwl"]
+    crate.add(ContextEntity(crate, "#alice", {"@type": "Organization"}))
+    assert ids("Person") == []
+    assert ids("Organization") == ["#alice"]
+    f = crate.dereference("abstract_wf.cwl")
+    f.type = ["File", "SoftwareSourceCode"]
+    assert ids("ComputationalWorkflow") == []
+    assert ids("SoftwareSourceCode") == ["abstract_wf.cwl"]
+    # entities not in the crate are not indexed
+    ContextEntity(crate, "#alice").type = "Person"
+    assert ids("Person") == []
+
+
 @pytest.mark.parametrize("compact", [False, True])
 def test_append_to(compact):
     crate = ROCrate()
@@ -443,3 +622,28 @@ def test_append_to(compact):
     # exceptions
     with pytest.raises(KeyError):
         rd.append_to("@id", "foo", compact=compact)
+
+
+def test_slots(test_data_dir):
+    crate = ROCrate(test_data_dir / "read_crate")
+    for e in crate.get_entities():
+        assert not hasattr(e, "__dict__"), type(e).__name__
+    with pytest.raises(AttributeError):
+        crate.root_dataset.foo = "bar"
+    assert crate.metadata.extra_terms == {}
+    f = crate.dereference("test_file_galaxy.txt")
+    copy = pickle.loads(pickle.dumps(f))
+    assert copy.id == f.id
+    assert copy.source == f.source
+    assert copy.properties() == f.properties()
+    # subclasses that don't declare __slots__ can still add attributes
+
+    class MyPerson(Person):
+        def __init__(self, crate, identifier=None, properties=None):
+            super().__init__(crate, identifier, properties)
+            self.nickname = "Al"
+
+    alice = crate.add(MyPerson(crate, "#alice", {"name": "Alice"}))
+    assert alice.nickname == "Al"
+    assert alice.id == "#alice"
+    assert crate.dereference("#alice") is alice
@@ -0,0 +1,82 @@
+# Copyright 2019-2022 The University of Manchester, UK
+# Copyright 2020-2022 Vlaams Instituut voor Biotechnologie (VIB), BE
+# Copyright 2020-2022 Barcelona Supercomputing Center (BSC), ES
+# Copyright 2020-2022 Center for Advanced Studies, Research and Development in Sardinia (CRS4), IT
+# Copyright 2022 École Polytechnique Fédérale de Lausanne, CH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import shutil
+
+import pytest
+
+from rocrate import load_many
+from rocrate.parallel import summarize
+from rocrate.rocrate import ROCrate
+
+
+@pytest.fixture
+def crate_paths(test_data_dir, tmpdir, helpers):
+    crate_dir = test_data_dir / "read_crate"
+    zip_path = shutil.make_archive(tmpdir / "read_crate.crate", "zip", crate_dir)
+    bad_dir = tmpdir / "bad_crate"
+    bad_dir.mkdir()
+    (bad_dir / helpers.METADATA_FILE_NAME).write_text('{"@context": [], "@graph": [{')
+    return [crate_dir, zip_path, tmpdir / "no_such_crate", bad_dir, test_data_dir / "read_extra"]
+
+
+def test_summarize(test_data_dir):
+    summary = summarize(test_data_dir / "read_crate")
+    assert summary["root"]["@id"] == "./"
+    assert "hasPart" not in summary["root"]
+    assert summary["n_parts"] == 6
+    assert summary["n_entities"] == 10
+    assert summary["types"]["File"] == 4
+    assert summary["types"]["Person"] == 1
+    assert summary["mainEntity"] == "test_galaxy_wf.ga"
+    assert summary["conformsTo"] == ["https://w3id.org/ro/crate/1.1"]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+@pytest.mark.parametrize("mode", ["summary", "graph", "crate"])
+def test_load_many(crate_paths, workers, mode):
+    results = load_many(crate_paths, workers=workers, mode=mode)
+    assert [_.path for _ in results] == crate_paths
+    for r in results:
+        assert r.elapsed >= 0
+    ok = [results[i] for i in (0, 1, 4)]
+    for r in ok:
+        assert r.error is None
+    assert results[2].error.startswith("FileNotFoundError")
+    assert results[3].error.startswith("JSONDecodeError")
+    for r in results[2:4]:
+        assert r.value is None
+    if mode == "summary":
+        assert ok[0].value == ok[1].value == summarize(crate_paths[0])
+    else:
+        for r in ok:
+            assert isinstance(r.value, ROCrate)
+            assert r.value.metadata_only == (mode == "graph")
+        assert ok[0].value.mainEntity.id == ok[1].value.mainEntity.id == "test_galaxy_wf.ga"
+    if mode == "crate":
+        f = ok[1].value.dereference("test_file_galaxy.txt")
+        with f.source.open() as fsrc:
+            assert fsrc.read() == (crate_paths[0] / "test_file_galaxy.txt").read_bytes()
+
+
+def test_load_many_errors(crate_paths):
+    assert load_many([]) == []
+    with pytest.raises(ValueError):
+        load_many(crate_paths, mode="foo")
+    with pytest.raises(ValueError):
+        load_many(crate_paths, workers=0)
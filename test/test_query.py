@@ -0,0 +1,91 @@
+# Copyright 2019-2022 The University of Manchester, UK
+# Copyright 2020-2022 Vlaams Instituut voor Biotechnologie (VIB), BE
+# Copyright 2020-2022 Barcelona Supercomputing Center (BSC), ES
+# Copyright 2020-2022 Center for Advanced Studies, Research and Development in Sardinia (CRS4), IT
+# Copyright 2022 École Polytechnique Fédérale de Lausanne, CH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from rocrate.model.computationalworkflow import ComputationalWorkflow
+from rocrate.model.contextentity import ContextEntity
+from rocrate.model.file import File
+from rocrate.model.person import Person
+from rocrate.query import compile_query
+from rocrate.rocrate import ROCrate
+
+STORAGES = [{}, {"lazy": True}, {"columnar": True}, {"database": ""}]
+
+
+def test_compile():
+    q = compile_query("./ > mainEntity > input|output [FormalParameter] < exampleOfWork [File]")
+    assert [repr(_) for _ in q.steps] == [
+        "start './'", "follow mainEntity", "follow input|output", "is a FormalParameter", "back exampleOfWork", "is a File",
+    ]
+    assert compile_query(q.text) is q
+    # filters after * are index lookups
+    q = compile_query('* [File] (encodingFormat = "text/csv") < * (x = 1)')
+    assert [repr(_) for _ in q.steps] == [
+        "select @type = ['File'] and encodingFormat = 'text/csv'", "back *", "has x = 1",
+    ]
+    assert [repr(_) for _ in compile_query('"#a b" > *').steps] == ["start '#a b'", "follow *"]
+
+
+@pytest.mark.parametrize("text", ["", "  ", "> x", "[File]", "./ >", "./ > [File]", "./ [*]", "./ [a|]",
+                                  "./ (x)", "./ (= 1)", "./ (x = foo)", "./ ]", "./ * *"])
+def test_compile_errors(text):
+    with pytest.raises(ValueError):
+        compile_query(text)
+
+
+@pytest.mark.parametrize("options", STORAGES)
+def test_query(tmpdir, options):
+    crate = ROCrate()
+    alice = crate.add(Person(crate, "#alice"))
+    params = [crate.add(ContextEntity(crate, f"#p{i}", {"@type": "FormalParameter"})) for i in range(3)]
+    wf = crate.add(ComputationalWorkflow(crate, dest_path="wf.cwl"))
+    wf["input"] = params[:2]
+    wf["output"] = params[2]
+    crate.mainEntity = wf
+    for i in range(6):
+        crate.add(File(crate, dest_path=f"{i}.csv", properties={
+            "exampleOfWork": {"@id": params[i % 3].id},
+            "encodingFormat": "text/csv" if i % 2 else "text/plain",
+            "author": {"@id": "#alice"},
+        }))
+    # a cycle
+    alice["knows"] = wf
+    wf["author"] = alice
+    crate.metadata.write(tmpdir)
+    crate = ROCrate(tmpdir, metadata_only=True, **options)
+
+    def ids(text):
+        rval = [_.id for _ in crate.query(text)]
+        assert len(rval) == len(set(rval))
+        return sorted(rval)
+
+    assert ids("./ > mainEntity > input [FormalParameter] < exampleOfWork [File]") == ["0.csv", "1.csv", "3.csv", "4.csv"]
+    assert ids("./ > mainEntity > input|output < exampleOfWork") == [f"{i}.csv" for i in range(6)]
+    assert ids('* [File] (encodingFormat = "text/csv") > author') == ["#alice"]
+    assert ids('* (encodingFormat = "text/csv") (exampleOfWork = "#p1")') == ["1.csv"]
+    assert ids('./ > hasPart (encodingFormat = "text/plain")') == ["0.csv", "2.csv", "4.csv"]
+    assert ids("#alice > knows > author > knows") == ["wf.cwl"]
+    assert ids("#alice < *") == [f"{i}.csv" for i in range(6)] + ["wf.cwl"]
+    assert ids("#p0 < * [ComputationalWorkflow|Person]") == ["wf.cwl"]
+    assert ids("* [Person|FormalParameter]") == ["#alice", "#p0", "#p1", "#p2"]
+    assert ids("#nobody > *") == []
+    assert ids("./ > foo") == []
+    assert len(ids("*")) == len(list(crate.get_entities()))
+    crate.delete("1.csv")
+    assert ids("#p1 < exampleOfWork") == ["4.csv"]
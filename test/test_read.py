@@ -23,23 +23,27 @@ import uuid
 import zipfile
 from pathlib import Path
 
-from rocrate.rocrate import ROCrate
+from rocrate.archive import ZipArchive, ZipMember, safe_join
+from rocrate.rocrate import ROCrate, read_graph
 from rocrate.model.data_entity import DataEntity
 from rocrate.model.file import File
 from rocrate.model.dataset import Dataset
+from rocrate.model.person import Person
 
 _URL = ('https://raw.githubusercontent.com/ResearchObject/ro-crate-py/master/'
         'test/test-data/sample_file.txt')
 
 
-@pytest.mark.parametrize("gen_preview,from_zip", [(False, False), (True, False), (True, True)])
-def test_crate_dir_loading(test_data_dir, tmpdir, helpers, gen_preview, from_zip):
+@pytest.mark.parametrize("gen_preview,from_zip,lazy", [
+    (False, False, False), (True, False, False), (True, True, False), (False, False, True)
+])
+def test_crate_dir_loading(test_data_dir, tmpdir, helpers, gen_preview, from_zip, lazy):
     crate_dir = test_data_dir / 'read_crate'
     if from_zip:
         zip_source = shutil.make_archive(tmpdir / "read_crate.crate", "zip", crate_dir)
-        crate = ROCrate(zip_source, gen_preview=gen_preview)
+        crate = ROCrate(zip_source, gen_preview=gen_preview, lazy=lazy)
     else:
-        crate = ROCrate(crate_dir, gen_preview=gen_preview)
+        crate = ROCrate(crate_dir, gen_preview=gen_preview, lazy=lazy)
 
     assert set(_["@id"] for _ in crate.default_entities) == {
         "./",
@@ -285,10 +289,28 @@ def test_no_parts(tmpdir):
     assert "hasPart" not in crate.root_dataset
 
 
+def test_unshared_references(tmpdir):
+    crate = ROCrate()
+    alice = crate.add(Person(crate, "#alice"))
+    for name in "a.txt", "b.txt":
+        crate.add_file(dest_path=name, properties={"author": {"@id": alice.id}})
+    crate.metadata.write(tmpdir)
+    crate = ROCrate(tmpdir, metadata_only=True)
+    a, b = crate.dereference("a.txt"), crate.dereference("b.txt")
+    a.properties()["author"]["@id"] = "#bob"
+    assert b.properties()["author"] == {"@id": "#alice"}
+    assert crate.root_dataset.properties()["hasPart"][0]["@id"] == "a.txt"
+
+
+@pytest.mark.parametrize("from_zip", [False, True])
 @pytest.mark.parametrize("to_zip", [False, True])
-def test_extra_data(test_data_dir, tmpdir, to_zip):
+def test_extra_data(test_data_dir, tmpdir, to_zip, from_zip):
     crate_dir = test_data_dir / 'read_extra'
-    crate = ROCrate(crate_dir)
+    if from_zip:
+        zip_source = shutil.make_archive(tmpdir / "read_extra.crate", "zip", crate_dir)
+        crate = ROCrate(zip_source)
+    else:
+        crate = ROCrate(crate_dir)
     out_path = tmpdir / 'read_extra_out'
     if to_zip:
         zip_path = tmpdir / 'ro_crate_out.crate.zip'
@@ -486,3 +508,173 @@ def test_multi_type_context_entity(tmpdir):
     entity = crate.dereference(id_)
     assert entity in crate.contextual_entities
     assert set(entity.type) == set(type_)
+
+
+def test_lazy(test_data_dir, tmpdir, monkeypatch):
+    crate_dir = test_data_dir / 'read_crate'
+    eager_crate = ROCrate(crate_dir)
+    instantiated = []
+    orig_init = File.__init__
+
+    def init(self, *args, **kwargs):
+        orig_init(self, *args, **kwargs)
+        instantiated.append(self.id)
+
+    monkeypatch.setattr(File, "__init__", init)
+    crate = ROCrate(crate_dir, lazy=True)
+    assert "test_file_galaxy.txt" not in instantiated
+    assert crate.root_dataset._jsonld["hasPart"] == eager_crate.root_dataset._jsonld["hasPart"]
+    f = crate.dereference("test_file_galaxy.txt")
+    assert instantiated.count("test_file_galaxy.txt") == 1
+    assert crate.dereference("test_file_galaxy.txt") is f
+    assert "test_galaxy_wf.ga" not in instantiated
+    assert crate.mainEntity.id == "test_galaxy_wf.ga"
+    assert "abstract_wf.cwl" not in instantiated
+    assert [_.id for _ in crate.data_entities] == [_.id for _ in eager_crate.data_entities]
+    assert crate.data_entities[2] is f
+    assert "abstract_wf.cwl" in instantiated
+    assert crate.contextual_entities == eager_crate.contextual_entities
+    assert list(crate.get_entities()) == list(eager_crate.get_entities())
+    assert crate.metadata.generate() == eager_crate.metadata.generate()
+    # mutation
+    crate = ROCrate(crate_dir, lazy=True)
+    crate.add_file(crate_dir / "test_file_galaxy.txt", "new.txt")
+    eager_crate.add_file(crate_dir / "test_file_galaxy.txt", "new.txt")
+    assert [_.id for _ in crate.data_entities] == [_.id for _ in eager_crate.data_entities]
+    crate, eager_crate = ROCrate(crate_dir, lazy=True), ROCrate(crate_dir)
+    crate.delete("test_file_galaxy.txt")
+    eager_crate.delete("test_file_galaxy.txt")
+    assert crate.metadata.generate() == eager_crate.metadata.generate()
+
+
+@pytest.mark.parametrize("options", [
+    {"lazy": True}, {"columnar": True}, {"lazy": True, "columnar": True}, {"database": ""},
+    {"lazy": True, "database": ""},
+])
+def test_mode_order(tmpdir, options):
+    crate = ROCrate()
+    for i in range(3):
+        crate.add_file(dest_path=f"f{i}.txt", properties={"contentSize": i})
+        crate.add_dataset(dest_path=f"d{i}")
+        crate.add_file(dest_path=f"w{i}.cwl", properties={"@type": ["File", "SoftwareSourceCode"]})
+        crate.add(Person(crate, f"#p{i}"))
+    crate.metadata.write(tmpdir)
+    expected = ROCrate(tmpdir, metadata_only=True)
+    crate = ROCrate(tmpdir, metadata_only=True, **options)
+    assert [_.id for _ in crate.data_entities] == [_.id for _ in expected.data_entities]
+    assert [_.id for _ in crate.contextual_entities] == [_.id for _ in expected.contextual_entities]
+    assert [_.id for _ in crate.get_entities()] == [_.id for _ in expected.get_entities()]
+    assert crate.metadata.generate() == expected.metadata.generate()
+
+
+def test_zip_in_place(test_data_dir, tmpdir, monkeypatch):
+    crate_dir = test_data_dir / 'read_crate'
+    zip_source = shutil.make_archive(tmpdir / "read_crate.crate", "zip", crate_dir)
+
+    def extract(*args, **kwargs):
+        raise AssertionError("zipped crate should not be extracted")
+
+    monkeypatch.setattr(zipfile.ZipFile, "extract", extract)
+    monkeypatch.setattr(zipfile.ZipFile, "extractall", extract)
+    monkeypatch.setattr(ZipArchive, "extract", extract)
+    crate = ROCrate(zip_source)
+    assert isinstance(crate.source, ZipArchive)
+    assert crate.source.path == Path(zip_source)
+    f = crate.dereference("test_file_galaxy.txt")
+    assert isinstance(f.source, ZipMember)
+    assert f.source.is_file()
+    with f.source.open() as fsrc:
+        assert fsrc.read() == (crate_dir / "test_file_galaxy.txt").read_bytes()
+    d = crate.dereference("test/")
+    assert d.source.is_dir()
+    out_path = tmpdir / "crate_out"
+    crate.write(out_path)
+    for rel in "test_file_galaxy.txt", "abstract_wf.cwl", "test/test-metadata.json":
+        assert (out_path / rel).read_bytes() == (crate_dir / rel).read_bytes()
+    out_zip = crate.write_zip(tmpdir / "crate_out.zip")
+    with zipfile.ZipFile(out_zip) as zf:
+        assert zf.read("abstract_wf.cwl") == (crate_dir / "abstract_wf.cwl").read_bytes()
+    # conversion to a file system path extracts on demand
+    monkeypatch.undo()
+    with open(f.source, "rb") as fsrc:
+        assert fsrc.read() == (crate_dir / "test_file_galaxy.txt").read_bytes()
+
+
+def test_zip_slip(test_data_dir, tmpdir):
+    crate_dir = test_data_dir / 'read_crate'
+    zip_source = shutil.make_archive(tmpdir / "read_crate.crate", "zip", crate_dir)
+    with zipfile.ZipFile(zip_source, "a") as zf:
+        for name in "../../escaped.txt", "/abs.txt", "a/../../up.txt":
+            zf.writestr(name, "foo")
+    crate = ROCrate(zip_source)
+    assert {"escaped.txt", "abs.txt", "up.txt"} <= crate.source.files()
+    out_path = tmpdir / "a" / "b" / "out"
+    crate.write(out_path)
+    for name in "escaped.txt", "abs.txt", "up.txt":
+        assert (out_path / name).read_text() == "foo"
+    assert not (tmpdir / "a" / "escaped.txt").exists()
+    assert not (tmpdir / "a" / "b" / "up.txt").exists()
+    extracted = Path(crate.source.extract("../../escaped.txt"))
+    assert extracted.read_text() == "foo"
+    assert extracted.parent == Path(crate.source.extract(""))
+    with pytest.raises(ValueError):
+        safe_join(tmpdir, "../escaped.txt")
+
+
+def test_zip_names(tmpdir, monkeypatch):
+    zip_path = tmpdir / "names.zip"
+    with zipfile.ZipFile(zip_path, "w") as zf:
+        for i in range(3):
+            zf.writestr(f"./d//f{i}.txt", f"{i}")
+    archive = ZipArchive(zip_path)
+    assert set(archive.files()) == {f"d/f{i}.txt" for i in range(3)}
+    # names are looked up in the index, not by scanning the archive
+
+    def infolist(*args):
+        raise AssertionError("archive scanned")
+
+    monkeypatch.setattr(zipfile.ZipFile, "infolist", infolist)
+    for i in range(3):
+        with (archive / f"d/f{i}.txt").open() as f:
+            assert f.read() == f"{i}".encode()
+    with pytest.raises(FileNotFoundError):
+        archive.open("d/f3.txt")
+    archive.close()
+
+
+@pytest.mark.parametrize("from_zip,lazy", [(False, False), (True, False), (True, True)])
+def test_metadata_only(test_data_dir, tmpdir, monkeypatch, helpers, from_zip, lazy):
+    crate_dir = test_data_dir / 'read_crate'
+    if from_zip:
+        source = shutil.make_archive(tmpdir / "read_crate.crate", "zip", crate_dir)
+    else:
+        # payload files need not be there
+        source = tmpdir / "read_crate"
+        source.mkdir()
+        shutil.copy(crate_dir / helpers.METADATA_FILE_NAME, source)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("payload files should not be accessed")
+
+    monkeypatch.setattr(ZipArchive, "extract", fail)
+    monkeypatch.setattr(ZipArchive, "copy", fail)
+    crate = read_graph(source, lazy=lazy)
+    assert crate.metadata_only
+    eager_crate = ROCrate(crate_dir)
+    assert [_.id for _ in crate.get_entities()] == [_.id for _ in eager_crate.get_entities()]
+    assert crate.mainEntity.id == "test_galaxy_wf.ga"
+    for e in crate.data_entities:
+        if not e.id.startswith("http"):
+            assert e.source is None
+    assert crate.metadata.generate() == eager_crate.metadata.generate()
+    out_path = tmpdir / "crate_out"
+    out_path.mkdir()
+    crate.metadata.write(out_path)
+    with open(out_path / helpers.METADATA_FILE_NAME) as f:
+        assert json.load(f) == eager_crate.metadata.generate()
+    with pytest.raises(RuntimeError):
+        crate.write(out_path)
+    with pytest.raises(RuntimeError):
+        crate.write_zip(tmpdir / "crate_out.zip")
+    with pytest.raises(ValueError):
+        ROCrate(metadata_only=True)
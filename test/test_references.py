@@ -0,0 +1,143 @@
+# Copyright 2019-2022 The University of Manchester, UK
+# Copyright 2020-2022 Vlaams Instituut voor Biotechnologie (VIB), BE
+# Copyright 2020-2022 Barcelona Supercomputing Center (BSC), ES
+# Copyright 2020-2022 Center for Advanced Studies, Research and Development in Sardinia (CRS4), IT
+# Copyright 2022 École Polytechnique Fédérale de Lausanne, CH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from rocrate.model.file import File
+from rocrate.model.person import Person
+from rocrate.references import ReferenceIndex
+from rocrate.rocrate import ROCrate
+
+STORAGES = [{}, {"lazy": True}, {"columnar": True}, {"database": ""}]
+
+
+def test_index():
+    index = ReferenceIndex()
+    index.add("a", ("x", "author"))
+    index.add("a", ("x", "author"))
+    assert index.get("a") == [("x", "author")]
+    index.add("a", ("y", "author"))
+    index.add("a", ("x", "contributor"))
+    assert index.get("a") == [("x", "author"), ("y", "author"), ("x", "contributor")]
+    index.remove("a", ("x", "author"))
+    index.remove("a", ("y", "author"))
+    assert index.get("a") == [("x", "contributor")]
+    index.remove("a", ("x", "contributor"))
+    index.remove("a", ("x", "contributor"))
+    assert "a" not in index
+    assert index.get("a") == []
+
+
+def test_referrers():
+    crate = ROCrate()
+    alice = crate.add(Person(crate, "#alice"))
+    bob = crate.add(Person(crate, "#bob"))
+    f = crate.add(File(crate, dest_path="a.txt", properties={"author": {"@id": "#alice"}}))
+    assert crate.referrers(alice) == [(f, "author")]
+    assert crate.referrers("a.txt") == [(crate.root_dataset, "hasPart")]
+    assert crate.referrers(bob) == []
+    f["author"] = [alice, bob]
+    assert crate.referrers(bob) == [(f, "author")]
+    f["author"] = bob
+    assert crate.referrers(alice) == []
+    bob.append_to("knows", alice)
+    f.append_to("contributor", alice)
+    assert crate.referrers(alice) == [(bob, "knows"), (f, "contributor")]
+    del f["contributor"]
+    assert crate.referrers(alice) == [(bob, "knows")]
+    # entities that are not in the crate are not indexed
+    other = Person(crate, "#alice")
+    other["knows"] = bob
+    assert crate.referrers(bob) == [(f, "author")]
+    # replacement and deletion
+    crate.add(File(crate, dest_path="a.txt", properties={"author": {"@id": "#alice"}}))
+    f = crate.dereference("a.txt")
+    assert crate.referrers(bob) == []
+    assert crate.referrers(alice) == [(bob, "knows"), (f, "author")]
+    crate.delete(f)
+    assert crate.referrers(alice) == [(bob, "knows")]
+    assert crate.referrers("a.txt") == []
+    # references to deleted entities are kept, since they're still there
+    crate.delete(alice)
+    assert crate.referrers("#alice") == [(bob, "knows")]
+
+
+@pytest.mark.parametrize("options", STORAGES)
+def test_read(tmpdir, options):
+    crate = ROCrate()
+    crate.add(Person(crate, "#alice"))
+    for i in range(3):
+        crate.add(File(crate, dest_path=f"{i}.txt", properties={"author": {"@id": "#alice"}}))
+    crate.metadata.write(tmpdir)
+    crate = ROCrate(tmpdir, metadata_only=True, **options)
+    assert [(e.id, name) for e, name in crate.referrers("#alice")] == [(f"{i}.txt", "author") for i in range(3)]
+    f = crate.dereference("1.txt")
+    del f["author"]
+    crate.add(Person(crate, "#bob", {"knows": {"@id": "#alice"}}))
+    assert [(e.id, name) for e, name in crate.referrers("#alice")] == [
+        ("0.txt", "author"), ("2.txt", "author"), ("#bob", "knows")
+    ]
+    crate.delete("0.txt")
+    assert [(e.id, name) for e, name in crate.referrers("#alice")] == [("2.txt", "author"), ("#bob", "knows")]
+    assert [(e.id, name) for e, name in crate.referrers("2.txt")] == [("./", "hasPart")]
+
+
+@pytest.mark.parametrize("options", STORAGES)
+def test_walk(tmpdir, options):
+    crate = ROCrate()
+    a, b, c, d = [crate.add(Person(crate, f"#{_}")) for _ in "abcd"]
+    a["knows"] = [b, c]
+    b["knows"] = d
+    c["knows"] = a  # cycle
+    c["colleague"] = d
+    d["knows"] = {"@id": "#nobody"}
+    crate.add(File(crate, dest_path="x.txt", properties={"author": {"@id": "#a"}}))
+    crate.add(Person(crate, "#orphan"))
+    crate.metadata.write(tmpdir)
+    crate = ROCrate(tmpdir, metadata_only=True, **options)
+
+    def ids(*args, **kwargs):
+        return [_.id for _ in crate.walk(*args, **kwargs)]
+
+    assert ids("#a") == ["#a", "#b", "#c", "#d"]
+    assert ids("#a", order="dfs") == ["#a", "#b", "#d", "#c"]
+    assert ids("#a", depth=1) == ["#a", "#b", "#c"]
+    assert ids("#a", depth=0) == ["#a"]
+    assert ids("#c", properties="colleague") == ["#c", "#d"]
+    assert ids("#c", properties=["knows"]) == ["#c", "#a", "#b", "#d"]
+    assert ids("#nobody") == []
+    assert ids(crate.metadata)[:3] == ["ro-crate-metadata.json", "./", "x.txt"]
+    with pytest.raises(ValueError):
+        ids("#a", order="foo")
+    assert crate.is_reachable("#d", "#d")
+    assert crate.is_reachable("#c", crate.dereference("#d"))
+    assert crate.is_reachable("#c", "#d", properties="knows")
+    assert not crate.is_reachable("#b", "#c", properties="colleague")
+    assert not crate.is_reachable("#d", "#a")
+    assert [_.id for _ in crate.unreachable()] == ["#orphan"]
+    # the cached adjacency lists follow changes
+    d = crate.dereference("#d")
+    d["knows"] = crate.dereference("#orphan")
+    assert ids("#b") == ["#b", "#d", "#orphan"]
+    crate.dereference("#orphan").append_to("knows", crate.dereference("#a"))
+    assert ids("#d") == ["#d", "#orphan", "#a", "#b", "#c"]
+    assert crate.unreachable() == []
+    crate.delete("#orphan")
+    assert ids("#d") == ["#d"]
+    crate.add(Person(crate, "#orphan", {"knows": {"@id": "#b"}}))
+    assert ids("#d") == ["#d", "#orphan", "#b"]
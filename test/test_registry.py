@@ -0,0 +1,117 @@
+# Copyright 2019-2022 The University of Manchester, UK
+# Copyright 2020-2022 Vlaams Instituut voor Biotechnologie (VIB), BE
+# Copyright 2020-2022 Barcelona Supercomputing Center (BSC), ES
+# Copyright 2020-2022 Center for Advanced Studies, Research and Development in Sardinia (CRS4), IT
+# Copyright 2022 École Polytechnique Fédérale de Lausanne, CH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from rocrate.model.computationalworkflow import ComputationalWorkflow
+from rocrate.model.contextentity import ContextEntity
+from rocrate.model.data_entity import DataEntity
+from rocrate.model.dataset import Dataset
+from rocrate.model.file import File
+from rocrate.model.file_or_dir import FileOrDir
+from rocrate.model.person import Person
+from rocrate.model.registry import TypeRegistry, DATA_ENTITY_TYPES, CONTEXT_ENTITY_TYPES, register_entity_class
+from rocrate.rocrate import ROCrate
+
+
+def test_get():
+    registry = TypeRegistry(FileOrDir, DataEntity)
+    assert registry.get("File") is File
+    assert registry.get(" File ") is File
+    assert registry.get("Dataset") is Dataset
+    assert registry.get("Foo") is DataEntity
+    assert registry.get([]) is DataEntity
+    # subclasses have priority over their parents
+    for types in ["File", "ComputationalWorkflow"], ["ComputationalWorkflow", "File", "Foo"]:
+        assert registry.get(types) is ComputationalWorkflow
+    assert registry.pick({"@id": "x", "@type": ["Foo", "File"]}) is File
+    with pytest.raises(ValueError):
+        registry.pick({"@id": "x"})
+    assert CONTEXT_ENTITY_TYPES.get("Person") is Person
+    assert CONTEXT_ENTITY_TYPES.get("Foo") is ContextEntity
+
+
+def test_register():
+    registry = TypeRegistry(FileOrDir, DataEntity)
+
+    class Image(File):
+        pass
+
+    # discovered automatically, although it was defined after the first build
+    assert registry.get(["File", "Image"]) is Image
+
+    class Photo(File):
+        pass
+
+    registry.register(Photo, "ImageObject", "Photograph")
+    assert registry.get("ImageObject") is Photo
+    assert registry.get(["Photograph", "ComputationalWorkflow"]) is Photo
+
+    class Snapshot(File):
+        pass
+
+    # the most recently registered class has priority
+    registry.register(Snapshot, "Photograph")
+    assert registry.get(["ImageObject", "Photograph"]) is Snapshot
+    assert registry.get("ImageObject") is Photo
+    with pytest.raises(ValueError):
+        registry.register(dict)
+
+
+def test_shadowing():
+
+    class Base(ContextEntity):
+        pass
+
+    class Agent(Base):
+        pass
+
+    first = Agent
+
+    class Agent(Base):  # noqa: F811
+        pass
+
+    registry = TypeRegistry(Base, Base)
+    # if two classes have the same name, the last one defined is used
+    assert registry.get("Agent") is Agent is not first
+    assert registry.get(["Agent", "Foo"]) is Agent
+
+
+def test_read_registered(test_data_dir, monkeypatch):
+    data_registry = TypeRegistry(FileOrDir, DataEntity)
+    context_registry = TypeRegistry(ContextEntity, ContextEntity)
+    monkeypatch.setattr("rocrate.rocrate.DATA_ENTITY_TYPES", data_registry)
+    monkeypatch.setattr("rocrate.rocrate.CONTEXT_ENTITY_TYPES", context_registry)
+    monkeypatch.setattr("rocrate.model.registry.DATA_ENTITY_TYPES", data_registry)
+    monkeypatch.setattr("rocrate.model.registry.CONTEXT_ENTITY_TYPES", context_registry)
+
+    class Workflow(File):
+        pass
+
+    class Author(ContextEntity):
+        pass
+
+    register_entity_class(Workflow, "ComputationalWorkflow")
+    register_entity_class(Author, "Person")
+    with pytest.raises(ValueError):
+        register_entity_class(int)
+    crate = ROCrate(test_data_dir / "read_crate")
+    assert type(crate.mainEntity) is Workflow
+    assert type(crate.dereference("test_file_galaxy.txt")) is File
+    assert all(type(_) is Author for _ in crate.contextual_entities if "Person" in _.type)
+    assert DATA_ENTITY_TYPES.get("ComputationalWorkflow") is ComputationalWorkflow
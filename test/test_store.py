@@ -0,0 +1,184 @@
+# Copyright 2019-2022 The University of Manchester, UK
+# Copyright 2020-2022 Vlaams Instituut voor Biotechnologie (VIB), BE
+# Copyright 2020-2022 Barcelona Supercomputing Center (BSC), ES
+# Copyright 2020-2022 Center for Advanced Studies, Research and Development in Sardinia (CRS4), IT
+# Copyright 2022 École Polytechnique Fédérale de Lausanne, CH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import gc
+import json
+import shutil
+import sqlite3
+
+import pytest
+
+import rocrate.store
+from rocrate import jsonio
+from rocrate.archive import ZipMember
+from rocrate.model.file import File
+from rocrate.model.person import Person
+from rocrate.rocrate import ROCrate
+from rocrate.store import SQLiteStore
+
+
+@pytest.fixture
+def small_cache(monkeypatch):
+    monkeypatch.setattr(rocrate.store, "CACHE_SIZE", 2)
+    monkeypatch.setattr(rocrate.store, "BATCH_SIZE", 3)
+
+
+def graph_by_id(metadata_path):
+    with open(metadata_path) as f:
+        return {_["@id"]: _ for _ in json.load(f)["@graph"]}
+
+
+@pytest.mark.parametrize("database", ["", "crate.db"])
+def test_read_write(test_data_dir, tmpdir, helpers, small_cache, database):
+    crate_dir = test_data_dir / "read_crate"
+    crate = ROCrate(crate_dir, database=database and tmpdir / database)
+    expected = ROCrate(crate_dir)
+    assert [_.id for _ in crate.get_entities()] == [_.id for _ in expected.get_entities()]
+    assert [_.id for _ in crate.data_entities] == [_.id for _ in expected.data_entities]
+    assert [_.id for _ in crate.contextual_entities] == [_.id for _ in expected.contextual_entities]
+    wf = crate.dereference("test_galaxy_wf.ga")
+    assert wf == expected.dereference("test_galaxy_wf.ga")
+    assert wf.source == crate_dir / "test_galaxy_wf.ga"
+    assert crate.dereference("test_galaxy_wf.ga") is wf
+    assert crate.mainEntity is wf
+    assert crate.dereference("foo") is None
+    out_path = tmpdir / "out"
+    crate.write(out_path)
+    metadata_path = out_path / helpers.METADATA_FILE_NAME
+    assert graph_by_id(metadata_path) == {_["@id"]: _ for _ in expected.metadata.generate()["@graph"]}
+    with open(metadata_path) as f:
+        assert f.read() == jsonio.dumps(expected.metadata.generate())
+    assert (out_path / "test_galaxy_wf.ga").is_file()
+
+
+def test_edit(test_data_dir, tmpdir, small_cache, monkeypatch):
+    crate = ROCrate(test_data_dir / "read_crate", database="")
+    # changes to entities are written back when they're dropped from memory
+    crate.dereference("#joe")["name"] = "Joe"
+    for i in range(5):
+        crate.add(Person(crate, f"#p{i}", {"name": f"P{i}"}))
+    gc.collect()
+    assert crate.dereference("#joe")["name"] == "Joe"
+    assert crate.dereference("#p0")["name"] == "P0"
+    # replacement
+    crate.add(Person(crate, "#p0", {"name": "New P0"}))
+    assert crate.dereference("#p0")["name"] == "New P0"
+    assert [_.id for _ in crate.contextual_entities] == ["#joe"] + [f"#p{i}" for i in range(5)]
+    # data entities
+    f = crate.add(File(crate, dest_path="new.txt", properties={"name": "new"}))
+    assert crate.root_dataset["hasPart"][-1] is f
+    crate.delete(f, "#p1", "test_file_galaxy.txt")
+    for id_ in "new.txt", "#p1", "test_file_galaxy.txt":
+        assert crate.dereference(id_) is None
+    assert "test_file_galaxy.txt" not in [_.id for _ in crate.root_dataset["hasPart"]]
+    assert "new.txt" not in [_.id for _ in crate.data_entities]
+    # deleted and added back: moved to the end, as in memory (even if the
+    # deletion is not written yet)
+    monkeypatch.setattr(rocrate.store, "BATCH_SIZE", 100)
+    g = crate.add(File(crate, dest_path="g.txt"))
+    crate.add(File(crate, dest_path="h.txt"))
+    crate.delete(g, "#p2")
+    crate.add(File(crate, dest_path="g.txt"), Person(crate, "#p2", {"name": "P2"}))
+    assert [_.id for _ in crate.data_entities][-2:] == ["h.txt", "g.txt"]
+    assert crate.contextual_entities[-1].id == "#p2"
+    crate.metadata.write(tmpdir)
+    graph = graph_by_id(tmpdir / "ro-crate-metadata.json")
+    assert graph["#joe"]["name"] == "Joe"
+    assert graph["#p0"]["name"] == "New P0"
+    assert "#p1" not in graph
+
+
+def test_store(tmpdir):
+    crate = ROCrate()
+    db_path = tmpdir / "entities.db"
+    store = SQLiteStore(crate, db_path, None, cache_size=1)
+    for i in range(5):
+        store.put(f"#p{i}", Person(crate, f"#p{i}", {"name": f"P{i}"}), "contextual")
+    store.put("a.txt", File(crate, "a.txt", properties={"@type": ["File", "Person"]}), "data")
+    store.discard("#p4")
+    assert len(store) == 5
+    assert "#p0" in store
+    assert "#p4" not in store
+    assert [_.id for _ in store.values(type_="Person")] == ["#p0", "#p1", "#p2", "#p3", "a.txt"]
+    assert [_.id for _ in store.values(role="data")] == ["a.txt"]
+    assert [_.id for _ in store.values(role="data", type_="Person")] == ["a.txt"]
+    assert store.get("a.txt").source == "a.txt"
+    store.close()
+    store.close()
+    # the database is overwritten
+    store = SQLiteStore(crate, db_path, None)
+    assert len(store) == 0
+
+
+def test_release(tmpdir, small_cache):
+    crate = ROCrate()
+    store = SQLiteStore(crate, tmpdir / "entities.db", None, cache_size=0)
+    for i in range(3):
+        store.put(f"#p{i}", Person(crate, f"#p{i}", {"name": f"P{i}"}), "contextual")
+    store.flush()
+    people = [store.get(f"#p{i}") for i in range(3)]
+    for i, p in enumerate(people):
+        p["name"] = f"Q{i}"
+    changes = store.conn.total_changes
+    del p, people
+    gc.collect()
+    # dropping entities does not write to the database by itself
+    assert store.conn.total_changes == changes
+    assert store.properties("#p0")["name"] == "Q0"
+    assert [_["name"] for _ in store.values()] == ["Q0", "Q1", "Q2"]
+    store.close()
+
+
+def test_close(test_data_dir, tmpdir, small_cache):
+    db_path = tmpdir / "crate.db"
+    with ROCrate(test_data_dir / "read_crate", database=db_path) as crate:
+        crate.dereference("#joe")["name"] = "Joe"
+        crate.add(Person(crate, "#p", {"name": "P"}))
+    crate.close()
+    conn = sqlite3.connect(str(db_path))
+    try:
+        rows = dict(conn.execute("SELECT key, properties FROM entities WHERE key IN ('#joe', '#p')"))
+    finally:
+        conn.close()
+    assert json.loads(rows["#joe"])["name"] == "Joe"
+    assert json.loads(rows["#p"])["name"] == "P"
+    # no-op for crates held in memory
+    with ROCrate() as crate:
+        pass
+    crate.close()
+
+
+def test_zip_sources(test_data_dir, tmpdir, small_cache):
+    crate_dir = test_data_dir / "read_crate"
+    zip_source = shutil.make_archive(tmpdir / "read_crate.crate", "zip", crate_dir)
+    db_path = tmpdir / "crate.db"
+    with ROCrate(zip_source, database=db_path) as crate:
+        for e in crate.data_entities:
+            e["name"] = "x"
+        gc.collect()
+        f = crate.dereference("test_file_galaxy.txt")
+        assert f.source == ZipMember(crate.source, "test_file_galaxy.txt")
+        assert f.source.archive is crate.source
+        with f.source.open() as fsrc:
+            assert fsrc.read() == (crate_dir / "test_file_galaxy.txt").read_bytes()
+    # rows hold member names, not whole archives
+    conn = sqlite3.connect(str(db_path))
+    try:
+        assert conn.execute("SELECT MAX(LENGTH(state)) FROM entities").fetchone()[0] < 500
+    finally:
+        conn.close()
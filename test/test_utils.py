@@ -16,9 +16,25 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import random
+from urllib.parse import urljoin
+
 import pytest
 
-from rocrate.utils import subclasses, get_norm_value
+from rocrate.utils import subclasses, get_norm_value, is_url, join_id
+
+BASE_URIS = [
+    "arcp://uuid,0b0e3a8c-7ec2-4a4b-9d56-7a4b0a8e9d11/",
+    "https://example.org/",
+    "https://example.org/crate/",
+    "file:///tmp/",
+]
+# building blocks for random ids, with an emphasis on tricky ones
+ID_TOKENS = [
+    "a", "b.txt", "é", "%20", "~", "...", ".a", "a.", "-_!$&'()*+,=@",
+    ".", "..", "/", "//", "#", "#x", "?", "?q=1", ":", ";", " ", "\t", "\\", "\x7f",
+    "http:", "https://x.org", "//host", "mailto:", "C:",
+]
 
 
 class Pet:
@@ -53,3 +69,58 @@ def test_get_norm_value():
     assert get_norm_value({"@id": "#xyz"}, "name") == []
     with pytest.raises(ValueError):
         get_norm_value({"@id": "#xyz", "name": [["foo"]]}, "name")
+
+
+def urljoin_id(base_uri, id_):
+    # reference implementation: what ROCrate.resolve_id used to do
+    if not is_url(id_):
+        id_ = urljoin(base_uri, id_)
+    return id_.rstrip("/")
+
+
+def outcome(func, *args):
+    try:
+        return func(*args)
+    except ValueError as e:
+        return type(e)
+
+
+def test_join_id():
+    base_uri = BASE_URIS[0]
+    for id_, expected in [
+            ("./", base_uri[:-1]),
+            ("", base_uri[:-1]),
+            ("a/b.txt", f"{base_uri}a/b.txt"),
+            ("./a//b/../c/", f"{base_uri}a/c"),
+            ("../../a", f"{base_uri}a"),
+            ("#x", f"{base_uri}#x"),
+            ("a/#x", f"{base_uri}a/#x"),
+            ("a/..", base_uri[:-1]),
+            ("/a//b", f"{base_uri}a//b"),
+            ("https://example.org/a/", "https://example.org/a"),
+            ("a?b=1", f"{base_uri}a?b=1"),
+    ]:
+        assert join_id(base_uri, id_) == expected
+
+
+@pytest.mark.parametrize("base_uri", BASE_URIS)
+def test_join_id_random(base_uri):
+    rng = random.Random(base_uri)
+    for _ in range(5000):
+        id_ = "".join(rng.choice(ID_TOKENS) for _ in range(rng.randrange(8)))
+        assert outcome(join_id, base_uri, id_) == outcome(urljoin_id, base_uri, id_), id_
+
+
+def test_join_id_hypothesis():
+    hypothesis = pytest.importorskip("hypothesis")
+    st = hypothesis.strategies
+
+    @hypothesis.given(
+        st.sampled_from(BASE_URIS),
+        st.lists(st.one_of(st.sampled_from(ID_TOKENS), st.text(max_size=3))).map("".join),
+    )
+    @hypothesis.settings(max_examples=500, deadline=None)
+    def check(base_uri, id_):
+        assert outcome(join_id, base_uri, id_) == outcome(urljoin_id, base_uri, id_)
+
+    check()
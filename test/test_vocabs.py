@@ -0,0 +1,82 @@
+# Copyright 2019-2022 The University of Manchester, UK
+# Copyright 2020-2022 Vlaams Instituut voor Biotechnologie (VIB), BE
+# Copyright 2020-2022 Barcelona Supercomputing Center (BSC), ES
+# Copyright 2020-2022 Center for Advanced Studies, Research and Development in Sardinia (CRS4), IT
+# Copyright 2022 École Polytechnique Fédérale de Lausanne, CH
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import subprocess
+import sys
+
+import pytest
+
+from rocrate import vocabs
+
+
+def test_lazy_loading():
+    code = (
+        "import rocrate.rocrate; from rocrate import vocabs; "
+        "print(sorted(set(vars(vocabs)) & {'RO_CRATE', 'SCHEMA', 'SCHEMA_MAP'}))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    assert out.strip() == "[]"
+
+
+def test_vocabs():
+    assert vocabs.RO_CRATE["@context"]["File"] == "http://schema.org/MediaObject"
+    assert vocabs.SCHEMA_MAP is vocabs.SCHEMA_MAP
+    assert vocabs.term_to_uri("File") == "http://schema.org/MediaObject"
+    assert vocabs.schema_doc("http://schema.org/Person").startswith("A person")
+
+
+def test_index_up_to_date(tmpdir):
+    out_path = tmpdir / "vocabs.idx"
+    vocabs.compile_index(out_path)
+    assert out_path.read_bytes() == open(vocabs.INDEX_PATH, "rb").read()
+
+
+def test_index(tmpdir):
+    out_path = tmpdir / "vocabs.idx"
+    vocabs.compile_index(out_path)
+    index = vocabs.VocabIndex(out_path)
+    for term, uri in vocabs.RO_CRATE["@context"].items():
+        assert index.lookup("terms", term) == uri
+    for uri, entry in vocabs.SCHEMA_MAP.items():
+        assert index.lookup("comments", uri) == entry.get("rdfs:comment", "")
+    with pytest.raises(KeyError):
+        index.lookup("terms", "NotATerm")
+    bad_path = tmpdir / "bad.idx"
+    bad_path.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        vocabs.VocabIndex(bad_path)
+
+
+def test_superclasses():
+    assert vocabs.superclasses("http://schema.org/Thing") == []
+    assert vocabs.superclasses("http://schema.org/SoftwareSourceCode") == [
+        "http://schema.org/CreativeWork", "http://schema.org/Thing"
+    ]
+    with pytest.raises(KeyError):
+        vocabs.superclasses("http://schema.org/name")
+
+
+def test_json_fallback(monkeypatch):
+    monkeypatch.setitem(vars(vocabs), "_INDEX", None)
+    assert vocabs.term_to_uri("File") == "http://schema.org/MediaObject"
+    assert vocabs.schema_doc("http://schema.org/Person").startswith("A person")
+    assert vocabs.superclasses("http://schema.org/SoftwareSourceCode") == [
+        "http://schema.org/CreativeWork", "http://schema.org/Thing"
+    ]
+    with pytest.raises(KeyError):
+        vocabs.superclasses("http://schema.org/name")
@@ -333,6 +333,31 @@ def test_missing_source(test_data_dir, tmpdir, what):
         assert not any(out_path.iterdir())
 
 
+def test_validate_url_indexes(tmpdir, monkeypatch):
+    from http.client import HTTPResponse
+
+    class Response(HTTPResponse):
+
+        def __init__(self, url):
+            self.url = url
+
+        def getheader(self, name, default=None):
+            return {"Content-Length": "42", "Content-Type": "text/csv"}.get(name, default)
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr("urllib.request.urlopen", Response)
+    crate = ROCrate()
+    f = crate.add_file("http://example.org/a.csv", validate_url=True)
+    assert crate.find(encodingFormat="text/csv") == []
+    crate.write(tmpdir)
+    # properties set from the response are indexed
+    assert crate.find(encodingFormat="text/csv") == [f]
+    assert crate.find(contentSize="42") == [f]
+    assert crate.find(sdDatePublished=f["sdDatePublished"]) == [f]
+
+
 @pytest.mark.parametrize("fetch_remote,validate_url", [(False, False), (False, True), (True, False), (True, True)])
 def test_stringio_no_dest(test_data_dir, fetch_remote, validate_url):
     crate = ROCrate()
@@ -369,6 +394,26 @@ def test_dataset(test_data_dir, tmpdir):
     assert (out_path / "c").is_dir()
 
 
+def test_dataset_unlisted(tmpdir):
+    src = tmpdir / "src"
+    (src / "sub").mkdir(parents=True)
+    for rel in "a.txt", "b.txt", "sub/c.txt":
+        (src / rel).write_text(rel, encoding="utf-8")
+    other = tmpdir / "other.txt"
+    other.write_text("other", encoding="utf-8")
+    crate = ROCrate()
+    # a top-level entity with the same relative path as a file in the dataset
+    crate.add_file(other, "a.txt")
+    crate.add_dataset(src, "data")
+    crate.add_file(other, "data/b.txt")
+    out_path = tmpdir / "ro_crate_out"
+    crate.write(out_path)
+    assert (out_path / "a.txt").read_text(encoding="utf-8") == "other"
+    assert (out_path / "data" / "a.txt").read_text(encoding="utf-8") == "a.txt"
+    assert (out_path / "data" / "b.txt").read_text(encoding="utf-8") == "other"
+    assert (out_path / "data" / "sub" / "c.txt").read_text(encoding="utf-8") == "sub/c.txt"
+
+
 def test_no_parts(tmpdir, helpers):
     crate = ROCrate()
 